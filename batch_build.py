@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Construção de projetos OpenShot em lote
+Gera um .osp por CSV (no formato do timestamps.csv) em um pool de processos.
+Cada job roda isolado (a falha de um não interrompe os demais) e o estado
+fica gravado em um manifesto, para que uma nova execução pule os projetos
+já construídos cujo CSV, imagens e opções não mudaram
+
+Uso:
+    python3 batch_build.py pasta_com_csvs/ --saida projetos/
+    python3 batch_build.py jobs.json --trabalhadores 8
+
+Manifesto de jobs (caminhos relativos ao próprio arquivo):
+    {
+      "padrao": {"fps": 30, "layer": 2},
+      "jobs": [
+        {"csv": "video1.csv", "projeto": "video1.osp"},
+        {"csv": "video2.csv", "projeto": "video2.osp", "duracao": 5.0}
+      ]
+    }
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from instrumentation import Instrumentation
+from media_cache import file_sha256
+from sync_from_csv import (ALTURA, DURACAO_PADRAO, FPS, LARGURA, LAYER_PADRAO,
+                           adicionar_em_blocos, iterar_linhas_csv, iterar_timestamps_csv)
+
+ARQUIVO_ESTADO = ".batch_build.json"
+FORMATO_ESTADO = 1
+
+# Opções de cada job e seus valores padrão (os mesmos do sync_from_csv.py)
+OPCOES_PADRAO = {
+    'largura': LARGURA,
+    'altura': ALTURA,
+    'fps': FPS,
+    'layer': LAYER_PADRAO,
+    'duracao': DURACAO_PADRAO,
+    'compacto': False,
+}
+
+# Threads de listagem de diretórios por job (os jobs já rodam em paralelo)
+TRABALHADORES_MIDIA = 2
+
+
+def _job(csv, projeto, opcoes):
+    job = {'csv': os.path.abspath(csv), 'projeto': os.path.abspath(projeto)}
+    job.update(OPCOES_PADRAO)
+    desconhecidas = set(opcoes) - set(OPCOES_PADRAO)
+    if desconhecidas:
+        raise ValueError(f"Opções desconhecidas no job {csv}: {', '.join(sorted(desconhecidas))}")
+    job.update(opcoes)
+    return job
+
+
+def jobs_da_pasta(pasta, saida=None):
+    """Um job por arquivo .csv da pasta; o projeto tem o mesmo nome, com .osp"""
+    saida = saida or pasta
+    jobs = []
+    for nome in sorted(os.listdir(pasta)):
+        if nome.lower().endswith('.csv'):
+            projeto = os.path.join(saida, os.path.splitext(nome)[0] + '.osp')
+            jobs.append(_job(os.path.join(pasta, nome), projeto, {}))
+    return jobs
+
+
+def jobs_do_manifesto(arquivo, saida=None):
+    """
+    Lê os jobs de um manifesto JSON (ver o formato no topo do arquivo)
+
+    Um job sem 'projeto' gera o .osp com o nome do CSV, em `saida` (ou na
+    pasta do manifesto).
+    """
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    if isinstance(dados, list):
+        dados = {'jobs': dados}
+    base = os.path.dirname(os.path.abspath(arquivo))
+    saida = saida or base
+    padrao = dados.get('padrao', {})
+    jobs = []
+    for spec in dados.get('jobs', []):
+        spec = dict(padrao, **spec)
+        csv = os.path.join(base, spec.pop('csv'))
+        projeto = spec.pop('projeto', None)
+        if projeto is None:
+            projeto = os.path.join(saida, os.path.splitext(os.path.basename(csv))[0] + '.osp')
+        else:
+            projeto = os.path.join(base, projeto)
+        jobs.append(_job(csv, projeto, spec))
+    return jobs
+
+
+def verificar_saidas(jobs):
+    """
+    Garante que cada projeto de saída pertence a um único job
+
+    Raises:
+        ValueError: Se dois jobs gravam o mesmo projeto
+    """
+    donos = {}
+    for job in jobs:
+        chave = os.path.normcase(job['projeto'])
+        if chave in donos:
+            raise ValueError(f"Dois jobs gravam o mesmo projeto {job['projeto']}: "
+                             f"{donos[chave]} e {job['csv']}")
+        donos[chave] = job['csv']
+
+
+def _impressao_midia(csv_path):
+    """
+    Hash de (caminho, tamanho, mtime_ns) de cada imagem citada no CSV
+
+    Imagens que não existem entram como ausentes, então criar, trocar ou
+    apagar uma imagem muda a impressão digital.
+    """
+    pasta = os.path.dirname(csv_path)
+    imagens = set()
+    for _, row in iterar_linhas_csv(csv_path):
+        if len(row) >= 2:
+            imagens.add(os.path.join(pasta, row[0].strip()))
+    hasher = hashlib.sha256()
+    for imagem in sorted(imagens):
+        hasher.update(json.dumps([imagem, _arquivo_atual(imagem)]).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def impressao_digital(job):
+    """
+    Identifica o conteúdo de um job: hash do CSV, das imagens e as opções
+
+    Dois jobs com a mesma impressão digital produzem o mesmo projeto.
+
+    Raises:
+        OSError, ValueError, csv.Error: Se o CSV não puder ser lido
+    """
+    opcoes = {chave: job[chave] for chave in sorted(OPCOES_PADRAO)}
+    return {'csv_sha256': file_sha256(job['csv']), 'midia_sha256': _impressao_midia(job['csv']),
+            'opcoes': opcoes}
+
+
+def _arquivo_atual(caminho):
+    """(tamanho, mtime_ns) do arquivo, ou None se não existir"""
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def construir_projeto(job):
+    """
+    Constrói um projeto (executado em um processo do pool)
+
+    Nunca levanta exceção: erros voltam no resultado, para que um job com
+    problema não derrube os demais.
+
+    Returns:
+        Dicionário com ok, segundos, contadores/tempos das etapas e erro
+    """
+    # Importado aqui para não pesar no processo principal
+    from sync_images_openshot import OpenShotImageSync
+
+    inicio = time.perf_counter()
+    instrumentacao = Instrumentation()
+    resultado = {'projeto': job['projeto'], 'ok': False}
+    try:
+        os.makedirs(os.path.dirname(job['projeto']), exist_ok=True)
+        sync = OpenShotImageSync(job['projeto'], media_workers=TRABALHADORES_MIDIA,
+                                 output="quiet", instrumentation=instrumentacao)
+        sync.create_new_project(width=job['largura'], height=job['altura'], fps=job['fps'])
+        # Caminhos relativos das imagens partem da pasta do CSV
+        pasta = os.path.dirname(job['csv'])
+        timestamps = ((os.path.join(pasta, imagem), timestamp, duracao)
+                      for imagem, timestamp, duracao in iterar_timestamps_csv(
+                          job['csv'], avisar=False, duracao_padrao=job['duracao']))
+        linhas, adicionadas = adicionar_em_blocos(sync, timestamps, job['layer'])
+        resultado['linhas'] = linhas
+        resultado['clips'] = adicionadas
+        if not sync.save_project(compact=job['compacto']):
+            resultado['erro'] = "falha ao salvar o projeto"
+        elif linhas and not adicionadas:
+            resultado['erro'] = "nenhuma imagem do CSV foi encontrada"
+        else:
+            resultado['ok'] = True
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    resultado['segundos'] = time.perf_counter() - inicio
+    resultado.update(instrumentacao.summary())
+    return resultado
+
+
+class EstadoLote:
+    """
+    Manifesto de estado (JSON) com o resultado de cada projeto
+
+    É regravado de forma atômica a cada job concluído, então uma execução
+    interrompida pode ser retomada sem refazer o que já terminou.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.projetos = {}
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            if dados.get('formato') == FORMATO_ESTADO:
+                self.projetos = dados.get('projetos', {})
+        except (OSError, ValueError):
+            pass
+
+    def atualizado(self, job, digital):
+        """True se o projeto já foi construído com esta impressão digital e não mudou"""
+        registro = self.projetos.get(job['projeto'])
+        return (registro is not None and registro.get('ok')
+                and registro.get('digital') == digital
+                and registro.get('arquivo') == _arquivo_atual(job['projeto']))
+
+    def registrar(self, job, digital, resultado):
+        registro = {'csv': job['csv'], 'digital': digital, 'ok': resultado['ok'],
+                    'segundos': round(resultado['segundos'], 3),
+                    'clips': resultado.get('clips', 0)}
+        if resultado['ok']:
+            registro['arquivo'] = _arquivo_atual(job['projeto'])
+        else:
+            registro['erro'] = resultado.get('erro')
+        self.projetos[job['projeto']] = registro
+        self.gravar()
+
+    def gravar(self):
+        pasta = os.path.dirname(os.path.abspath(self.caminho))
+        os.makedirs(pasta, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=pasta, prefix='.batch_build.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'formato': FORMATO_ESTADO, 'projetos': self.projetos}, f, indent=2)
+            os.replace(temporario, self.caminho)
+        except BaseException:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+            raise
+
+
+def _falha_processo(job, erro):
+    # O processo do job morreu (falta de memória, sinal...)
+    return {'projeto': job['projeto'], 'ok': False, 'segundos': 0.0,
+            'erro': f"processo encerrado: {erro}"}
+
+
+def _rodar_pool(fila, trabalhadores, concluir):
+    """
+    Roda os jobs da fila em um pool, no máximo `trabalhadores` por vez
+
+    Returns:
+        Jobs que estavam rodando se o pool quebrou (um processo morreu);
+        os que não chegaram a começar continuam na fila
+    """
+    rodando = {}
+    with ProcessPoolExecutor(max_workers=trabalhadores) as pool:
+        while fila or rodando:
+            while fila and len(rodando) < trabalhadores:
+                job, digital = fila[0]
+                try:
+                    futuro = pool.submit(construir_projeto, job)
+                except BrokenProcessPool:
+                    return list(rodando.values())
+                fila.popleft()
+                rodando[futuro] = (job, digital)
+            prontos, _ = wait(rodando, return_when=FIRST_COMPLETED)
+            quebrou = False
+            for futuro in prontos:
+                try:
+                    resultado = futuro.result()
+                except BrokenProcessPool:
+                    quebrou = True
+                    continue
+                job, digital = rodando.pop(futuro)
+                concluir(job, digital, resultado)
+            if quebrou:
+                return list(rodando.values())
+    return []
+
+
+def _executar_jobs(pendentes, trabalhadores, concluir):
+    """
+    Roda os jobs, chamando concluir(job, digital, resultado) para cada um
+
+    Quando um processo morre, o pool inteiro quebra: os jobs que ainda não
+    tinham começado vão para um pool novo e os que estavam rodando são
+    refeitos um a um, cada um em um processo só seu, para que falhe apenas
+    o job que derrubou o processo.
+    """
+    fila = deque(pendentes)
+    suspeitos = deque()
+    while fila or suspeitos:
+        if not suspeitos:
+            suspeitos.extend(_rodar_pool(fila, trabalhadores, concluir))
+            continue
+        job, digital = suspeitos.popleft()
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                resultado = pool.submit(construir_projeto, job).result()
+            except BrokenProcessPool as e:
+                resultado = _falha_processo(job, e)
+        concluir(job, digital, resultado)
+
+
+def executar_lote(jobs, estado, trabalhadores=None, forcar=False):
+    """
+    Constrói os projetos pendentes em paralelo
+
+    Args:
+        jobs: Lista de jobs (jobs_da_pasta/jobs_do_manifesto)
+        estado: EstadoLote usado para pular e registrar os jobs
+        trabalhadores: Processos do pool (padrão: número de CPUs)
+        forcar: Reconstrói mesmo os projetos atualizados
+
+    Returns:
+        Relatório agregado (ver imprimir_relatorio)
+
+    Raises:
+        ValueError: Se dois jobs gravam o mesmo projeto
+    """
+    verificar_saidas(jobs)
+    inicio = time.perf_counter()
+    relatorio = {'jobs': len(jobs), 'construidos': 0, 'pulados': 0, 'falhas': 0,
+                 'clips': 0, 'segundos_jobs': 0.0, 'etapas': {}, 'contadores': {},
+                 'erros': {}, 'mais_lentos': []}
+
+    pendentes = {}
+    for job in jobs:
+        try:
+            digital = impressao_digital(job)
+        except (OSError, ValueError, csv.Error) as e:
+            relatorio['falhas'] += 1
+            relatorio['erros'][job['projeto']] = f"CSV ilegível: {e}"
+            print(f"✗ {os.path.basename(job['csv'])}: {e}")
+            continue
+        if not forcar and estado.atualizado(job, digital):
+            relatorio['pulados'] += 1
+            continue
+        pendentes[job['projeto']] = (job, digital)
+
+    if relatorio['pulados']:
+        print(f"♻️  {relatorio['pulados']} projetos atualizados pulados")
+    if pendentes:
+        print(f"▶ Construindo {len(pendentes)} projetos...")
+
+    duracoes = []
+    concluidos = 0
+
+    def concluir(job, digital, resultado):
+        nonlocal concluidos
+        concluidos += 1
+        estado.registrar(job, digital, resultado)
+        nome = os.path.basename(job['projeto'])
+        if resultado['ok']:
+            relatorio['construidos'] += 1
+            relatorio['clips'] += resultado.get('clips', 0)
+            print(f"✓ [{concluidos}/{len(pendentes)}] {nome}: {resultado.get('clips', 0)} clips "
+                  f"em {resultado['segundos']:.2f}s")
+        else:
+            relatorio['falhas'] += 1
+            relatorio['erros'][job['projeto']] = resultado.get('erro')
+            print(f"✗ [{concluidos}/{len(pendentes)}] {nome}: {resultado.get('erro')}")
+        relatorio['segundos_jobs'] += resultado['segundos']
+        duracoes.append((resultado['segundos'], nome))
+        for chave, destino in (('timings', 'etapas'), ('counters', 'contadores')):
+            for nome_metrica, valor in resultado.get(chave, {}).items():
+                acumulado = relatorio[destino]
+                acumulado[nome_metrica] = acumulado.get(nome_metrica, 0) + valor
+
+    if pendentes:
+        _executar_jobs(pendentes.values(), trabalhadores or os.cpu_count() or 1, concluir)
+
+    relatorio['mais_lentos'] = [[nome, segundos]
+                                for segundos, nome in sorted(duracoes, reverse=True)[:5]]
+    relatorio['segundos'] = time.perf_counter() - inicio
+    return relatorio
+
+
+def imprimir_relatorio(relatorio):
+    print("\n" + "=" * 60)
+    print(f"📊 {relatorio['jobs']} jobs: {relatorio['construidos']} construídos, "
+          f"{relatorio['pulados']} pulados, {relatorio['falhas']} com falha")
+    print(f"   {relatorio['clips']} clips em {relatorio['segundos']:.2f}s "
+          f"(soma dos jobs: {relatorio['segundos_jobs']:.2f}s)")
+    if relatorio['etapas']:
+        etapas = ", ".join(f"{etapa} {segundos:.2f}s"
+                           for etapa, segundos in relatorio['etapas'].items())
+        print(f"   Etapas: {etapas}")
+    faltando = relatorio['contadores'].get('media_missing', 0)
+    if faltando:
+        print(f"⚠️  {faltando} imagens não encontradas")
+    if relatorio['mais_lentos']:
+        print("   Mais lentos: " + ", ".join(f"{nome} ({segundos:.2f}s)"
+                                          for nome, segundos in relatorio['mais_lentos']))
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("entrada", help="Pasta com arquivos .csv ou manifesto de jobs (.json)")
+    parser.add_argument("--saida", help="Pasta dos projetos gerados (padrão: a da entrada)")
+    parser.add_argument("--trabalhadores", type=int, default=None,
+                        help="Processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--estado", help=f"Manifesto de estado (padrão: {ARQUIVO_ESTADO} "
+                                         "na pasta de saída)")
+    parser.add_argument("--forcar", action="store_true",
+                        help="Reconstrói todos os projetos, mesmo os atualizados")
+    parser.add_argument("--json", dest="relatorio", help="Grava o relatório neste arquivo")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.entrada):
+        jobs = jobs_da_pasta(args.entrada, args.saida)
+        pasta_saida = args.saida or args.entrada
+    else:
+        jobs = jobs_do_manifesto(args.entrada, args.saida)
+        pasta_saida = args.saida or os.path.dirname(os.path.abspath(args.entrada))
+    if not jobs:
+        print("❌ Nenhum job encontrado")
+        sys.exit(1)
+
+    estado = EstadoLote(args.estado or os.path.join(pasta_saida, ARQUIVO_ESTADO))
+    try:
+        relatorio = executar_lote(jobs, estado, args.trabalhadores, args.forcar)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    imprimir_relatorio(relatorio)
+    if args.relatorio:
+        with open(args.relatorio, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2)
+    if relatorio['falhas']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark da leitura de dimensões pelo cabeçalho (image_probe)
+Gera imagens sintéticas de todos os formatos suportados (PNG, JPEG com
+segmento EXIF antes do SOF, GIF, BMP e WebP VP8/VP8L/VP8X), mede a leitura
+serial e a paralela e confere as dimensões de cada arquivo.
+Sai com código 1 se alguma dimensão vier errada ou se a leitura paralela
+passar do orçamento
+
+Uso:
+    python3 benchmark_probe.py
+    python3 benchmark_probe.py --imagens 50000 --trabalhadores 16 --json probe.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import struct
+import sys
+import tempfile
+import time
+
+from image_probe import DEFAULT_WORKERS, _safe_probe, probe_images
+
+IMAGENS = 10000
+REPETICOES = 3
+ORCAMENTO_MS = 500  # Leitura paralela de todas as imagens
+
+
+def _png(largura, altura):
+    return (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + struct.pack('>II', largura, altura)
+            + b'\x08\x06\x00\x00\x00' + b'\x00' * 64)
+
+
+def _jpeg(largura, altura):
+    # APP1 (EXIF) de ~4 KB antes do SOF, como nas fotos de câmera
+    exif = b'Exif\x00\x00' + b'\x00' * 4096
+    return (b'\xff\xd8' + b'\xff\xe1' + struct.pack('>H', len(exif) + 2) + exif
+            + b'\xff\xc0' + struct.pack('>HBHHB', 17, 8, altura, largura, 3) + b'\x00' * 9
+            + b'\xff\xd9')
+
+
+def _gif(largura, altura):
+    return b'GIF89a' + struct.pack('<HH', largura, altura) + b'\x00' * 32
+
+
+def _bmp(largura, altura):
+    return (b'BM' + b'\x00' * 12 + struct.pack('<Iii', 40, largura, -altura)
+            + b'\x00' * 32)
+
+
+def _riff(chunk, dados):
+    corpo = b'WEBP' + chunk + struct.pack('<I', len(dados)) + dados
+    return b'RIFF' + struct.pack('<I', len(corpo)) + corpo
+
+
+def _webp_vp8(largura, altura):
+    return _riff(b'VP8 ', b'\x00' * 3 + b'\x9d\x01\x2a'
+                 + struct.pack('<HH', largura, altura) + b'\x00' * 16)
+
+
+def _webp_vp8l(largura, altura):
+    bits = (largura - 1) | ((altura - 1) << 14)
+    return _riff(b'VP8L', b'\x2f' + bits.to_bytes(4, 'little') + b'\x00' * 16)
+
+
+def _webp_vp8x(largura, altura):
+    return _riff(b'VP8X', b'\x10\x00\x00\x00' + (largura - 1).to_bytes(3, 'little')
+                 + (altura - 1).to_bytes(3, 'little') + b'\x00' * 16)
+
+
+FORMATOS = (
+    ('png', 'png', _png),
+    ('jpg', 'jpeg', _jpeg),
+    ('gif', 'gif', _gif),
+    ('bmp', 'bmp', _bmp),
+    ('webp', 'webp', _webp_vp8),
+    ('webp', 'webp', _webp_vp8l),
+    ('webp', 'webp', _webp_vp8x),
+)
+
+
+def preparar_imagens(pasta, quantidade):
+    """Cria as imagens; retorna {caminho: (formato, largura, altura)} esperado"""
+    esperado = {}
+    for i in range(quantidade):
+        extensao, formato, gerar = FORMATOS[i % len(FORMATOS)]
+        # Dimensões variadas (e dentro do limite de 14 bits do VP8/VP8L)
+        largura, altura = 640 + (i * 7) % 8000, 480 + (i * 13) % 6000
+        caminho = os.path.join(pasta, f"img_{i:06d}.{extensao}")
+        with open(caminho, 'wb') as f:
+            f.write(gerar(largura, altura))
+        esperado[caminho] = (formato, largura, altura)
+    return esperado
+
+
+def _medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def executar(quantidade, trabalhadores, repeticoes):
+    with tempfile.TemporaryDirectory() as pasta:
+        esperado = preparar_imagens(pasta, quantidade)
+        caminhos = list(esperado)
+        probe_images(caminhos, trabalhadores)  # Aquecimento (cache de disco)
+        serial_ms, serial = _medir(lambda: {c: _safe_probe(c) for c in caminhos}, repeticoes)
+        paralelo_ms, paralelo = _medir(lambda: probe_images(caminhos, trabalhadores), repeticoes)
+    erros = [caminho for caminho, dimensoes in esperado.items()
+             if serial.get(caminho) != dimensoes or paralelo.get(caminho) != dimensoes]
+    return {'python': sys.version.split()[0], 'imagens': quantidade,
+            'trabalhadores': trabalhadores, 'serial_ms': serial_ms,
+            'paralelo_ms': paralelo_ms, 'erros': [os.path.basename(c) for c in erros[:10]],
+            'total_erros': len(erros)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--imagens", type=int, default=IMAGENS)
+    parser.add_argument("--trabalhadores", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--orcamento-ms", type=int, default=ORCAMENTO_MS,
+                        help=f"Limite da leitura paralela (padrão: {ORCAMENTO_MS})")
+    parser.add_argument("--json", dest="saida", help="Grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    dados = executar(args.imagens, args.trabalhadores, args.repeticoes)
+    dados['orcamento_ms'] = args.orcamento_ms
+    por_imagem = 1000 / args.imagens  # ms -> µs por imagem
+    print(f"\n{dados['imagens']} imagens (Python {dados['python']})\n")
+    print(f"  serial:   {dados['serial_ms']:8.1f} ms  "
+          f"({dados['serial_ms'] * por_imagem:.1f} µs/imagem)")
+    print(f"  paralelo: {dados['paralelo_ms']:8.1f} ms  "
+          f"({dados['paralelo_ms'] * por_imagem:.1f} µs/imagem, "
+          f"{dados['trabalhadores']} threads)")
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=2)
+        print(f"\n✓ Resultados gravados em {args.saida}")
+
+    falhas = []
+    if dados['total_erros']:
+        falhas.append(f"{dados['total_erros']} imagens com dimensões erradas "
+                      f"({', '.join(dados['erros'])})")
+    if dados['paralelo_ms'] > args.orcamento_ms:
+        falhas.append(f"leitura paralela: {dados['paralelo_ms']:.1f} ms > {args.orcamento_ms} ms")
+    if falhas:
+        print("\n⚠️  Falhas:")
+        for falha in falhas:
+            print(f"   {falha}")
+        sys.exit(1)
+    print("\n✓ Dimensões corretas e dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
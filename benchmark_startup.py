@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização da linha de comando (openshot_cli)
+Executa cada subcomando em um processo novo, com `python -X importtime`,
+sobre dados mínimos, e mede o tempo total e o tempo gasto em importações.
+Sai com código 1 se algum comando passar do orçamento, ou se um comando
+leve (--help, stats) importar módulos pesados
+
+Uso:
+    python3 benchmark_startup.py
+    python3 benchmark_startup.py --repeticoes 10 --orcamento-ms 200 --json inicio.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPETICOES = 5
+ORCAMENTO_MS = 300        # Comandos que montam um projeto
+ORCAMENTO_LEVE_MS = 80    # --help e stats
+COMANDOS_LEVES = ('help', 'stats')
+# Módulos que os comandos leves não podem importar
+PROIBIDOS_LEVES = ('sync_images_openshot', 'numpy', 'sqlite3')
+
+_PASTA_REPO = os.path.dirname(os.path.abspath(__file__))
+_PNG = (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR'
+        + (64).to_bytes(4, 'big') + (64).to_bytes(4, 'big') + b'\x08\x06\x00\x00\x00')
+
+
+def _ambiente():
+    ambiente = dict(os.environ)
+    ambiente['PYTHONPATH'] = os.pathsep.join(
+        p for p in (_PASTA_REPO, ambiente.get('PYTHONPATH')) if p)
+    # Sem bytecode desatualizado pesando na primeira execução medida
+    ambiente.pop('PYTHONDONTWRITEBYTECODE', None)
+    return ambiente
+
+
+def preparar_dados(pasta):
+    """Cria imagens, um CSV e um projeto mínimos; retorna os comandos medidos"""
+    fotos = os.path.join(pasta, "fotos")
+    os.makedirs(fotos, exist_ok=True)
+    imagens = []
+    for i in range(3):
+        caminho = os.path.join(fotos, f"foto_{i}.png")
+        with open(caminho, 'wb') as f:
+            f.write(_PNG)
+        imagens.append(caminho)
+    arquivo_csv = os.path.join(pasta, "timestamps.csv")
+    with open(arquivo_csv, 'w', encoding='utf-8') as f:
+        f.write("imagem,timestamp,duracao\n")
+        for i, imagem in enumerate(imagens):
+            f.write(f"{imagem},{i * 2.0},2.0\n")
+    projeto = os.path.join(pasta, "base.osp")
+    subprocess.run([sys.executable, "-m", "openshot_cli", "from-csv", arquivo_csv,
+                    "-o", projeto, "--modo-saida", "quiet"],
+                   check=True, env=_ambiente(), cwd=pasta, stdout=subprocess.DEVNULL)
+
+    saida = os.path.join(pasta, "saida.osp")
+    silencioso = ["-o", saida, "--modo-saida", "quiet"]
+    return {
+        'help': ["--help"],
+        'stats': ["stats", projeto],
+        'from-csv': ["from-csv", arquivo_csv, "--delimitador", ","] + silencioso,
+        'interval': ["interval"] + imagens + silencioso,
+        'gallery': ["gallery", fotos] + silencioso,
+        'merge': ["merge", projeto, projeto + "@10", "-o", saida],
+    }
+
+
+def _ler_importtime(stderr):
+    """
+    Interpreta a saída de -X importtime
+
+    Returns:
+        Tupla (microssegundos nas importações de primeiro nível,
+        {módulo: microssegundos acumulados} de todos os módulos)
+    """
+    total = 0
+    modulos = {}
+    for linha in stderr.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        partes = linha[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        acumulado = int(partes[1])
+        nome = partes[2][1:]
+        modulos[nome.strip()] = acumulado
+        if not nome.startswith(" "):
+            total += acumulado
+    return total, modulos
+
+
+def medir_comando(argv, pasta, repeticoes):
+    """Executa o comando `repeticoes` vezes e retorna as medianas"""
+    tempos, importacoes = [], []
+    modulos = {}
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run([sys.executable, "-X", "importtime", "-m", "openshot_cli"] + argv,
+                                  env=_ambiente(), cwd=pasta, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.PIPE, text=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if processo.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} falhou:\n{processo.stderr[-2000:]}")
+        total, modulos = _ler_importtime(processo.stderr)
+        importacoes.append(total / 1000)
+    # Módulos mais caros, pelo tempo acumulado (da última execução)
+    mais_caros = sorted(modulos.items(), key=lambda item: item[1], reverse=True)
+    return {
+        'ms': statistics.median(tempos),
+        'importacoes_ms': statistics.median(importacoes),
+        'mais_caros': [[nome, acumulado / 1000] for nome, acumulado in mais_caros[:5]],
+        'modulos': sorted(modulos),
+    }
+
+
+def medir_interpretador(repeticoes):
+    """Tempo de `python -c pass`: o piso de qualquer comando"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def executar(repeticoes, orcamento_ms, orcamento_leve_ms):
+    with tempfile.TemporaryDirectory() as pasta:
+        comandos = preparar_dados(pasta)
+        # Uma execução de aquecimento (gera o bytecode e carrega o cache de disco)
+        for argv in comandos.values():
+            subprocess.run([sys.executable, "-m", "openshot_cli"] + argv, env=_ambiente(),
+                           cwd=pasta, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        resultados = {}
+        for nome, argv in comandos.items():
+            resultado = medir_comando(argv, pasta, repeticoes)
+            leve = nome in COMANDOS_LEVES
+            resultado['orcamento_ms'] = orcamento_leve_ms if leve else orcamento_ms
+            resultado['proibidos'] = ([m for m in PROIBIDOS_LEVES if m in resultado['modulos']]
+                                      if leve else [])
+            del resultado['modulos']
+            resultados[nome] = resultado
+    return {'python': sys.version.split()[0], 'interpretador_ms': medir_interpretador(repeticoes),
+            'comandos': resultados}
+
+
+def imprimir(dados):
+    print(f"\nInterpretador sozinho: {dados['interpretador_ms']:.1f} ms (Python {dados['python']})\n")
+    print(f"{'comando':>10s} {'total':>9s} {'imports':>9s} {'orçamento':>10s}  mais caros")
+    print("-" * 90)
+    falhas = []
+    for nome, r in dados['comandos'].items():
+        estourou = r['ms'] > r['orcamento_ms']
+        if estourou:
+            falhas.append(f"{nome}: {r['ms']:.1f} ms > {r['orcamento_ms']} ms")
+        if r['proibidos']:
+            falhas.append(f"{nome}: importou {', '.join(r['proibidos'])}")
+        caros = ", ".join(f"{modulo} {ms:.1f}" for modulo, ms in r['mais_caros'][:3])
+        print(f"{nome:>10s} {r['ms']:>7.1f}ms {r['importacoes_ms']:>7.1f}ms "
+              f"{r['orcamento_ms']:>8d}ms  {caros}" + ("  ⚠️" if estourou else ""))
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--orcamento-ms", type=int, default=ORCAMENTO_MS,
+                        help=f"Limite dos comandos que montam projetos (padrão: {ORCAMENTO_MS})")
+    parser.add_argument("--orcamento-leve-ms", type=int, default=ORCAMENTO_LEVE_MS,
+                        help=f"Limite de --help e stats (padrão: {ORCAMENTO_LEVE_MS})")
+    parser.add_argument("--json", dest="saida", help="Grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    dados = executar(args.repeticoes, args.orcamento_ms, args.orcamento_leve_ms)
+    falhas = imprimir(dados)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=2)
+        print(f"\n✓ Resultados gravados em {args.saida}")
+    if falhas:
+        print("\n⚠️  Fora do orçamento:")
+        for falha in falhas:
+            print(f"   {falha}")
+        sys.exit(1)
+    print("\n✓ Todos os comandos dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
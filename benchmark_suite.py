@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks do pipeline CSV -> projeto OpenShot
+Gera árvores de imagens e CSVs sintéticos e mede cada etapa (leitura do CSV,
+verificação das mídias, montagem dos clips, gravação e carregamento): tempo,
+pico de RSS e pico do tracemalloc. Os resultados saem em JSON, e duas
+execuções podem ser comparadas para apontar regressões
+
+Uso:
+    python3 benchmark_suite.py 1000 10000 --json resultado.json
+    python3 benchmark_suite.py 1000 10000 --base resultado.json   # compara
+    python3 benchmark_suite.py --comparar antes.json depois.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from media_resolver import MediaResolver
+from sync_from_csv import ler_timestamps_csv
+from sync_images_openshot import OpenShotImageSync
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+IMAGENS_MAXIMO = 10_000     # Arquivos distintos por conjunto de dados
+IMAGENS_POR_PASTA = 500
+LIMITE_PADRAO = 0.10        # Variação tolerada antes de apontar regressão
+FORMATO_JSON = 1
+
+# Diferença mínima (absoluta) para que uma variação conte como regressão,
+# evitando alarmes por ruído em etapas muito rápidas
+_MINIMO = {'segundos': 0.010, 'rss_pico_mb': 2.0, 'tracemalloc_pico_mb': 0.5}
+
+# Cabeçalho PNG mínimo (64x64), suficiente para image_probe
+_PNG = (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR'
+        + (64).to_bytes(4, 'big') + (64).to_bytes(4, 'big') + b'\x08\x06\x00\x00\x00')
+
+ETAPAS = ['csv', 'midia', 'clips', 'gravacao', 'carregamento', 'carregamento_lazy']
+
+
+def gerar_dados(pasta, n):
+    """
+    Cria (ou reaproveita) o conjunto de dados com n linhas
+
+    Returns:
+        Caminho do CSV gerado
+    """
+    destino = os.path.join(pasta, f"dados_{n}")
+    arquivo_csv = os.path.join(destino, "timestamps.csv")
+    if os.path.exists(arquivo_csv):
+        return arquivo_csv
+
+    imagens = []
+    for i in range(min(n, IMAGENS_MAXIMO)):
+        subpasta = os.path.join(destino, "imagens", f"grupo_{i // IMAGENS_POR_PASTA:03d}")
+        if i % IMAGENS_POR_PASTA == 0:
+            os.makedirs(subpasta, exist_ok=True)
+        caminho = os.path.join(subpasta, f"img_{i:05d}.png")
+        with open(caminho, 'wb') as f:
+            f.write(_PNG)
+        imagens.append(caminho)
+
+    temporario = arquivo_csv + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write("# Gerado por benchmark_suite.py\n")
+        f.write("imagem,timestamp,duracao\n")
+        for i in range(n):
+            f.write(f"{imagens[i % len(imagens)]},{i * 0.5:.3f},{1.0 + (i % 4) * 0.5}\n")
+    os.replace(temporario, arquivo_csv)
+    return arquivo_csv
+
+
+def _reiniciar_pico_rss() -> bool:
+    """Zera o pico de RSS do processo (Linux); False se não for possível"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _pico_rss_mb() -> float:
+    """Pico de memória residente do processo, em MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _medir(funcao, rastrear):
+    """Executa uma etapa com stdout descartado e coleta as métricas"""
+    rss_por_etapa = _reiniciar_pico_rss()
+    if rastrear:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcao()
+    metricas = {'segundos': time.perf_counter() - inicio}
+    if rastrear:
+        metricas['tracemalloc_pico_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    else:
+        metricas['rss_pico_mb'] = _pico_rss_mb()
+        metricas['rss_por_etapa'] = rss_por_etapa
+    return resultado, metricas
+
+
+def executar_pipeline(arquivo_csv, rastrear=False):
+    """
+    Executa as etapas do pipeline sobre um conjunto de dados
+
+    Roda em um processo próprio (ver medir_tamanho) para que o RSS de uma
+    execução não contamine a seguinte.
+
+    Returns:
+        Dicionário etapa -> métricas
+    """
+    pasta = os.path.dirname(arquivo_csv)
+    projeto = os.path.join(pasta, "bench.osp")
+    etapas = {}
+
+    linhas, etapas['csv'] = _medir(lambda: ler_timestamps_csv(arquivo_csv), rastrear)
+    caminhos, posicoes, duracoes = (list(coluna) for coluna in zip(*linhas))
+    del linhas
+
+    resolver = MediaResolver()
+    _, etapas['midia'] = _medir(lambda: resolver.resolve(caminhos), rastrear)
+
+    sync = OpenShotImageSync(projeto)
+    # Listagens já feitas na etapa anterior: a montagem mede só os clips
+    sync.media_resolver = resolver
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.create_new_project()
+    _, etapas['clips'] = _medir(
+        lambda: sync.add_images_batch(caminhos, posicoes, duracoes, 2), rastrear)
+    del caminhos, posicoes, duracoes
+
+    _, etapas['gravacao'] = _medir(lambda: sync.save_project(compact=True), rastrear)
+    etapas['gravacao']['bytes'] = sync.bytes_written
+    del sync
+
+    for etapa, lazy in (('carregamento', False), ('carregamento_lazy', True)):
+        carregado = OpenShotImageSync(projeto)
+        _, etapas[etapa] = _medir(lambda: carregado.load_project(lazy=lazy), rastrear)
+        del carregado
+    return etapas
+
+
+def medir_tamanho(arquivo_csv, rastrear):
+    """Executa o pipeline em um processo novo (spawn) e retorna as métricas"""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(executar_pipeline, (arquivo_csv, rastrear))
+
+
+def executar_suite(tamanhos, pasta, com_tracemalloc=True):
+    """
+    Mede todos os tamanhos
+
+    Cada tamanho roda duas vezes: uma para tempo e RSS, e outra com o
+    tracemalloc ligado (que deixa o código bem mais lento) só para os picos
+    de alocação.
+    """
+    resultados = {}
+    for n in tamanhos:
+        arquivo_csv = gerar_dados(pasta, n)
+        print(f"▶ {n} linhas...", flush=True)
+        etapas = medir_tamanho(arquivo_csv, rastrear=False)
+        if com_tracemalloc:
+            for etapa, metricas in medir_tamanho(arquivo_csv, rastrear=True).items():
+                etapas[etapa]['tracemalloc_pico_mb'] = metricas['tracemalloc_pico_mb']
+        resultados[str(n)] = etapas
+    return {
+        'formato': FORMATO_JSON,
+        'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'resultados': resultados,
+    }
+
+
+def imprimir_resultados(dados):
+    print(f"\n{'linhas':>9s} {'etapa':>18s} {'tempo':>9s} {'linhas/s':>11s} "
+          f"{'RSS pico':>10s} {'tracemalloc':>12s}")
+    print("-" * 74)
+    for tamanho, etapas in dados['resultados'].items():
+        n = int(tamanho)
+        for etapa in ETAPAS:
+            m = etapas.get(etapa)
+            if m is None:
+                continue
+            taxa = n / m['segundos'] if m['segundos'] else float('inf')
+            rastreado = m.get('tracemalloc_pico_mb')
+            print(f"{n:>9d} {etapa:>18s} {m['segundos']:>8.3f}s {taxa:>11,.0f} "
+                  f"{m['rss_pico_mb']:>8.1f}MB "
+                  + (f"{rastreado:>10.1f}MB" if rastreado is not None else f"{'-':>12s}"))
+
+
+def comparar(base, atual, limite=LIMITE_PADRAO):
+    """
+    Compara duas execuções da suíte
+
+    Returns:
+        Lista de regressões (tamanho, etapa, métrica, antes, depois)
+    """
+    regressoes = []
+    print(f"\n{'linhas':>9s} {'etapa':>18s} {'métrica':>20s} {'antes':>10s} "
+          f"{'depois':>10s} {'variação':>9s}")
+    print("-" * 81)
+    for tamanho, etapas in atual['resultados'].items():
+        etapas_base = base['resultados'].get(tamanho)
+        if etapas_base is None:
+            continue
+        for etapa in ETAPAS:
+            for metrica, minimo in _MINIMO.items():
+                antes = etapas_base.get(etapa, {}).get(metrica)
+                depois = etapas.get(etapa, {}).get(metrica)
+                if antes is None or depois is None:
+                    continue
+                variacao = (depois - antes) / antes if antes else 0.0
+                pior = variacao > limite and depois - antes > minimo
+                if pior:
+                    regressoes.append((tamanho, etapa, metrica, antes, depois))
+                print(f"{tamanho:>9s} {etapa:>18s} {metrica:>20s} {antes:>10.3f} "
+                      f"{depois:>10.3f} {variacao:>+8.1%}" + ("  ⚠️  regressão" if pior else ""))
+    return regressoes
+
+
+def _ler_json(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("tamanhos", nargs="*", type=int, default=TAMANHOS_PADRAO,
+                        help="Quantidades de linhas do CSV")
+    parser.add_argument("--pasta", help="Pasta dos dados sintéticos (reaproveitados "
+                                        "entre execuções); padrão: temporária")
+    parser.add_argument("--json", dest="saida", help="Grava os resultados neste arquivo")
+    parser.add_argument("--base", help="Compara a execução com um JSON anterior")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"),
+                        help="Só compara dois JSON, sem executar")
+    parser.add_argument("--limite", type=float, default=LIMITE_PADRAO,
+                        help="Piora relativa tolerada (padrão: 0.10 = 10%%)")
+    parser.add_argument("--sem-tracemalloc", action="store_true",
+                        help="Não faz a passada com tracemalloc (mais rápido)")
+    args = parser.parse_args()
+
+    if args.comparar:
+        base, atual = (_ler_json(caminho) for caminho in args.comparar)
+    else:
+        if args.pasta:
+            os.makedirs(args.pasta, exist_ok=True)
+            atual = executar_suite(args.tamanhos, args.pasta, not args.sem_tracemalloc)
+        else:
+            with tempfile.TemporaryDirectory() as pasta:
+                atual = executar_suite(args.tamanhos, pasta, not args.sem_tracemalloc)
+        imprimir_resultados(atual)
+        if args.saida:
+            with open(args.saida, 'w', encoding='utf-8') as f:
+                json.dump(atual, f, indent=2)
+            print(f"\n✓ Resultados gravados em {args.saida}")
+        base = _ler_json(args.base) if args.base else None
+
+    if base is not None:
+        regressoes = comparar(base, atual, args.limite)
+        if regressoes:
+            print(f"\n⚠️  {len(regressoes)} regressões acima de {args.limite:.0%}")
+            sys.exit(1)
+        print(f"\n✓ Nenhuma regressão acima de {args.limite:.0%}")
+
+
+if __name__ == "__main__":
+    main()
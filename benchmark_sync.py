@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Inserção e gravação de clips no OpenShotImageSync
+Compara o caminho item a item (add_image_at_timestamp em laço) com a API
+em lote (add_images_batch), e o json.dump original com o gravador em fluxo
+(osp_writer), para diferentes quantidades de clips; mede também a memória
+dos clips (osp_model.Clip contra o dicionário no formato do OpenShot) e a
+carga do projeto (json.load contra osp_lazy.load_project_lazy)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from osp_lazy import load_project_lazy
+from osp_writer import to_jsonable, write_project
+from sync_images_openshot import OpenShotImageSync
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+IMAGENS_DISTINTAS = 100  # Arquivos dummy reaproveitados pelos clips
+
+
+def criar_imagens_dummy(pasta, quantidade):
+    """Cria arquivos de imagem vazios para o benchmark"""
+    caminhos = []
+    for i in range(quantidade):
+        caminho = os.path.join(pasta, f"img_{i:05d}.png")
+        with open(caminho, 'wb'):
+            pass
+        caminhos.append(caminho)
+    return caminhos
+
+
+def medir(funcao):
+    """Executa a função com stdout descartado e retorna o tempo em segundos"""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+def bench_item_a_item(imagens, n):
+    sync = OpenShotImageSync("bench.osp")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.create_new_project()
+
+    def executar():
+        for i in range(n):
+            sync.add_image_at_timestamp(imagens[i % len(imagens)], i * 0.5, 1.0, 1)
+
+    return medir(executar)
+
+
+def bench_lote(imagens, n):
+    sync = OpenShotImageSync("bench.osp")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.create_new_project()
+    caminhos = [imagens[i % len(imagens)] for i in range(n)]
+    posicoes = [i * 0.5 for i in range(n)]
+
+    def executar():
+        sync.add_images_batch(caminhos, posicoes, 1.0, 1)
+
+    return medir(executar)
+
+
+def bench_gravacao(imagens, n, pasta):
+    """Mede json.dump(indent=2) contra write_project legível e compacto"""
+    sync = OpenShotImageSync("bench.osp")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.create_new_project()
+        sync.add_images_batch([imagens[i % len(imagens)] for i in range(n)],
+                              [i * 0.5 for i in range(n)], 1.0, 1)
+    destino = os.path.join(pasta, "bench.osp")
+
+    def json_dump():
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(sync.project_data, f, indent=2, ensure_ascii=False, default=to_jsonable)
+
+    resultados = {}
+    for nome, funcao in (
+        ("json.dump", json_dump),
+        ("fluxo", lambda: write_project(sync.project_data, destino)),
+        ("compacto", lambda: write_project(sync.project_data, destino, compact=True)),
+    ):
+        segundos = medir(funcao)
+        resultados[nome] = (segundos, os.path.getsize(destino))
+    return resultados
+
+
+def bench_carga(imagens, n, pasta, repeticoes=3):
+    """
+    Mede a carga do projeto gravado pelo osp_writer: json.load contra
+    load_project_lazy (melhor de `repeticoes` execuções)
+
+    Returns:
+        Tupla (segundos com json.load, segundos com load_project_lazy)
+    """
+    sync = OpenShotImageSync(os.path.join(pasta, "carga.osp"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.create_new_project()
+        sync.add_images_batch([imagens[i % len(imagens)] for i in range(n)],
+                              [i * 0.5 for i in range(n)], 1.0, 1)
+        sync.save_project()
+
+    def json_load():
+        with open(sync.project_path, encoding='utf-8') as f:
+            json.load(f)
+
+    def lazy():
+        load_project_lazy(sync.project_path)
+
+    return (min(medir(json_load) for _ in range(repeticoes)),
+            min(medir(lazy) for _ in range(repeticoes)))
+
+
+def bench_memoria(imagens, n):
+    """
+    Memória (tracemalloc) ocupada pelos clips como osp_model.Clip e como
+    dicionários aninhados no formato do OpenShot (a medição dos Clip inclui
+    o índice da timeline e o registro de alterações do sincronizador)
+
+    Returns:
+        Tupla (bytes como dicionários, bytes como Clip)
+    """
+    sync = OpenShotImageSync("bench.osp")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.create_new_project()
+    caminhos = [imagens[i % len(imagens)] for i in range(n)]
+    posicoes = [i * 0.5 for i in range(n)]
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync.add_images_batch(caminhos, posicoes, 1.0, 1)
+    bytes_clip = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    clips = sync.project_data['clips']
+    tracemalloc.start()
+    dicionarios = [clip.to_dict() for clip in clips]
+    bytes_dict = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicionarios
+    return bytes_dict, bytes_clip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("tamanhos", nargs="*", type=int, default=TAMANHOS_PADRAO,
+                        help="Quantidades de clips a medir")
+    parser.add_argument("--etapa", choices=["insercao", "gravacao", "memoria", "carga"], default="insercao",
+                        help="Etapa a medir")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        imagens = criar_imagens_dummy(pasta, IMAGENS_DISTINTAS)
+
+        if args.etapa == "insercao":
+            print(f"{'clips':>10s} {'item a item':>14s} {'lote':>10s} {'ganho':>8s}")
+            print("-" * 46)
+            for n in args.tamanhos:
+                t_item = bench_item_a_item(imagens, n)
+                t_lote = bench_lote(imagens, n)
+                print(f"{n:>10d} {t_item:>13.3f}s {t_lote:>9.3f}s {t_item / t_lote:>7.1f}x")
+        elif args.etapa == "memoria":
+            print(f"{'clips':>10s} {'dict':>10s} {'Clip':>10s} {'B/clip':>12s} {'ganho':>8s}")
+            print("-" * 54)
+            for n in args.tamanhos:
+                bytes_dict, bytes_clip = bench_memoria(imagens, n)
+                print(f"{n:>10d} {bytes_dict / 1e6:>8.1f}MB {bytes_clip / 1e6:>8.1f}MB "
+                      f"{bytes_dict // n:>5d}/{bytes_clip // n:<6d} "
+                      f"{bytes_dict / bytes_clip:>7.1f}x")
+        elif args.etapa == "carga":
+            print(f"{'clips':>10s} {'json.load':>10s} {'lazy':>10s} {'ganho':>8s}")
+            print("-" * 42)
+            for n in args.tamanhos:
+                t_json, t_lazy = bench_carga(imagens, n, pasta)
+                print(f"{n:>10d} {t_json:>9.3f}s {t_lazy:>9.3f}s {t_json / t_lazy:>7.1f}x")
+        else:
+            print(f"{'clips':>10s} {'modo':>10s} {'tempo':>9s} {'MB/s':>8s} {'tamanho':>10s}")
+            print("-" * 51)
+            for n in args.tamanhos:
+                for modo, (segundos, tamanho) in bench_gravacao(imagens, n, pasta).items():
+                    mb = tamanho / 1e6
+                    print(f"{n:>10d} {modo:>10s} {segundos:>8.3f}s {mb / segundos:>8.1f} "
+                          f"{mb:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
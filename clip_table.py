@@ -0,0 +1,726 @@
+#!/usr/bin/env python3
+"""
+Tabela colunar de clips
+Guarda os clips como colunas tipadas (array('d') / array('q')) em vez de um
+dicionário por clip, para que operações em massa (deslocar, reescalar o
+tempo, filtrar por camada) sejam feitas sobre as colunas inteiras, com NumPy
+quando disponível
+"""
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping, Sequence
+from fractions import Fraction
+from itertools import accumulate, chain
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from frame_rate import FrameRate, scale_frames
+from osp_model import Clip, static_curve, static_value
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+# Colunas de ponto flutuante: chave do .osp -> atributo da tabela
+_FLOAT_COLUMNS = {
+    'position': 'position', 'start': 'start', 'end': 'end', 'alpha': 'alpha',
+    'location_x': 'x', 'location_y': 'y', 'scale_x': 'scale_x', 'scale_y': 'scale_y',
+}
+# Bit de cada coluna na máscara de valores inteiros (0 gravado como "0", não "0.0")
+_INT_BIT = {key: 1 << i for i, key in enumerate(_FLOAT_COLUMNS)}
+_CURVES = ('alpha', 'location_x', 'location_y', 'scale_x', 'scale_y')
+_CLIP_KEYS = Clip.__slots__
+# Chaves que as colunas guardam também para clips em formato livre
+_SHARED_KEYS = ('file_id', 'position', 'start', 'end', 'layer')
+_NO_FILE = -1
+# Linhas fora do índice da timeline toleradas antes de remontá-lo
+_INDEX_MIN_PENDING = 64
+
+
+def _is_number(value) -> bool:
+    return type(value) in (int, float)
+
+
+def _restore(value: float, is_int: bool):
+    """Volta a int os valores que eram inteiros no .osp (se continuarem inteiros)"""
+    if is_int and value.is_integer():
+        return int(value)
+    return value
+
+
+def clip_id_number(clip_id) -> int:
+    """n de um id "clip_<n>" (como gerado pelo sincronizador), ou -1"""
+    if isinstance(clip_id, str) and clip_id.startswith('clip_'):
+        digits = clip_id[5:]
+        if digits.isascii() and digits.isdigit() and str(int(digits)) == digits:
+            return int(digits)
+    return -1
+
+
+def _view(column):
+    """Visão NumPy (sem cópia) de uma coluna; não manter enquanto a tabela cresce"""
+    return np.frombuffer(column, dtype=np.float64 if column.typecode == 'd' else np.int64)
+
+
+def _packed(typecode: str, values) -> array:
+    """array compacto a partir de uma lista ou de um array NumPy"""
+    if np is not None and isinstance(values, np.ndarray):
+        packed = array(typecode)
+        packed.frombytes(values.astype(np.float64 if typecode == 'd' else np.int64).tobytes())
+        return packed
+    return array(typecode, values)
+
+
+class ClipRow(MutableMapping):
+    """
+    Linha da ClipTable vista como dicionário de clip
+
+    Ler ou alterar position, start, end, layer e file_id acessa as colunas
+    diretamente. Ler uma curva de keyframe converte a linha em um dicionário
+    próprio (guardado na tabela); position, start, end, layer e file_id
+    continuam nas colunas.
+    """
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table: 'ClipTable', row: int):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, key):
+        return self.table._get(self.row, key)
+
+    def __setitem__(self, key, value):
+        self.table._set(self.row, key, value)
+
+    def __delitem__(self, key):
+        self.table._delete(self.row, key)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.table._keys(self.row))
+
+    def __len__(self) -> int:
+        return len(self.table._keys(self.row))
+
+    def __eq__(self, other):
+        if not isinstance(other, MutableMapping):
+            return NotImplemented
+        other_dict = getattr(other, 'to_dict', None)
+        return self.to_dict() == (other_dict() if other_dict is not None else dict(other))
+
+    __hash__ = None
+
+    def to_dict(self) -> Dict:
+        """Dicionário do clip no formato do OpenShot"""
+        return self.table.record(self.row)
+
+    def raw_json(self) -> Optional[str]:
+        """Texto original de clips preguiçosos (osp_lazy) não alterados"""
+        return self.table._raw_json(self.row)
+
+    def __repr__(self) -> str:
+        return f"<ClipRow {self.row} {self.get('id')!r}>"
+
+
+class ClipTable(Sequence):
+    """
+    Clips da timeline em colunas paralelas
+
+    Clips no formato criado pelo sincronizador ficam apenas nas colunas.
+    Clips com outro formato (keyframes animados, chaves extras do OpenShot)
+    guardam o registro original, e as colunas mantêm position, start, end,
+    layer e file_id para as operações em massa; ao salvar, os valores das
+    colunas são aplicados sobre o registro. A conversão de/para o .osp não
+    perde nada: um projeto carregado e salvo sem alterações sai idêntico.
+
+    Indexar a tabela retorna ClipRow (clips[i], clips[-1], clips[a:b]).
+    """
+
+    def __init__(self):
+        # Ids "clip_<n>" guardados só pelo número; os demais ficam em _other_ids
+        self.number = array('q')
+        self._other_ids: Dict[int, Optional[str]] = {}
+        # Tabela de file_id internados; a coluna `file` guarda o índice
+        self.file_ids: List[str] = []
+        self._file_index: Dict[str, int] = {}
+        self.file = array('q')
+        self.layer = array('q')
+        self.position = array('d')
+        self.start = array('d')
+        self.end = array('d')
+        self.alpha = array('d')
+        self.x = array('d')
+        self.y = array('d')
+        self.scale_x = array('d')
+        self.scale_y = array('d')
+        # Máscara (por linha) das colunas cujo valor original era inteiro
+        self._ints = bytearray()
+        # Linhas em formato livre: linha -> registro original (dict/LazyClip)
+        self._records: Dict[int, MutableMapping] = {}
+        # Índice da timeline (montado na primeira consulta): camada -> inícios
+        # ordenados, linhas, fins e maior fim acumulado. Linhas acrescentadas
+        # (>= _indexed) ou alteradas (_stale) depois dele são testadas uma a uma
+        self._index: Optional[Dict[int, Tuple[array, array, array, array]]] = None
+        self._indexed = 0
+        self._stale: Set[int] = set()
+
+    @classmethod
+    def from_clips(cls, clips: Iterable) -> 'ClipTable':
+        """Monta a tabela a partir de clips (dicts, Clip, LazyClip)"""
+        table = cls()
+        table.extend(clips)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.layer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ClipRow(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("índice fora da tabela")
+        return ClipRow(self, index)
+
+    def __iter__(self) -> Iterator[ClipRow]:
+        return (ClipRow(self, row) for row in range(len(self)))
+
+    # ------------------------------------------------------------------
+    # Inserção
+
+    def clip_id(self, row: int) -> Optional[str]:
+        """Id do clip da linha"""
+        number = self.number[row]
+        return f"clip_{number}" if number >= 0 else self._other_ids.get(row)
+
+    def _append_id(self, clip_id):
+        number = clip_id_number(clip_id)
+        if number < 0:
+            self._other_ids[len(self.number)] = clip_id if isinstance(clip_id, str) else None
+        self.number.append(number)
+
+    def _file(self, file_id) -> int:
+        if not isinstance(file_id, str):
+            return _NO_FILE
+        index = self._file_index.get(file_id)
+        if index is None:
+            index = self._file_index[file_id] = len(self.file_ids)
+            self.file_ids.append(file_id)
+        return index
+
+    def append_values(self, clip_id: str, file_id: str, position: float, start: float,
+                      end: float, layer: int, alpha: float = 1, x: float = 0.0,
+                      y: float = 0.0, scale_x: float = 1.0, scale_y: float = 1.0):
+        """Acrescenta um clip no formato do sincronizador a partir dos valores"""
+        ints = ((type(position) is int) | (type(start) is int) << 1
+                | (type(end) is int) << 2 | (type(alpha) is int) << 3
+                | (type(x) is int) << 4 | (type(y) is int) << 5
+                | (type(scale_x) is int) << 6 | (type(scale_y) is int) << 7)
+        self._append_id(clip_id)
+        self.file.append(self._file(file_id))
+        self.layer.append(layer)
+        self.position.append(position)
+        self.start.append(start)
+        self.end.append(end)
+        self.alpha.append(alpha)
+        self.x.append(x)
+        self.y.append(y)
+        self.scale_x.append(scale_x)
+        self.scale_y.append(scale_y)
+        self._ints.append(ints)
+
+    @staticmethod
+    def _standard_values(clip) -> Optional[tuple]:
+        """Valores do clip se ele estiver no formato do sincronizador"""
+        if isinstance(clip, Clip):
+            values = clip.static_values()
+        elif type(clip) is dict and tuple(clip) == _CLIP_KEYS:
+            curves = tuple(static_value(clip[key]) for key in _CURVES)
+            if None in curves:
+                return None
+            values = (clip['id'], clip['file_id'], clip['position'], clip['start'],
+                      clip['end'], clip['layer']) + curves
+        else:
+            return None
+        if (values is None or not isinstance(values[0], str) or not isinstance(values[1], str)
+                or type(values[5]) is not int or not all(map(_is_number, values[2:5]))):
+            return None
+        return values
+
+    def append(self, clip):
+        """Acrescenta um clip (dict, Clip, LazyClip ou ClipRow)"""
+        if isinstance(clip, ClipRow):
+            clip = clip.to_dict()
+        values = self._standard_values(clip)
+        if values is not None:
+            self.append_values(*values)
+            return
+        # Formato livre: guarda o registro e copia para as colunas o que couber
+        row = len(self)
+        ints = 0
+        numbers = []
+        for key in ('position', 'start', 'end'):
+            value = clip.get(key)
+            if not _is_number(value):
+                value = math.nan
+            elif type(value) is int:
+                ints |= _INT_BIT[key]
+            numbers.append(value)
+        layer = clip.get('layer')
+        clip_id = clip.get('id')
+        self._append_id(clip_id)
+        self.file.append(self._file(clip.get('file_id')))
+        self.layer.append(layer if type(layer) is int else 0)
+        self.position.append(numbers[0])
+        self.start.append(numbers[1])
+        self.end.append(numbers[2])
+        for column in (self.alpha, self.x, self.y, self.scale_x, self.scale_y):
+            column.append(math.nan)
+        self._ints.append(ints)
+        self._records[row] = clip
+
+    def extend(self, clips: Iterable):
+        for clip in clips:
+            self.append(clip)
+
+    def delete(self, rows: Iterable[int]) -> List[int]:
+        """
+        Remove as linhas informadas; as seguintes sobem (ClipRow antigos
+        passam a apontar para outras linhas)
+
+        Returns:
+            Linhas mantidas, na nova ordem: a nova linha i era a linha
+            retornada[i]
+        """
+        drop = set(rows)
+        keep = [row for row in range(len(self)) if row not in drop]
+        if not drop:
+            return keep
+        self._index = None
+        for name in ('number', 'file', 'layer', 'position', 'start', 'end',
+                     'alpha', 'x', 'y', 'scale_x', 'scale_y'):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[row] for row in keep]))
+        ints = self._ints
+        self._ints = bytearray(ints[row] for row in keep)
+        records, other_ids = self._records, self._other_ids
+        self._records = {new: records[old] for new, old in enumerate(keep) if old in records}
+        self._other_ids = {new: other_ids[old] for new, old in enumerate(keep) if old in other_ids}
+        return keep
+
+    # ------------------------------------------------------------------
+    # Acesso por linha
+
+    def _column_value(self, row: int, key: str):
+        """Valor de uma chave guardada nas colunas (KeyError se não houver)"""
+        if key == 'file_id':
+            index = self.file[row]
+            if index == _NO_FILE:
+                raise KeyError(key)
+            return self.file_ids[index]
+        if key == 'layer':
+            return self.layer[row]
+        value = getattr(self, _FLOAT_COLUMNS[key])[row]
+        if math.isnan(value):
+            raise KeyError(key)
+        return _restore(value, self._ints[row] & _INT_BIT[key])
+
+    def _keys(self, row: int):
+        record = self._records.get(row)
+        return _CLIP_KEYS if record is None else list(record)
+
+    def _get(self, row: int, key):
+        record = self._records.get(row)
+        if record is None:
+            if key == 'id':
+                return self.clip_id(row)
+            if key in _CURVES:
+                return self._materialize(row)[key]
+            if key in _FLOAT_COLUMNS or key in ('file_id', 'layer'):
+                return self._column_value(row, key)
+            raise KeyError(key)
+        if key in _SHARED_KEYS and key in record:
+            if key != 'layer' or type(record[key]) is int:
+                try:
+                    return self._column_value(row, key)
+                except KeyError:  # Valor não numérico: só existe no registro
+                    pass
+        return record[key]
+
+    def _set(self, row: int, key, value):
+        record = self._records.get(row)
+        if key == 'file_id' and isinstance(value, str) and (record is None or key in record):
+            self.file[row] = self._file(value)
+            return
+        if key == 'layer' and type(value) is int and (record is None or key in record):
+            self.layer[row] = value
+            self._touch(row)
+            return
+        if key in _FLOAT_COLUMNS and _is_number(value):
+            column_ok = record is None and key not in _CURVES
+            if record is not None and key in _SHARED_KEYS and key in record:
+                column_ok = _is_number(record[key])
+            if column_ok:
+                getattr(self, _FLOAT_COLUMNS[key])[row] = value
+                if key in ('position', 'start', 'end'):
+                    self._touch(row)
+                if type(value) is int:
+                    self._ints[row] |= _INT_BIT[key]
+                else:
+                    self._ints[row] &= ~_INT_BIT[key]
+                return
+        if record is None and key == 'id' and isinstance(value, str):
+            self._set_id(row, value)
+            return
+        record = self._materialize(row)
+        record[key] = value
+        if key == 'id':
+            self._set_id(row, value)
+
+    def _set_id(self, row: int, clip_id):
+        number = clip_id_number(clip_id)
+        self.number[row] = number
+        if number < 0:
+            self._other_ids[row] = clip_id if isinstance(clip_id, str) else None
+        else:
+            self._other_ids.pop(row, None)
+
+    def _delete(self, row: int, key):
+        record = self._materialize(row)
+        del record[key]
+        # A chave deixa de existir: as colunas param de sobrescrevê-la
+        if key == 'file_id':
+            self.file[row] = _NO_FILE
+        elif key in ('position', 'start', 'end'):
+            getattr(self, key)[row] = math.nan
+            self._touch(row)
+
+    def _materialize(self, row: int) -> MutableMapping:
+        """Converte a linha em um registro (dicionário) editável"""
+        record = self._records.get(row)
+        if record is None:
+            record = self._records[row] = self.record(row)
+        return record
+
+    def record(self, row: int) -> Dict:
+        """Dicionário do clip no formato do OpenShot"""
+        record = self._records.get(row)
+        ints = self._ints[row]
+        if record is None:
+            number = lambda column, key: _restore(column[row], ints & _INT_BIT[key])
+            return {
+                "id": self.clip_id(row),
+                "file_id": self.file_ids[self.file[row]],
+                "position": number(self.position, 'position'),
+                "start": number(self.start, 'start'),
+                "end": number(self.end, 'end'),
+                "layer": self.layer[row],
+                "alpha": static_curve(number(self.alpha, 'alpha')),
+                "location_x": static_curve(number(self.x, 'location_x')),
+                "location_y": static_curve(number(self.y, 'location_y')),
+                "scale_x": static_curve(number(self.scale_x, 'scale_x')),
+                "scale_y": static_curve(number(self.scale_y, 'scale_y')),
+            }
+        changes = self._changes(row, record)
+        if not changes:
+            to_dict = getattr(record, 'to_dict', None)
+            return to_dict() if to_dict is not None else record
+        result = dict(record.to_dict() if hasattr(record, 'to_dict') else record)
+        result.update(changes)
+        return result
+
+    def _changes(self, row: int, record) -> Dict:
+        """Valores das colunas que diferem do registro original"""
+        changes = {}
+        for key in _SHARED_KEYS:
+            try:
+                original = record[key] if key in record else None
+                if key == 'layer' and type(original) is not int:
+                    continue
+                value = self._column_value(row, key)
+            except KeyError:
+                continue
+            if original is None or value != original or type(value) is not type(original):
+                changes[key] = value
+        return changes
+
+    def _raw_json(self, row: int) -> Optional[str]:
+        record = self._records.get(row)
+        raw_json = getattr(record, 'raw_json', None)
+        if raw_json is None or self._changes(row, record):
+            return None
+        return raw_json()
+
+    # ------------------------------------------------------------------
+    # Operações em massa
+
+    def rows(self, layer: Optional[int] = None) -> List[int]:
+        """Índices das linhas (de uma camada, se informada)"""
+        if layer is None:
+            return list(range(len(self)))
+        if np is not None and len(self):
+            return np.flatnonzero(_view(self.layer) == layer).tolist()
+        return [row for row, value in enumerate(self.layer) if value == layer]
+
+    def _select(self, mask_np, test, layer: Optional[int]) -> List[int]:
+        """Linhas que satisfazem a condição (versão NumPy ou por linha)"""
+        if not len(self):
+            return []
+        if np is not None:
+            mask = mask_np()
+            if layer is not None:
+                mask &= _view(self.layer) == layer
+            return np.flatnonzero(mask).tolist()
+        layers = self.layer
+        return [row for row in range(len(self))
+                if (layer is None or layers[row] == layer) and test(row)]
+
+    def _clear_ints(self, rows: List[int], keys: Iterable[str]):
+        """Como no Python, int combinado com float vira float"""
+        mask = ~sum(_INT_BIT[key] for key in keys) & 0xFF
+        ints = self._ints
+        for row in rows:
+            ints[row] &= mask
+
+    def shift(self, after: float, delta: float, layer: Optional[int] = None) -> List[int]:
+        """
+        Desloca em `delta` segundos os clips que começam em `after` ou depois
+
+        Returns:
+            Linhas alteradas
+        """
+        position = self.position
+        rows = self._select(lambda: _view(position) >= after,
+                            lambda row: position[row] >= after, layer)
+        self._index = None
+        if np is not None and rows:
+            view = _view(position)
+            view[rows] += delta
+            del view
+        else:
+            for row in rows:
+                position[row] += delta
+        if type(delta) is not int:
+            self._clear_ints(rows, ('position',))
+        return rows
+
+    def retime(self, factor: float, origin: float = 0.0,
+               layer: Optional[int] = None) -> List[int]:
+        """
+        Multiplica o tempo por `factor` a partir de `origin`: a posição de cada
+        clip se afasta (ou se aproxima) de `origin` e a duração é escalada
+
+        Returns:
+            Linhas alteradas
+        """
+        if factor <= 0 or not math.isfinite(factor):
+            raise ValueError("O fator de tempo deve ser positivo")
+        rows = self.rows(layer)
+        self._index = None
+        if np is not None and rows:
+            position, start, end = _view(self.position), _view(self.start), _view(self.end)
+            position[rows] = origin + (position[rows] - origin) * factor
+            end[rows] = start[rows] + (end[rows] - start[rows]) * factor
+            del position, start, end
+        else:
+            position, start, end = self.position, self.start, self.end
+            for row in rows:
+                position[row] = origin + (position[row] - origin) * factor
+                end[row] = start[row] + (end[row] - start[row]) * factor
+        if type(factor) is not int or type(origin) is not int:
+            self._clear_ints(rows, ('position', 'end'))
+        return rows
+
+    def retime_frames(self, rate: FrameRate, factor: Fraction, origin: int = 0,
+                      layer: Optional[int] = None) -> List[int]:
+        """
+        Como retime(), com fator racional e em quadros inteiros: posições e
+        durações são convertidas em quadros, escaladas só com inteiros e
+        voltam a segundos alinhadas à grade (durações de pelo menos 1 quadro)
+
+        Returns:
+            Linhas alteradas
+        """
+        if factor <= 0:
+            raise ValueError("O fator de tempo deve ser positivo")
+        rows = self.rows(layer)
+        self._index = None
+        if np is not None and rows:
+            position, start, end = _view(self.position), _view(self.start), _view(self.end)
+            frames = scale_frames(rate.frames(position[rows]), factor, origin)
+            duration = scale_frames(rate.frames(end[rows] - start[rows]), factor)
+            position[rows] = rate.seconds(frames)
+            end[rows] = start[rows] + rate.seconds(np.maximum(duration, 1))
+            del position, start, end
+        else:
+            position, start, end = self.position, self.start, self.end
+            for row in rows:
+                duration = scale_frames(rate.to_frame(end[row] - start[row]), factor)
+                position[row] = rate.to_seconds(
+                    scale_frames(rate.to_frame(position[row]), factor, origin))
+                end[row] = start[row] + rate.to_seconds(max(duration, 1))
+        self._clear_ints(rows, ('position', 'end'))
+        return rows
+
+    def filter(self, layer: Optional[int] = None, rows: Optional[Iterable[int]] = None) -> 'ClipTable':
+        """Nova tabela com as linhas de uma camada (ou as linhas informadas)"""
+        table = ClipTable()
+        for row in (self.rows(layer) if rows is None else rows):
+            record = self._records.get(row)
+            if record is None:
+                table.append_values(*self._values(row))
+            else:
+                table.append(self.record(row))
+        return table
+
+    def _values(self, row: int) -> tuple:
+        ints = self._ints[row]
+        number = lambda column, key: _restore(column[row], ints & _INT_BIT[key])
+        return (self.clip_id(row), self.file_ids[self.file[row]],
+                number(self.position, 'position'), number(self.start, 'start'),
+                number(self.end, 'end'), self.layer[row],
+                number(self.alpha, 'alpha'), number(self.x, 'location_x'),
+                number(self.y, 'location_y'), number(self.scale_x, 'scale_x'),
+                number(self.scale_y, 'scale_y'))
+
+    # ------------------------------------------------------------------
+    # Consultas da timeline
+
+    def _touch(self, row: int):
+        """A linha mudou de camada ou de intervalo: sai do índice montado"""
+        if self._index is not None and row < self._indexed:
+            self._stale.add(row)
+
+    def _build_index(self):
+        """Ordena as linhas por (camada, início), O(n log n)"""
+        position, start, end, layers = self.position, self.start, self.end, self.layer
+        index = {}
+        if np is not None and len(self):
+            begin = _view(position)
+            finish = begin + _view(end) - _view(start)
+            valid = np.flatnonzero(~(np.isnan(begin) | np.isnan(finish)))
+            # lexsort é estável: empates ficam na ordem das linhas
+            order = valid[np.lexsort((begin[valid], _view(layers)[valid]))]
+            sorted_layers = _view(layers)[order]
+            for rows in np.split(order, np.flatnonzero(np.diff(sorted_layers)) + 1):
+                if len(rows):
+                    finishes = finish[rows]
+                    index[int(layers[rows[0]])] = (
+                        _packed('d', begin[rows]), _packed('q', rows), _packed('d', finishes),
+                        _packed('d', np.maximum.accumulate(finishes)))
+        else:
+            by_layer: Dict[int, List[int]] = {}
+            for row in range(len(self)):
+                finish = position[row] + end[row] - start[row]
+                if finish == finish:  # NaN: linha sem intervalo
+                    by_layer.setdefault(layers[row], []).append(row)
+            for layer, rows in by_layer.items():
+                rows.sort(key=position.__getitem__)
+                finishes = [position[row] + end[row] - start[row] for row in rows]
+                index[layer] = (array('d', (position[row] for row in rows)), array('q', rows),
+                                array('d', finishes), array('d', accumulate(finishes, max)))
+        self._index = index
+        self._indexed = len(self)
+        self._stale = set()
+
+    def _timeline_index(self, complete: bool = False):
+        """Índice atual; remontado se muitas linhas (ou, com complete, alguma) ficaram fora"""
+        pending = len(self) - self._indexed + len(self._stale)
+        if (self._index is None or pending > max(_INDEX_MIN_PENDING, self._indexed // 8)
+                or (complete and pending)):
+            self._build_index()
+        return self._index
+
+    def clips_in(self, t0: float, t1: float, layer: Optional[int] = None,
+                 closed: bool = False) -> List[ClipRow]:
+        """
+        Clips que aparecem em algum momento de [t0, t1) ([t0, t1] se closed),
+        por camada e em ordem de início, como no TimelineIndex
+
+        Em cada camada, bisect nos inícios ordenados limita as linhas que
+        começam antes de t1 e bisect no maior fim acumulado pula as que
+        terminaram antes de t0: O(log n + k) para clips de durações
+        parecidas.
+        """
+        position, start, end, layers = self.position, self.start, self.end, self.layer
+        index = self._timeline_index()
+        stale = self._stale
+        upper = bisect_right if closed else bisect_left
+        rows = []
+        for key in (sorted(index) if layer is None else [layer]):
+            entry = index.get(key)
+            if entry is None:
+                continue
+            starts, order, finishes, max_ends = entry
+            for j in range(bisect_right(max_ends, t0), upper(starts, t1)):
+                if finishes[j] > t0 and order[j] not in stale:
+                    rows.append(order[j])
+        # Linhas acrescentadas ou alteradas depois da montagem do índice
+        for row in chain(stale, range(self._indexed, len(self))):
+            if layer is not None and layers[row] != layer:
+                continue
+            begin = position[row]
+            if (begin <= t1 if closed else begin < t1) and begin + end[row] - start[row] > t0:
+                rows.append(row)
+        rows.sort(key=lambda row: (layers[row], position[row], row))
+        return [ClipRow(self, row) for row in rows]
+
+    def clips_at(self, t: float, layer: Optional[int] = None) -> List[ClipRow]:
+        """Clips visíveis no instante t"""
+        return self.clips_in(t, t, layer, closed=True)
+
+    def overlaps(self, layer: Optional[int] = None,
+                 rate: Optional[FrameRate] = None) -> List[Tuple[ClipRow, ClipRow]]:
+        """
+        Pares de clips que se sobrepõem na mesma camada, como em
+        TimelineIndex.overlaps, varrendo o índice em ordem de início
+        """
+        to_key = rate.to_frame if rate is not None else float
+        index = self._timeline_index(complete=True)
+        pairs = []
+        for key in (sorted(index) if layer is None else [layer]):
+            entry = index.get(key)
+            if entry is None:
+                continue
+            starts, order, finishes, _ = entry
+            active: List[Tuple[float, int]] = []
+            for j, row in enumerate(order):
+                begin = to_key(starts[j])
+                while active and active[0][0] <= begin:
+                    heapq.heappop(active)
+                for _, other in active:
+                    pairs.append((ClipRow(self, other), ClipRow(self, row)))
+                heapq.heappush(active, (to_key(finishes[j]), row))
+        return pairs
+
+
+class TableTimeline:
+    """
+    Consultas de timeline sobre uma ClipTable, com a mesma interface do
+    TimelineIndex; as colunas já são o índice, então add/remove não fazem nada
+    """
+
+    def __init__(self):
+        self.table = ClipTable()
+
+    def rebuild(self, clips):
+        self.table = clips
+
+    def add(self, clip):
+        pass
+
+    def remove(self, clip):
+        pass
+
+    def clips_at(self, t: float, layer: Optional[int] = None) -> List[ClipRow]:
+        return self.table.clips_at(t, layer)
+
+    def clips_in(self, t0: float, t1: float, layer: Optional[int] = None) -> List[ClipRow]:
+        return self.table.clips_in(t0, t1, layer)
+
+    def overlaps(self, layer: Optional[int] = None, rate: Optional[FrameRate] = None):
+        return self.table.overlaps(layer, rate)
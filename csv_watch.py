@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Modo de observação do timestamps.csv
+Mantém o projeto em memória e acompanha o CSV e as pastas das imagens.
+Linhas acrescentadas ao fim do CSV são lidas a partir do último byte já
+processado e viram clips novos; qualquer outra edição do CSV passa pela
+reconciliação (só as diferenças são aplicadas à camada). Imagens citadas
+que ainda não existem são esperadas nas suas pastas e entram no projeto
+quando aparecem. Rajadas de alterações (um editor salvando várias
+vezes, uma cópia de muitas fotos) são agrupadas: o .osp é gravado no
+máximo uma vez por janela
+
+No Linux o inotify (via ctypes) acorda o observador assim que algo muda;
+nos demais sistemas, ou se ele não estiver disponível, os arquivos são
+consultados periodicamente. Em ambos os casos quem decide o que mudou é
+a comparação de tamanho/data dos arquivos
+
+Uso:
+    python3 sync_from_csv.py --observar
+    python3 -m openshot_cli from-csv timestamps.csv -o video.osp --observar --journal
+"""
+
+import csv
+import ctypes
+import ctypes.util
+import io
+import os
+import select
+import sys
+import time
+
+from sync_from_csv import (LAYER_PADRAO, _detectar_dialeto, filtrar_linhas_csv,
+                           parsear_linhas)
+
+DEBOUNCE = 1.0           # Segundos sem alterações antes de aplicar
+ATRASO_MAXIMO = 10.0     # Aplica mesmo com alterações contínuas
+INTERVALO_POLLING = 0.5  # Entre consultas aos arquivos (sem inotify)
+
+# Eventos do inotify que indicam arquivos criados, alterados, movidos ou apagados
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_MASCARA_INOTIFY = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM
+                    | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+
+# Bytes antes do fim já lido que são comparados para distinguir um acréscimo
+# de uma reescrita do arquivo
+JANELA_VERIFICACAO = 4096
+
+
+class _Inotify:
+    """Descritor do inotify usado só para acordar o observador"""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            numero = ctypes.get_errno()
+            raise OSError(numero, os.strerror(numero))
+        self._pastas = set()
+
+    def observar(self, pasta):
+        """Passa a observar a pasta (pastas inexistentes são ignoradas)"""
+        if pasta in self._pastas:
+            return
+        if self._libc.inotify_add_watch(self._fd, os.fsencode(pasta), _MASCARA_INOTIFY) >= 0:
+            self._pastas.add(pasta)
+
+    def esperar(self, timeout):
+        """Espera por eventos; retorna True se algum chegou (os eventos são descartados)"""
+        prontos, _, _ = select.select([self._fd], [], [], timeout)
+        if not prontos:
+            return False
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def fechar(self):
+        os.close(self._fd)
+
+
+def criar_inotify():
+    """Inotify do sistema, ou None quando indisponível (o observador usa polling)"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return _Inotify()
+    except (OSError, AttributeError):
+        return None
+
+
+def _assinatura(caminho):
+    """(tamanho, data de modificação, inode) do arquivo, ou None se não existir"""
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def _presentes(pasta, nomes):
+    """Quais dos nomes existem na pasta (conjunto vazio se a pasta não existir)"""
+    try:
+        with os.scandir(pasta) as entradas:
+            return frozenset(e.name for e in entradas if e.name in nomes)
+    except OSError:
+        return frozenset()
+
+
+class ObservadorCSV:
+    """
+    Aplica ao projeto as alterações do CSV e das pastas de imagens
+
+    Do CSV ficam guardados só a posição (em bytes) do fim da última linha
+    completa, o inode e os últimos JANELA_VERIFICACAO bytes antes dessa
+    posição. Se o arquivo é o mesmo, não encolheu e esses bytes continuam
+    iguais, a alteração foi um acréscimo: só o que vem depois é lido. Senão
+    (arquivo substituído, truncado ou editado perto do fim) ele é relido e
+    a camada reconciliada. Uma edição no meio que mantém o tamanho e não
+    toca a janela não é percebida até a próxima reescrita.
+
+    Das linhas, ficam guardadas só as de imagens que ainda não existem,
+    agrupadas por pasta; só essas pastas são observadas.
+    """
+
+    def __init__(self, sync, arquivo_csv, layer=LAYER_PADRAO, delimitador=None,
+                 duracao_padrao=None, debounce=DEBOUNCE, atraso_maximo=ATRASO_MAXIMO,
+                 intervalo=INTERVALO_POLLING, journal=False, compacto=False, **posicao):
+        """
+        Args:
+            sync: OpenShotImageSync com o projeto já criado/carregado
+            arquivo_csv: CSV observado
+            layer: Camada sincronizada com o CSV
+            delimitador: Delimitador do CSV (None = detecta)
+            duracao_padrao: Duração das linhas sem duração
+            debounce: Segundos sem alterações antes de aplicar
+            atraso_maximo: Limite de espera com alterações contínuas
+            intervalo: Intervalo entre consultas sem inotify
+            journal, compacto: Repassados a save_project
+            posicao: x, y, scale_x, scale_y dos clips adicionados
+        """
+        self.sync = sync
+        self.arquivo_csv = arquivo_csv
+        self.layer = layer
+        self.delimitador = delimitador
+        self.duracao_padrao = duracao_padrao
+        self.debounce = debounce
+        self.atraso_maximo = atraso_maximo
+        self.intervalo = intervalo
+        self.journal = journal
+        self.compacto = compacto
+        self.posicao = posicao
+        self.salvamentos = 0
+
+        # Fim da última linha completa, seu inode e os bytes que a antecedem;
+        # _cauda indica que uma última linha sem '\n' já foi aplicada
+        self._offset = 0
+        self._inode = None
+        self._janela = b''
+        self._cauda = False
+        self._linhas_lidas = 0
+        self._dialeto = None
+
+        # Pasta -> nome -> linhas das imagens ainda ausentes, e pasta ->
+        # assinatura da pasta quando ela foi listada
+        self._ausentes = {}
+        self._pastas = {}
+        self._assinatura_csv = None
+        self._csv_alterado = False
+        self._midia_alterada = False
+        self._inotify = None
+
+    # ----- leitura do CSV -----
+
+    def _interpretar(self, dados, procurar_cabecalho):
+        """Linhas válidas de um trecho do CSV (bytes), numeradas a partir de _linhas_lidas"""
+        texto = io.StringIO(dados.decode('utf-8'), newline='')
+        if self.delimitador:
+            reader = csv.reader(texto, delimiter=self.delimitador)
+        else:
+            # O dialeto detectado na primeira leitura vale para os acréscimos
+            if self._dialeto is None:
+                self._dialeto = _detectar_dialeto(texto)
+            reader = csv.reader(texto, self._dialeto)
+        linhas = filtrar_linhas_csv(reader, procurar_cabecalho, self._linhas_lidas)
+        return list(parsear_linhas(linhas, duracao_padrao=self.duracao_padrao))
+
+    def _ler_csv(self):
+        """
+        Lê o que mudou no CSV e atualiza o estado
+
+        Returns:
+            Tupla (linhas, lido do zero): com acréscimo ao fim do arquivo,
+            só as linhas acrescentadas; senão todas as linhas
+        """
+        with open(self.arquivo_csv, 'rb') as f:
+            st = os.fstat(f.fileno())
+            # Completar uma última linha já aplicada exige reconciliar
+            acrescimo = (self._offset > 0 and not self._cauda and st.st_ino == self._inode
+                         and st.st_size >= self._offset)
+            if acrescimo:
+                f.seek(self._offset - len(self._janela))
+                acrescimo = f.read(len(self._janela)) == self._janela
+                self.sync.instrumentation.count('csv_bytes_read', len(self._janela))
+            if not acrescimo:
+                f.seek(0)
+                self._offset = 0
+                self._janela = b''
+                self._linhas_lidas = 0
+                self._dialeto = None
+            dados = f.read()
+
+        fim = dados.rfind(b'\n') + 1
+        novas = self._interpretar(dados[:fim], procurar_cabecalho=not acrescimo)
+        self.sync.instrumentation.count('csv_bytes_read', len(dados))
+        self._linhas_lidas += dados.count(b'\n', 0, fim)
+        if fim >= JANELA_VERIFICACAO:
+            self._janela = dados[fim - JANELA_VERIFICACAO:fim]
+        else:
+            self._janela = (self._janela + dados[:fim])[-JANELA_VERIFICACAO:]
+        self._offset += fim
+        self._inode = st.st_ino
+        # Uma última linha sem '\n' é aplicada, mas relida quando for completada
+        cauda = (self._interpretar(dados[fim:], procurar_cabecalho=self._offset == 0)
+                 if fim < len(dados) else [])
+        self._cauda = bool(cauda)
+        return novas + cauda, not acrescimo
+
+    # ----- detecção de alterações -----
+
+    def _atualizar_pastas(self, linhas, do_zero):
+        """
+        Guarda as linhas cujas imagens ainda não existem e observa as pastas
+        delas
+
+        Só as imagens citadas contam: o próprio projeto, o diário e outros
+        arquivos salvos nas mesmas pastas não disparam nada.
+        """
+        if do_zero:
+            self._ausentes = {}
+            self._pastas = {}
+        por_pasta = {}
+        for linha in linhas:
+            caminho = os.path.abspath(linha[0])
+            por_pasta.setdefault(os.path.dirname(caminho), {}).setdefault(
+                os.path.basename(caminho), []).append(linha)
+        for pasta, nomes in por_pasta.items():
+            assinatura = _assinatura(pasta)
+            presentes = _presentes(pasta, nomes)
+            if len(presentes) == len(nomes):
+                continue
+            ausentes = self._ausentes.setdefault(pasta, {})
+            for nome, linhas_imagem in nomes.items():
+                if nome not in presentes:
+                    ausentes.setdefault(nome, []).extend(linhas_imagem)
+            # Uma pasta já observada mantém a assinatura antiga: imagens que
+            # surgiram desde então ainda serão notadas
+            if pasta not in self._pastas:
+                self._pastas[pasta] = assinatura
+                if self._inotify is not None:
+                    self._inotify.observar(pasta)
+
+    def _linhas_surgidas(self):
+        """Tira das pendências e retorna as linhas das imagens que passaram a existir"""
+        linhas = []
+        for pasta, ausentes in list(self._ausentes.items()):
+            for nome in _presentes(pasta, ausentes):
+                linhas.extend(ausentes.pop(nome))
+            if not ausentes:
+                del self._ausentes[pasta]
+                del self._pastas[pasta]
+        return linhas
+
+    def verificar(self):
+        """Registra se o CSV mudou ou se alguma imagem esperada apareceu"""
+        mudou = False
+        assinatura = _assinatura(self.arquivo_csv)
+        if assinatura != self._assinatura_csv:
+            self._assinatura_csv = assinatura
+            self._csv_alterado = mudou = True
+        for pasta, anterior in self._pastas.items():
+            # Arquivos criados, apagados ou renomeados mudam a data da pasta;
+            # só então a pasta é listada
+            atual = _assinatura(pasta)
+            if atual == anterior:
+                continue
+            self._pastas[pasta] = atual
+            if _presentes(pasta, self._ausentes[pasta]):
+                self._midia_alterada = mudou = True
+        return mudou
+
+    # ----- aplicação -----
+
+    def sincronizar(self):
+        """Leitura completa inicial: reconcilia a camada com o CSV e salva"""
+        self._assinatura_csv = _assinatura(self.arquivo_csv)
+        self._offset = 0
+        linhas, _ = self._ler_csv()
+        self._atualizar_pastas(linhas, do_zero=True)
+        self.sync.reconcile_images(linhas, self.layer, **self.posicao)
+        self._csv_alterado = self._midia_alterada = False
+        return self._salvar()
+
+    def aplicar(self):
+        """
+        Aplica as alterações registradas e salva o projeto uma vez (se
+        algum clip mudou)
+
+        Returns:
+            Relatório com as chaves added, reconciled e saved
+        """
+        relatorio = {'added': 0, 'reconciled': False, 'saved': False}
+        with self.sync.instrumentation.stage('watch_apply') as metrics:
+            novas = []
+            if self._midia_alterada:
+                # Imagens novas precisam aparecer nas listagens em cache
+                self.sync.media_resolver.clear()
+                novas = self._linhas_surgidas()
+            do_zero = False
+            if self._csv_alterado:
+                try:
+                    linhas, do_zero = self._ler_csv()
+                except FileNotFoundError:
+                    # Arquivo sendo substituído pelo editor: tenta de novo na próxima janela
+                    self.sync.console.message(f"⚠️  {self.arquivo_csv} não encontrado")
+                    return relatorio
+                except (OSError, UnicodeDecodeError, csv.Error) as e:
+                    self.sync.console.message(f"⚠️  Erro ao ler {self.arquivo_csv}: {e}")
+                    self._csv_alterado = False
+                    return relatorio
+                self._atualizar_pastas(linhas, do_zero)
+                novas = linhas if do_zero else novas + linhas
+            self._csv_alterado = self._midia_alterada = False
+
+            alterou = False
+            if do_zero:
+                resultado = self.sync.reconcile_images(novas, self.layer, **self.posicao)
+                relatorio['reconciled'] = True
+                alterou = any(resultado[chave]
+                              for chave in ('added', 'removed', 'moved', 'retimed'))
+            elif novas:
+                relatorio['added'] = self.sync.add_images_batch(
+                    [imagem for imagem, _, _ in novas], [ts for _, ts, _ in novas],
+                    [duracao for _, _, duracao in novas], self.layer, **self.posicao)
+                self.sync.console.message(f"✓ {relatorio['added']}/{len(novas)} "
+                                          f"imagens acrescentadas")
+                alterou = relatorio['added'] > 0
+            if alterou:
+                relatorio['saved'] = self._salvar()
+            metrics.update(relatorio)
+        return relatorio
+
+    def _salvar(self):
+        salvo = self.sync.save_project(journal=self.journal, compact=self.compacto)
+        if salvo:
+            self.salvamentos += 1
+        return salvo
+
+    def executar(self, duracao=None):
+        """
+        Observa até Ctrl+C (ou por `duracao` segundos)
+
+        Alterações pendentes ao sair são aplicadas antes de retornar.
+        """
+        self._inotify = criar_inotify()
+        modo = "inotify" if self._inotify is not None else f"consulta a cada {self.intervalo}s"
+        try:
+            self.sincronizar()
+            self.sync.console.message(f"\n👀 Observando {self.arquivo_csv} e "
+                                      f"{len(self._pastas)} pasta(s) com imagens ainda ausentes "
+                                      f"({modo}). Ctrl+C encerra.")
+            if self._inotify is not None:
+                # A pasta do CSV também: editores costumam salvar renomeando
+                self._inotify.observar(os.path.dirname(os.path.abspath(self.arquivo_csv)))
+                for pasta in self._pastas:
+                    self._inotify.observar(pasta)
+            inicio = time.monotonic()
+            primeira = ultima = None
+            try:
+                while duracao is None or time.monotonic() - inicio < duracao:
+                    if self._inotify is not None:
+                        # Sem eventos, ainda consulta de vez em quando (pastas criadas depois)
+                        espera = self.debounce if primeira is not None else self.intervalo * 4
+                        self._inotify.esperar(espera)
+                    else:
+                        time.sleep(self.intervalo)
+                    agora = time.monotonic()
+                    if self.verificar():
+                        ultima = agora
+                        if primeira is None:
+                            primeira = agora
+                    if primeira is not None and (agora - ultima >= self.debounce
+                                                 or agora - primeira >= self.atraso_maximo):
+                        primeira = ultima = None
+                        self.aplicar()
+            except KeyboardInterrupt:
+                pass
+            if self.verificar() or self._csv_alterado or self._midia_alterada:
+                self.aplicar()
+        finally:
+            if self._inotify is not None:
+                self._inotify.fechar()
+                self._inotify = None
+        self.sync.console.message(f"\n✓ Observação encerrada ({self.salvamentos} salvamentos)")
+        return self.salvamentos
@@ -58,6 +58,7 @@ def exemplo_apresentacao_corporativa():
     sync.create_new_project(width=1920, height=1080, fps=30)
     
     # Logo da empresa (fica o tempo todo, canto superior direito)
+    # Com 230 px de largura, qualquer que seja o tamanho do arquivo
     sync.add_image_at_timestamp(
         image_path="logo_empresa.png",
         timestamp=0.0,
@@ -65,14 +66,14 @@ def exemplo_apresentacao_corporativa():
         layer=5,
         x=0.88,
         y=0.05,
-        scale_x=0.12,
-        scale_y=0.12
+        fit="fixed-width",
+        fit_width=230
     )
     
-    # Slide de título
+    # Slide de título (preenche a tela mesmo se não for 16:9)
     sync.add_image_at_timestamp(
         "titulo_apresentacao.png",
-        0.0, 8.0, layer=2
+        0.0, 8.0, layer=2, fit="cover"
     )
     
     # Seção 1: Visão Geral
@@ -87,7 +88,8 @@ def exemplo_apresentacao_corporativa():
         ("grafico_lucro.png", 50.0, 10.0),
         ("grafico_crescimento.png", 65.0, 12.0),
     ]
-    sync.add_multiple_images(graficos_financeiros, layer=2)
+    # Gráficos inteiros na tela, com faixas se a proporção for diferente
+    sync.add_multiple_images(graficos_financeiros, layer=2, fit="contain")
     
     # Seção 3: Planos Futuros
     sync.add_image_at_timestamp(
@@ -242,16 +244,18 @@ def exemplo_galeria_fotos_automatica():
     print("EXEMPLO: Galeria de Fotos Automática")
     print("="*60)
     
-    import os
-    import glob
+    from gallery_scan import scan_gallery
     
-    # Busca todas as imagens em uma pasta
+    # Busca todas as imagens da pasta e das subpastas (.JPG, .jpeg, .png...),
+    # em ordem natural do nome; sort="capture" usa a data em que a foto foi
+    # tirada e limit=... pega só as primeiras, sem listar tudo em memória
     pasta_fotos = "minhas_fotos/"  # Altere para sua pasta
-    extensoes = ['*.jpg', '*.jpeg', '*.png', '*.gif']
+    extensoes = ['jpg', 'jpeg', 'png', 'gif']
     
-    fotos = []
-    for ext in extensoes:
-        fotos.extend(glob.glob(os.path.join(pasta_fotos, ext)))
+    try:
+        fotos = list(scan_gallery(pasta_fotos, extensoes, sort="name"))
+    except OSError:
+        fotos = []
     
     if not fotos:
         print(f"⚠️  Nenhuma foto encontrada em {pasta_fotos}")
@@ -315,18 +319,19 @@ def exemplo_multiplas_layers():
         x=0.5, y=0.5, scale_x=1.2, scale_y=1.2
     )
     
-    # Layer 4: Legendas
+    # Layers 4 a 6: Legendas (se sobrepõem na transição; cada uma vai
+    # para a menor camada da faixa que estiver livre)
     legendas = [
-        ("legenda1.png", 0.0, 10.0),
-        ("legenda2.png", 10.0, 10.0),
+        ("legenda1.png", 0.0, 12.0),
+        ("legenda2.png", 10.0, 12.0),
         ("legenda3.png", 20.0, 10.0),
     ]
-    sync.add_multiple_images(legendas, layer=4)
+    sync.add_multiple_images(legendas, layer="auto", layer_band=(4, 6))
     
-    # Layer 5: Logo (sempre no topo)
+    # Layer 7: Logo (sempre no topo)
     sync.add_image_at_timestamp(
         "logo.png",
-        0.0, 60.0, layer=5,
+        0.0, 60.0, layer=7,
         x=0.9, y=0.05, scale_x=0.1, scale_y=0.1
     )
     
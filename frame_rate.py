@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Taxa de quadros racional e conversões entre segundos e quadros
+O OpenShot guarda o fps como fração (num/den); 29.97 fps é 30000/1001, não
+30. Os clips continuam guardados em segundos (float), como no .osp; estas
+funções servem às operações que precisam da grade de quadros (posições de
+add_images_at_interval, mudança de velocidade racional, comparação de
+sobreposições), que convertem para quadros inteiros, fazem a conta com
+inteiros e devolvem segundos
+"""
+
+import math
+from fractions import Fraction
+from typing import Dict, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+# Taxas NTSC: 23.976, 29.97, 59.94... são n * 1000/1001
+_NTSC_BASES = (24, 30, 48, 60, 120, 240)
+
+RationalLike = Union[int, float, str, Fraction]
+
+
+def parse_rational(value: RationalLike) -> Fraction:
+    """
+    Converte 2, 1.25, "3/2", "1.25" ou Fraction em fração exata
+
+    Floats viram a fração de menor denominador (até 1000000) que os
+    representa, então 1.1 é 11/10 e não o valor binário do float.
+    """
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Valor inválido: {value}")
+        return Fraction(value).limit_denominator(1000000)
+    if isinstance(value, str):
+        return Fraction(value.strip())
+    return Fraction(value)
+
+
+def _round_div(numerator, denominator):
+    """Divisão inteira arredondada para o inteiro mais próximo (meio para cima)"""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+class FrameRate:
+    """
+    Taxa de quadros exata (num/den quadros por segundo)
+
+    Quadro n começa em n * den / num segundos. As conversões em massa usam
+    o NumPy quando disponível.
+    """
+
+    __slots__ = ('num', 'den')
+
+    def __init__(self, num: int, den: int = 1):
+        if num <= 0 or den <= 0:
+            raise ValueError(f"Taxa de quadros inválida: {num}/{den}")
+        divisor = math.gcd(num, den)
+        self.num = num // divisor
+        self.den = den // divisor
+
+    @classmethod
+    def from_value(cls, fps: Union[RationalLike, Dict, 'FrameRate']) -> 'FrameRate':
+        """
+        Taxa a partir de 30, 29.97, "30000/1001", Fraction ou {"num", "den"}
+
+        Floats próximos de uma taxa NTSC (23.976, 29.97, 59.94...) viram a
+        fração exata n*1000/1001.
+        """
+        if isinstance(fps, FrameRate):
+            return fps
+        if isinstance(fps, dict):
+            return cls(int(fps['num']), int(fps.get('den', 1)))
+        if isinstance(fps, float) and not fps.is_integer():
+            for base in _NTSC_BASES:
+                if abs(fps - base * 1000 / 1001) < 0.005:
+                    return cls(base * 1000, 1001)
+        rate = parse_rational(fps)
+        return cls(rate.numerator, rate.denominator)
+
+    @property
+    def fraction(self) -> Fraction:
+        return Fraction(self.num, self.den)
+
+    def as_dict(self) -> Dict[str, int]:
+        """Formato do .osp: {"num": ..., "den": ...}"""
+        return {"num": self.num, "den": self.den}
+
+    def __float__(self) -> float:
+        return self.num / self.den
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, FrameRate)
+                and (self.num, self.den) == (other.num, other.den))
+
+    def __hash__(self) -> int:
+        return hash((self.num, self.den))
+
+    def __str__(self) -> str:
+        if self.den == 1:
+            return str(self.num)
+        return f"{self.num / self.den:.3f}".rstrip('0').rstrip('.')
+
+    def __repr__(self) -> str:
+        return f"FrameRate({self.num}, {self.den})"
+
+    # ----- conversões -----
+
+    def to_frame(self, seconds: float) -> int:
+        """Quadro mais próximo do instante (em segundos)"""
+        return math.floor(seconds * self.num / self.den + 0.5)
+
+    def to_seconds(self, frame: int) -> float:
+        """
+        Início do quadro em segundos, como float
+
+        É uma divisão de ponto flutuante, não inteira: com `frame` inteiro o
+        resultado é o float mais próximo de frame * den / num (a divisão
+        entre inteiros do Python arredonda corretamente), mas só a fração
+        Fraction(frame) / self.fraction é exata.
+        """
+        return frame * self.den / self.num
+
+    def snap(self, seconds: float) -> float:
+        """Instante alinhado ao quadro mais próximo"""
+        return self.to_seconds(self.to_frame(seconds))
+
+    def frames(self, seconds: Sequence[float]):
+        """to_frame() de uma coluna inteira (array int64 com NumPy, senão lista)"""
+        if np is not None:
+            return np.floor(np.asarray(seconds, dtype=np.float64) * self.num / self.den
+                            + 0.5).astype(np.int64)
+        return [self.to_frame(value) for value in seconds]
+
+    def seconds(self, frames: Sequence[int]):
+        """to_seconds() de uma coluna inteira"""
+        if np is not None and not isinstance(frames, list):
+            return np.asarray(frames, dtype=np.int64) * self.den / self.num
+        return [self.to_seconds(frame) for frame in frames]
+
+    # ----- aritmética em quadros -----
+
+    def grid(self, start: RationalLike, step: RationalLike, count: int) -> List[int]:
+        """
+        Quadros de start, start + step, start + 2*step... (em segundos)
+
+        Cada quadro é calculado a partir do índice, com frações exatas, e
+        não somando o passo: o erro não se acumula ao longo da sequência.
+        """
+        start, step = parse_rational(start), parse_rational(step)
+        # (start + i*step) * num/den = (a + i*b) / d
+        d = start.denominator * step.denominator * self.den
+        a = start.numerator * step.denominator * self.num
+        b = step.numerator * start.denominator * self.num
+        return [_round_div(a + i * b, d) for i in range(count)]
+
+
+def scale_frames(frames, factor: Fraction, origin: int = 0):
+    """
+    origin + (frame - origin) * factor, arredondado para o quadro mais próximo
+
+    Aceita um inteiro, uma lista ou um array int64 do NumPy (a conta é a
+    mesma: só inteiros, sem ponto flutuante).
+    """
+    p, q = factor.numerator, factor.denominator
+    if isinstance(frames, int):
+        return origin + _round_div((frames - origin) * p, q)
+    if np is not None and not isinstance(frames, list):
+        return origin + (2 * (frames - origin) * p + q) // (2 * q)
+    return [origin + _round_div((frame - origin) * p, q) for frame in frames]
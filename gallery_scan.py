@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Listagem das imagens de uma galeria (pasta e subpastas)
+Percorre os diretórios com os.scandir, sem montar a lista inteira: as
+imagens são produzidas sob demanda, a extensão é comparada com um
+conjunto (sem distinguir maiúsculas) e a ordenação com limite/deslocamento
+guarda só as imagens que serão devolvidas
+"""
+
+import heapq
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional
+
+from image_probe import DEFAULT_WORKERS, probe_capture_time
+
+DEFAULT_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'})
+
+# Ordenações de scan_gallery()
+SORT_NONE = "none"
+SORT_NAME = "name"
+SORT_MTIME = "mtime"
+SORT_CAPTURE = "capture"
+SORT_MODES = (SORT_NONE, SORT_NAME, SORT_MTIME, SORT_CAPTURE)
+
+# Imagens cujas datas de captura são lidas por vez (em paralelo)
+_CAPTURE_CHUNK = 512
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def normalize_extensions(extensions: Iterable[str]) -> frozenset:
+    """{"JPG", ".png", "webp"} -> {".jpg", ".png", ".webp"}"""
+    return frozenset('.' + ext.strip().lower().lstrip('.') for ext in extensions
+                     if ext.strip())
+
+
+def natural_key(text: str) -> list:
+    """
+    Chave de ordenação natural: "foto2" vem antes de "foto10"
+
+    Os trechos numéricos são comparados como inteiros e o restante sem
+    distinguir maiúsculas.
+    """
+    parts = _DIGITS.split(text.casefold())
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+
+def iter_images(root: str, extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+                recursive: bool = True) -> Iterator[os.DirEntry]:
+    """
+    Imagens de root (e das subpastas), na ordem em que o disco as lista
+
+    Links simbólicos para diretórios não são seguidos (evita ciclos) e
+    subpastas que não podem ser lidas são ignoradas.
+
+    Returns:
+        Iterador de os.DirEntry; o stat() de cada entrada só é feito se
+        for pedido, e fica em cache na própria entrada
+
+    Raises:
+        OSError: Se root não puder ser listado (na primeira iteração)
+    """
+    extensions = normalize_extensions(extensions)
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            if directory is root:
+                raise
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif (os.path.splitext(entry.name)[1].lower() in extensions
+                          and entry.is_file()):
+                        yield entry
+                except OSError:  # Apagado durante a listagem
+                    continue
+
+
+def _name_key(entry: os.DirEntry) -> list:
+    return natural_key(entry.path)
+
+
+def _mtime_key(entry: os.DirEntry):
+    return entry.stat().st_mtime_ns, entry.path
+
+
+def _with_capture_keys(entries: Iterator[os.DirEntry], max_workers: int) -> Iterator[tuple]:
+    """
+    (chave, entrada) com a data de captura, lida em paralelo por blocos
+
+    Imagens sem data no EXIF usam a data de modificação.
+    """
+    def key(entry):
+        taken = probe_capture_time(entry.path)
+        seconds = taken.timestamp() if taken is not None else entry.stat().st_mtime
+        return seconds, entry.path
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            chunk = list(islice(entries, _CAPTURE_CHUNK))
+            if not chunk:
+                return
+            yield from zip(pool.map(key, chunk), chunk)
+
+
+def scan_gallery(root: str, extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+                 sort: str = SORT_NAME, reverse: bool = False, offset: int = 0,
+                 limit: Optional[int] = None, recursive: bool = True,
+                 max_workers: int = DEFAULT_WORKERS) -> Iterator[str]:
+    """
+    Caminhos das imagens de uma galeria, ordenados e paginados
+
+    Sem ordenação ("none"), a listagem para assim que offset + limit
+    imagens forem encontradas. Com ordenação e limite, só as offset + limit
+    primeiras imagens ficam em memória (heap); sem limite, a galeria
+    inteira é ordenada. Por data de captura, o cabeçalho de cada imagem
+    precisa ser lido, o que é feito em paralelo.
+
+    Args:
+        root: Pasta da galeria
+        extensions: Extensões aceitas (com ou sem ponto, qualquer caixa)
+        sort: "name" (ordem natural do caminho), "mtime" (modificação),
+            "capture" (EXIF DateTimeOriginal, ou modificação) ou "none"
+        reverse: Ordem decrescente
+        offset: Imagens puladas do início (após a ordenação)
+        limit: Máximo de imagens devolvidas (None = todas)
+        recursive: Inclui as subpastas
+        max_workers: Threads da leitura das datas de captura
+
+    Returns:
+        Iterador de caminhos
+
+    Raises:
+        ValueError: Se sort, offset ou limit forem inválidos
+        OSError: Se root não puder ser listado (na primeira iteração)
+    """
+    if sort not in SORT_MODES:
+        raise ValueError(f"Ordenação inválida: {sort!r} (use {', '.join(SORT_MODES)})")
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset e limit não podem ser negativos")
+    return _scan(root, extensions, sort, reverse, offset, limit, recursive, max_workers)
+
+
+def _scan(root, extensions, sort, reverse, offset, limit, recursive, max_workers):
+    entries = iter_images(root, extensions, recursive)
+    stop = None if limit is None else offset + limit
+    if sort == SORT_NONE:
+        for entry in islice(entries, offset, stop):
+            yield entry.path
+        return
+
+    if sort == SORT_CAPTURE:
+        keyed = _with_capture_keys(entries, max_workers)
+    else:
+        key = _name_key if sort == SORT_NAME else _mtime_key
+        keyed = ((key(entry), entry) for entry in entries)
+    first = itemgetter(0)
+    if stop is None:
+        ordered: List[tuple] = sorted(keyed, key=first, reverse=reverse)
+    elif reverse:
+        ordered = heapq.nlargest(stop, keyed, key=first)
+    else:
+        ordered = heapq.nsmallest(stop, keyed, key=first)
+    for _, entry in islice(ordered, offset, None):
+        yield entry.path
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Leitura das dimensões de imagens pelo cabeçalho
+Lê apenas os primeiros bytes do arquivo, sem decodificar a imagem
+(PNG, JPEG, GIF, BMP e WebP), calcula a escala do clip para cada modo
+de enquadramento (contain, cover, fixed-width) e lê a data de captura
+gravada no EXIF dos JPEG
+
+Benchmark: python3 benchmark_probe.py
+"""
+
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+# Bytes lidos de uma vez; suficiente para PNG, GIF, BMP e WebP e para a
+# maioria dos JPEG (quando o marcador SOF vem depois, o restante é lido em blocos)
+HEADER_BYTES = 512
+DEFAULT_WORKERS = 8
+
+# Modos de enquadramento de fit_scale()
+FIT_CONTAIN = "contain"
+FIT_COVER = "cover"
+FIT_FIXED_WIDTH = "fixed-width"
+FIT_MODES = (FIT_CONTAIN, FIT_COVER, FIT_FIXED_WIDTH)
+
+
+def _probe_png(head: bytes):
+    if head[12:16] == b'IHDR' and len(head) >= 24:
+        return struct.unpack('>II', head[16:24])
+    return None
+
+
+def _probe_gif(head: bytes):
+    if len(head) >= 10:
+        return struct.unpack('<HH', head[6:10])
+    return None
+
+
+def _probe_bmp(head: bytes):
+    if len(head) < 26:
+        return None
+    header_size = struct.unpack('<I', head[14:18])[0]
+    if header_size == 12:  # BITMAPCOREHEADER
+        return struct.unpack('<HH', head[18:22])
+    width, height = struct.unpack('<ii', head[18:26])
+    return abs(width), abs(height)
+
+
+def _probe_webp(head: bytes):
+    if len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ':  # Com perdas: quadro-chave começa com 9d 01 2a
+        if head[23:26] != b'\x9d\x01\x2a':
+            return None
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':  # Sem perdas: 14 bits de largura-1 e de altura-1
+        if head[20] != 0x2F:
+            return None
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':  # Estendido: 24 bits de largura-1 e de altura-1
+        return (int.from_bytes(head[24:27], 'little') + 1,
+                int.from_bytes(head[27:30], 'little') + 1)
+    return None
+
+
+# Marcadores SOF (Start Of Frame) que trazem as dimensões do JPEG
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+             0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _probe_jpeg(f, head: bytes):
+    data = head
+    pos = 2
+    while True:
+        # Garante o cabeçalho do segmento (marcador + tamanho + 5 bytes do SOF)
+        while len(data) < pos + 9:
+            chunk = f.read(4096)
+            if not chunk:
+                return None
+            data += chunk
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Bytes de preenchimento
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # Sem tamanho
+            pos += 2
+            continue
+        length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return width, height
+        if marker in (0xD9, 0xDA):  # Fim da imagem / início dos dados
+            return None
+        pos += 2 + length
+        # Pula segmentos grandes (EXIF, miniaturas) sem lê-los
+        if pos > len(data):
+            f.seek(pos - len(data), 1)
+            data = b''
+            pos = 0
+        elif pos > 65536:
+            data = data[pos:]
+            pos = 0
+
+
+def probe_image(path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Identifica o formato e as dimensões de uma imagem
+
+    Returns:
+        Tupla (formato, largura, altura) ou None se o formato não for
+        reconhecido
+
+    Raises:
+        OSError: Se o arquivo não puder ser lido
+    """
+    with open(path, 'rb') as f:
+        head = f.read(HEADER_BYTES)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            fmt, size = 'png', _probe_png(head)
+        elif head[:6] in (b'GIF87a', b'GIF89a'):
+            fmt, size = 'gif', _probe_gif(head)
+        elif head.startswith(b'BM'):
+            fmt, size = 'bmp', _probe_bmp(head)
+        elif head.startswith(b'\xff\xd8'):
+            fmt, size = 'jpeg', _probe_jpeg(f, head)
+        elif head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            fmt, size = 'webp', _probe_webp(head)
+        else:
+            return None
+    if size is None:
+        return None
+    return fmt, size[0], size[1]
+
+
+# Tags EXIF com a data: DateTimeOriginal (no IFD Exif) e DateTime (no IFD0)
+_EXIF_IFD_POINTER = 0x8769
+_EXIF_DATETIME_ORIGINAL = 0x9003
+_EXIF_DATETIME = 0x0132
+
+
+def _read_ifd(tiff: bytes, order: str, offset: int) -> Dict[int, Tuple[int, int, int]]:
+    """Entradas de um IFD: tag -> (tipo, quantidade, posição do valor no bloco TIFF)"""
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    entries = {}
+    for i in range(count):
+        start = offset + 2 + i * 12
+        tag, kind, items = struct.unpack(order + 'HHI', tiff[start:start + 8])
+        # Valores de até 4 bytes ficam na própria entrada; os demais, no offset
+        if kind == 2 and items > 4:
+            value = struct.unpack(order + 'I', tiff[start + 8:start + 12])[0]
+        else:
+            value = start + 8
+        entries[tag] = (kind, items, value)
+    return entries
+
+
+def _exif_datetime(tiff: bytes) -> Optional[datetime]:
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None:
+        return None
+    ifd0 = _read_ifd(tiff, order, struct.unpack(order + 'I', tiff[4:8])[0])
+    candidates = []
+    if _EXIF_IFD_POINTER in ifd0:
+        pointer = struct.unpack(order + 'I', tiff[ifd0[_EXIF_IFD_POINTER][2]:][:4])[0]
+        candidates.append(_read_ifd(tiff, order, pointer).get(_EXIF_DATETIME_ORIGINAL))
+    candidates.append(ifd0.get(_EXIF_DATETIME))
+    for entry in candidates:
+        if entry is None or entry[0] != 2:
+            continue
+        text = tiff[entry[2]:entry[2] + 19].decode('ascii', 'replace')
+        try:
+            return datetime.strptime(text, '%Y:%m:%d %H:%M:%S')
+        except ValueError:  # "0000:00:00 00:00:00" e afins
+            continue
+    return None
+
+
+def probe_capture_time(path: str) -> Optional[datetime]:
+    """
+    Data de captura (EXIF DateTimeOriginal, ou DateTime) de um JPEG
+
+    Percorre só os segmentos do cabeçalho até o APP1 (EXIF) e lê apenas
+    esse segmento (no máximo 64 KB), nunca os dados da imagem.
+
+    Returns:
+        Data e hora locais da câmera (sem fuso), ou None se o arquivo não
+        for JPEG, não tiver EXIF ou não puder ser lido
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(2) != b'\xff\xd8':
+                return None
+            while True:
+                marker = f.read(4)
+                if len(marker) < 4 or marker[0] != 0xFF or marker[1] in (0xD9, 0xDA):
+                    return None
+                length = struct.unpack('>H', marker[2:])[0]
+                if marker[1] == 0xE1:
+                    segment = f.read(length - 2)
+                    if segment.startswith(b'Exif\x00\x00'):
+                        return _exif_datetime(segment[6:])
+                elif marker[1] in _JPEG_SOF:  # O EXIF sempre vem antes do quadro
+                    return None
+                else:
+                    f.seek(length - 2, 1)
+    except (OSError, struct.error, IndexError):
+        return None
+
+
+def _safe_probe(path: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        return probe_image(path)
+    except (OSError, struct.error, IndexError):
+        return None
+
+
+def probe_images(paths: Iterable[str],
+                 max_workers: int = DEFAULT_WORKERS) -> Dict[str, Optional[Tuple[str, int, int]]]:
+    """
+    Dimensões de várias imagens, lidas em paralelo
+
+    A leitura é limitada pela abertura dos arquivos (o GIL é liberado
+    durante o I/O), então threads bastam; os caminhos são distribuídos em
+    blocos para reduzir o custo de agendamento.
+
+    Returns:
+        Dicionário caminho -> (formato, largura, altura), ou None para
+        arquivos inexistentes, ilegíveis ou de formato não reconhecido
+    """
+    unique = list(dict.fromkeys(paths))
+    workers = min(max_workers, max(1, len(unique) // 256))
+    if workers <= 1:
+        return {path: _safe_probe(path) for path in unique}
+    size = -(-len(unique) // (workers * 4))
+    chunks = [unique[i:i + size] for i in range(0, len(unique), size)]
+    result = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk, probes in zip(chunks, pool.map(
+                lambda chunk: [_safe_probe(path) for path in chunk], chunks)):
+            result.update(zip(chunk, probes))
+    return result
+
+
+def fit_scale(mode: str, width: int, height: int, frame_width: int, frame_height: int,
+              target_width: Optional[float] = None) -> Tuple[float, float]:
+    """
+    scale_x/scale_y do clip para enquadrar a imagem no quadro do projeto
+
+    O OpenShot primeiro ajusta a imagem ao quadro mantendo a proporção
+    (escala 1 = "contain") e depois aplica a escala do clip, que aqui é
+    calculada a partir dessa base:
+
+        contain: a imagem inteira aparece, com faixas se a proporção
+            for diferente (1.0, 1.0)
+        cover: a imagem preenche o quadro, cortando as sobras
+        fixed-width: a imagem fica com target_width pixels de largura
+            (padrão: a largura do quadro), mantendo a proporção
+
+    Returns:
+        Tupla (scale_x, scale_y), sempre iguais (nunca distorce)
+    """
+    if mode not in FIT_MODES:
+        raise ValueError(f"Modo de enquadramento inválido: {mode!r} "
+                         f"(use {', '.join(FIT_MODES)})")
+    if width <= 0 or height <= 0 or mode == FIT_CONTAIN:
+        return 1.0, 1.0
+    fit = min(frame_width / width, frame_height / height)
+    if mode == FIT_COVER:
+        scale = max(frame_width / width, frame_height / height) / fit
+    else:
+        scale = (target_width or frame_width) / width / fit
+    return scale, scale
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Instrumentação do sincronizador
+Cronômetros por etapa e contadores (clips adicionados, mídias ausentes,
+bytes gravados...) enviados a um callback ou ao logging, saída no terminal
+em modo normal, de progresso agrupado ou silencioso, e ganchos opcionais de
+cProfile/tracemalloc ligados por execução
+"""
+
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+OUTPUT_MODES = ("normal", "progress", "quiet")
+DEFAULT_PROGRESS_EVERY = 1000
+
+logger = logging.getLogger("openshot_sync")
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    text = str(value)
+    return f'"{text}"' if not text or " " in text or "=" in text else text
+
+
+def format_event(event: Dict) -> str:
+    """Formata um evento como pares chave=valor (uma linha, fácil de interpretar)"""
+    return " ".join(f"{key}={_format_value(value)}" for key, value in event.items())
+
+
+class Instrumentation:
+    """
+    Coleta cronômetros e contadores e os envia a um callback e/ou ao logging
+
+    Os contadores só acumulam (não geram eventos), então podem ser
+    incrementados por clip sem custo perceptível; cada etapa cronometrada
+    gera um evento {'event': 'stage', 'stage': ..., 'seconds': ..., ...}.
+    Contadores e tempos podem ser atualizados de várias threads (o servidor
+    de projetos compartilha uma instância entre os projetos).
+    """
+
+    def __init__(self, callback: Optional[Callable[[Dict], None]] = None,
+                 log: Optional[logging.Logger] = None, level: int = logging.INFO,
+                 trace_memory: bool = False):
+        """
+        Args:
+            callback: Função chamada com o dicionário de cada evento
+            log: Logger que recebe cada evento como uma linha chave=valor
+                (o dicionário original vai em record.metrics)
+            level: Nível das mensagens no logging
+            trace_memory: Mede o pico de alocação (tracemalloc) de cada etapa
+        """
+        self.callback = callback
+        self.log = log
+        self.level = level
+        self.trace_memory = trace_memory
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1):
+        """Incrementa um contador"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def emit(self, event: Dict):
+        """Envia um evento aos destinos configurados"""
+        if self.callback is not None:
+            self.callback(event)
+        if self.log is not None and self.log.isEnabledFor(self.level):
+            self.log.log(self.level, format_event(event), extra={'metrics': event})
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """
+        Cronometra uma etapa
+
+        O dicionário devolvido pode receber campos extras durante a etapa
+        (bytes gravados, clips carregados...), que vão junto no evento.
+        Se a etapa terminar com exceção, o evento traz o nome dela em 'error'.
+        """
+        memory = self.trace_memory
+        if memory:
+            import tracemalloc
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields['error'] = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.timings[name] = self.timings.get(name, 0.0) + seconds
+            event = {'event': 'stage', 'stage': name, 'seconds': seconds}
+            event.update(fields)
+            if memory:
+                event['memory_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            self.emit(event)
+
+    @contextmanager
+    def profile(self, output: Optional[str] = None, sort: str = "cumulative", top: int = 25):
+        """
+        Executa o bloco sob o cProfile
+
+        Args:
+            output: Arquivo .prof para gravar as estatísticas (para snakeviz,
+                pstats...); se omitido, as `top` funções mais caras são
+                impressas em stderr
+            sort: Critério de ordenação do relatório
+            top: Quantidade de funções no relatório
+        """
+        # Importados só aqui: pstats sozinho dobra o tempo de importação do módulo
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            else:
+                pstats.Stats(profiler, stream=sys.stderr).sort_stats(sort).print_stats(top)
+            self.emit({'event': 'profile', 'output': output or 'stderr'})
+
+    def summary(self) -> Dict:
+        """Contadores e tempo total de cada etapa acumulados até aqui"""
+        with self._lock:
+            return {'counters': dict(self.counters), 'timings': dict(self.timings)}
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.timings = {}
+
+
+class Console:
+    """
+    Mensagens do sincronizador no terminal
+
+    Modos:
+        normal: uma linha por operação e por imagem adicionada
+        progress: mensagens de operação e, no lugar das linhas por imagem,
+            no máximo uma linha de resumo a cada `progress_every` itens
+        quiet: nada é impresso (use Instrumentation para acompanhar)
+    """
+
+    def __init__(self, mode: str = "normal", progress_every: int = DEFAULT_PROGRESS_EVERY):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Modo de saída desconhecido: {mode!r}")
+        if progress_every < 1:
+            raise ValueError("progress_every deve ser pelo menos 1")
+        self.mode = mode
+        self.progress_every = progress_every
+        self._pending = 0
+
+    def message(self, text: str):
+        """Mensagem de uma operação (carregar, salvar, resumo de lote...)"""
+        if self.mode != "quiet":
+            print(text)
+
+    def items(self, n: int, summary: Callable[[], str], text: Optional[str] = None):
+        """
+        Registra n itens processados
+
+        Args:
+            n: Quantidade de itens
+            summary: Gera a linha de resumo do modo progress
+            text: Linha individual, impressa apenas no modo normal
+        """
+        if self.mode == "normal":
+            if text is not None:
+                print(text)
+        elif self.mode == "progress":
+            self._pending += n
+            if self._pending >= self.progress_every:
+                self._pending = 0
+                print(summary())
+
+    def flush(self, summary: Callable[[], str]):
+        """Imprime o resumo dos itens ainda não reportados (modo progress)"""
+        if self._pending:
+            self._pending = 0
+            print(summary())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de metadados das imagens (SQLite)
+Guarda existência, tamanho, mtime, dimensões, formato e hash de conteúdo de
+cada imagem, indexados pelo caminho e invalidados quando o tamanho ou o
+mtime mudam, para que execuções seguintes não precisem reabrir os arquivos
+
+Uso como script:
+    python3 media_cache.py --cache-stats [arquivo.sqlite]
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from image_probe import probe_image
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'openshot_sync', 'media.sqlite'
+)
+DEFAULT_MAX_ENTRIES = 500_000
+
+# Limite de variáveis por consulta do SQLite
+_QUERY_CHUNK = 500
+# Inserções entre duas verificações do tamanho do banco (max_bytes)
+_SIZE_CHECK_INTERVAL = 1000
+_HASH_BLOCK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    path      TEXT PRIMARY KEY,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    width     INTEGER,
+    height    INTEGER,
+    format    TEXT,
+    sha256    TEXT,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS media_last_used ON media(last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = ('path', 'size', 'mtime_ns', 'width', 'height', 'format', 'sha256')
+
+
+def file_sha256(path: str) -> str:
+    """Hash SHA-256 do conteúdo do arquivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_serial(paths: List[str]) -> Dict[str, Optional[str]]:
+    """Hasher padrão de get_many: um arquivo por vez"""
+    digests = {}
+    for path in paths:
+        try:
+            digests[path] = file_sha256(path)
+        except OSError:
+            digests[path] = None
+    return digests
+
+
+class MediaMetadataCache:
+    """
+    Cache de metadados de imagens em SQLite, com despejo LRU
+
+    Cada consulta faz apenas um stat por arquivo para validar tamanho e
+    mtime; o arquivo só é aberto (dimensões, hash) quando a entrada falta
+    ou está desatualizada.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            db_path: Arquivo SQLite (":memory:" para um cache temporário)
+            max_entries: Número máximo de imagens guardadas
+            max_bytes: Tamanho máximo do banco em bytes (None = sem limite),
+                conferido a cada _SIZE_CHECK_INTERVAL imagens inseridas
+        """
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(db_path)
+        # Precisa vir antes da criação das tabelas para valer em bancos novos
+        self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+        # Contagem mantida a cada inserção/remoção (evita um COUNT(*) por lote)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+        self._inserts_since_size_check = 0
+
+    def close(self):
+        """Grava as estatísticas da execução e fecha o banco"""
+        if self._conn is None:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO stats(name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                [('hits', self.hits), ('misses', self.misses)]
+            )
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str, with_hash: bool = False) -> Optional[Dict]:
+        """Metadados de uma imagem, ou None se ela não existir"""
+        return self.get_many([path], with_hash)[path]
+
+    def get_many(self, paths: Iterable[str], with_hash: bool = False,
+                 hasher: Optional[Callable[[List[str]], Dict[str, Optional[str]]]] = None
+                 ) -> Dict[str, Optional[Dict]]:
+        """
+        Metadados de várias imagens
+
+        Args:
+            paths: Caminhos das imagens
+            with_hash: Também calcula o SHA-256 do conteúdo quando ele ainda
+                não estiver no cache
+            hasher: Recebe de uma vez os caminhos que precisam de hash e
+                devolve {caminho: sha256 ou None}, ex.: o hash paralelo do
+                media_dedupe (padrão: um arquivo por vez)
+
+        Returns:
+            Dicionário caminho -> metadados (None para arquivos inexistentes).
+            Os metadados têm as chaves path, size, mtime_ns, width, height,
+            format e sha256.
+        """
+        result: Dict[str, Optional[Dict]] = {}
+        stats = {}
+        for path in paths:
+            if path in result or path in stats:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                result[path] = None
+                continue
+            stats[path] = (self._key(path), st.st_size, st.st_mtime_ns)
+
+        cached = {}
+        keys = [key for key, _, _ in stats.values()]
+        for i in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[i:i + _QUERY_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM media "
+                f"WHERE path IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for row in rows:
+                cached[row[0]] = dict(zip(_COLUMNS, row))
+
+        now = time.time()
+        touched, fresh = [], []
+        # Grafias diferentes do mesmo arquivo ('a.png', './a.png') dividem a chave
+        seen = {}
+        for path, (key, size, mtime_ns) in stats.items():
+            if key in seen:
+                result[path] = seen[key]
+                continue
+            entry = cached.get(key)
+            valid = entry is not None and entry['size'] == size and entry['mtime_ns'] == mtime_ns
+            if valid and (entry['sha256'] or not with_hash):
+                self.hits += 1
+                touched.append((now, key))
+            else:
+                self.misses += 1
+                entry = self._examine(path, key, size, mtime_ns)
+                fresh.append((path, entry))
+            result[path] = seen[key] = entry
+
+        if with_hash and fresh:
+            digests = (hasher or _hash_serial)([path for path, _ in fresh])
+            for path, entry in fresh:
+                entry['sha256'] = digests.get(path)
+        rows = [tuple(entry[c] for c in _COLUMNS) + (now,) for _, entry in fresh]
+
+        with self._conn:
+            if touched:
+                self._conn.executemany("UPDATE media SET last_used = ? WHERE path = ?", touched)
+            if rows:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO media({', '.join(_COLUMNS)}, last_used) "
+                    f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})", rows
+                )
+        if rows:
+            self._count += sum(1 for row in rows if row[0] not in cached)
+            self._inserts_since_size_check += len(rows)
+            self._evict()
+        return result
+
+    @staticmethod
+    def _examine(path: str, key: str, size: int, mtime_ns: int) -> Dict:
+        """Lê o cabeçalho da imagem"""
+        entry = dict(path=key, size=size, mtime_ns=mtime_ns,
+                     width=None, height=None, format=None, sha256=None)
+        try:
+            probed = probe_image(path)
+            if probed is not None:
+                entry['format'], entry['width'], entry['height'] = probed
+        except OSError:
+            pass
+        return entry
+
+    def _database_bytes(self) -> int:
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def _evict(self):
+        """
+        Remove as entradas usadas há mais tempo até respeitar os limites
+
+        Usa a contagem mantida em memória; o tamanho do banco só é
+        consultado a cada _SIZE_CHECK_INTERVAL inserções. Antes de remover,
+        a contagem é refeita (outro processo pode ter usado o mesmo banco).
+        """
+        check_size = (self.max_bytes is not None
+                      and self._inserts_since_size_check >= _SIZE_CHECK_INTERVAL)
+        if self._count <= self.max_entries and not check_size:
+            return
+        if self._count > self.max_entries:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+        count = self._count
+        target = min(count, self.max_entries)
+        if check_size and count:
+            self._inserts_since_size_check = 0
+            size = self._database_bytes()
+            if size > self.max_bytes:
+                # Estima pelo tamanho médio e deixa 10% de folga
+                target = min(target, int(count * self.max_bytes / size * 0.9))
+        if target >= count:
+            return
+        with self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM media WHERE path IN "
+                "(SELECT path FROM media ORDER BY last_used LIMIT ?)", (count - target,)
+            ).rowcount
+        self._count -= removed
+        self._conn.execute("PRAGMA incremental_vacuum")
+
+    def stats(self) -> Dict:
+        """Estatísticas do cache (acumuladas + execução atual)"""
+        totals = dict(self._conn.execute("SELECT name, value FROM stats"))
+        hits = totals.get('hits', 0) + self.hits
+        misses = totals.get('misses', 0) + self.misses
+        lookups = hits + misses
+        return {
+            'entries': self._conn.execute("SELECT COUNT(*) FROM media").fetchone()[0],
+            'bytes': self._database_bytes(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'run_hits': self.hits,
+            'run_misses': self.misses,
+        }
+
+
+def imprimir_estatisticas(cache: MediaMetadataCache):
+    """Mostra o relatório --cache-stats"""
+    stats = cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    print(f"📦 Cache de mídia: {cache.db_path}")
+    print(f"   Entradas: {stats['entries']} ({stats['bytes'] / 1e6:.1f} MB)")
+    print(f"   Consultas: {lookups}  acertos: {stats['hits']}  falhas: {stats['misses']}")
+    print(f"   Taxa de acerto: {stats['hit_rate']:.1%}  (falhas: {1 - stats['hit_rate']:.1%})"
+          if lookups else "   Taxa de acerto: -")
+    run = stats['run_hits'] + stats['run_misses']
+    if run:
+        print(f"   Nesta execução: {stats['run_hits']}/{run} acertos "
+              f"({stats['run_hits'] / run:.1%})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != '--cache-stats':
+        print("Uso: python3 media_cache.py --cache-stats [arquivo.sqlite]")
+        sys.exit(1)
+    with MediaMetadataCache(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_CACHE_PATH) as cache:
+        imprimir_estatisticas(cache)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Deduplicação de mídia por conteúdo
+Detecta arquivos idênticos com caminhos diferentes (ex.: a mesma logo
+copiada em várias pastas) para que todos os clips usem uma única entrada
+em 'files'. Só arquivos de mesmo tamanho têm o conteúdo comparado
+"""
+
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_WORKERS = 8
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 do conteúdo, lido via mmap (o hashlib libera o GIL)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b'').hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def _safe_hash(path: str) -> Optional[str]:
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
+
+
+def hash_files(paths: List[str], max_workers: int = DEFAULT_WORKERS,
+               media_cache=None) -> Dict[str, Optional[str]]:
+    """
+    Calcula o SHA-256 de vários arquivos em paralelo
+
+    Com um MediaMetadataCache, os hashes já conhecidos vêm do cache; os que
+    faltam são calculados em paralelo e guardados nele.
+    """
+    if not paths:
+        return {}
+    if media_cache is not None:
+        metadata = media_cache.get_many(
+            paths, with_hash=True, hasher=lambda misses: _hash_parallel(misses, max_workers))
+        return {path: (meta['sha256'] if meta else None) for path, meta in metadata.items()}
+    return _hash_parallel(paths, max_workers)
+
+
+def _hash_parallel(paths: List[str], max_workers: int) -> Dict[str, Optional[str]]:
+    if not paths:
+        return {}
+    workers = max(1, min(max_workers, len(paths)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(_safe_hash, paths)))
+
+
+def file_sizes(paths: Iterable[str]) -> Dict[str, int]:
+    """Tamanho de cada arquivo existente"""
+    sizes = {}
+    for path in paths:
+        try:
+            sizes[path] = os.stat(path).st_size
+        except OSError:
+            pass
+    return sizes
+
+
+def find_duplicate_groups(paths: Iterable[str], max_workers: int = DEFAULT_WORKERS,
+                          media_cache=None) -> List[Tuple[int, List[str]]]:
+    """
+    Agrupa os arquivos com conteúdo idêntico
+
+    Returns:
+        Lista de (tamanho, caminhos) com dois ou mais caminhos por grupo,
+        na ordem em que aparecem em `paths`
+    """
+    sizes = file_sizes(dict.fromkeys(paths))
+    by_size: Dict[int, List[str]] = {}
+    for path, size in sizes.items():
+        by_size.setdefault(size, []).append(path)
+    candidates = [path for group in by_size.values() if len(group) > 1 for path in group]
+    digests = hash_files(candidates, max_workers, media_cache)
+
+    groups: Dict[Tuple[int, str], List[str]] = {}
+    for path in candidates:
+        digest = digests.get(path)
+        if digest is not None:
+            groups.setdefault((sizes[path], digest), []).append(path)
+    return [(size, group) for (size, _), group in groups.items() if len(group) > 1]
+
+
+class ContentIndex:
+    """
+    Índice (tamanho, hash) -> file_id das mídias já registradas no projeto
+
+    Um arquivo só tem o hash calculado quando aparece outro do mesmo
+    tamanho; os hashes de um lote são calculados juntos, em paralelo
+    (prepare).
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, media_cache=None):
+        self.max_workers = max_workers
+        self.media_cache = media_cache
+        self._sizes: Dict[str, int] = {}
+        self._digests: Dict[str, Optional[str]] = {}
+        self._by_content: Dict[Tuple[int, str], str] = {}
+        # Tamanhos já registrados e mídias registradas ainda sem hash
+        self._known_sizes = set()
+        self._unhashed: Dict[int, List[Tuple[str, str]]] = {}
+        # Entradas de projetos carregados, examinadas só na primeira consulta
+        self._unindexed: List[Tuple[str, str]] = []
+
+    def add(self, path: str, file_id: str):
+        """Inclui uma mídia que já está em 'files' (sem acessar o disco)"""
+        self._unindexed.append((path, file_id))
+
+    def _index_pending(self):
+        if not self._unindexed:
+            return
+        entries, self._unindexed = self._unindexed, []
+        self._sizes.update(file_sizes(path for path, _ in entries if path not in self._sizes))
+        for path, file_id in entries:
+            self.register(path, file_id)
+
+    def _hash_sizes(self, sizes, extra: List[str] = ()):
+        """Calcula os hashes de `extra` e das mídias registradas com esses tamanhos"""
+        to_hash = [path for path in extra if path not in self._digests]
+        for size in sizes:
+            to_hash.extend(path for path, _ in self._unhashed.get(size, ())
+                           if path not in self._digests)
+        self._digests.update(hash_files(to_hash, self.max_workers, self.media_cache))
+        for size in sizes:
+            for path, file_id in self._unhashed.pop(size, ()):
+                digest = self._digests.get(path)
+                if digest:
+                    self._by_content.setdefault((size, digest), file_id)
+
+    def prepare(self, paths: Iterable[str]):
+        """Lê os tamanhos de um lote e calcula os hashes que ele vai precisar"""
+        self._index_pending()
+        paths = [path for path in dict.fromkeys(paths) if path not in self._sizes]
+        self._sizes.update(file_sizes(paths))
+        batch_sizes: Dict[int, int] = {}
+        for path in paths:
+            if path in self._sizes:
+                size = self._sizes[path]
+                batch_sizes[size] = batch_sizes.get(size, 0) + 1
+        candidates = [path for path in paths if path in self._sizes
+                      and (self._sizes[path] in self._known_sizes
+                           or batch_sizes[self._sizes[path]] > 1)]
+        self._hash_sizes({self._sizes[path] for path in candidates}, candidates)
+
+    def lookup(self, path: str) -> Optional[Tuple[str, int]]:
+        """
+        Procura uma mídia registrada com o mesmo conteúdo
+
+        Returns:
+            (file_id, tamanho) da mídia idêntica, ou None
+        """
+        self._index_pending()
+        if path not in self._sizes:
+            self.prepare([path])
+        size = self._sizes.get(path)
+        if size is None or size not in self._known_sizes:
+            return None
+        self._hash_sizes([size] if size in self._unhashed else [], [path])
+        digest = self._digests.get(path)
+        file_id = self._by_content.get((size, digest)) if digest else None
+        return (file_id, size) if file_id is not None else None
+
+    def register(self, path: str, file_id: str):
+        """Registra uma mídia nova em 'files' (após um lookup sem resultado)"""
+        size = self._sizes.get(path)
+        if size is None:
+            return
+        self._known_sizes.add(size)
+        digest = self._digests.get(path)
+        if digest:
+            self._by_content.setdefault((size, digest), file_id)
+        else:
+            self._unhashed.setdefault(size, []).append((path, file_id))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Proxies (cópias reduzidas) de imagens grandes
+Originais de câmera (40-100 MP) usados pequenos na timeline são decodificados
+inteiros pelo OpenShot a cada quadro da prévia. O proxy é a mesma imagem
+reduzida ao tamanho em que ela realmente aparece no vídeo (resolução do
+projeto vezes a escala do clip), gerada em um pool de processos
+
+Os proxies ficam em um cache local endereçado pelo conteúdo: o nome é o
+SHA-256 do original mais as dimensões do proxy, então um proxy existente
+está sempre atualizado e é reaproveitado entre projetos. Para não reler o
+original inteiro a cada execução, o hash fica anotado no próprio cache
+(digests.json), validado pelo tamanho e mtime do arquivo. O Pillow é
+opcional: sem ele, só os proxies já existentes no cache são usados
+"""
+
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from image_probe import probe_image
+from media_cache import file_sha256
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow é opcional
+    Image = None
+
+DEFAULT_PROXY_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'openshot_sync', 'proxies'
+)
+# O proxy só é gerado se o original for pelo menos esta vez maior (em cada lado)
+MIN_REDUCTION = 1.5
+JPEG_QUALITY = 90
+# Formatos com transparência viram PNG; os demais, JPEG
+_ALPHA_FORMATS = ('png', 'gif')
+# Hashes dos originais: caminho -> [tamanho, mtime_ns, sha256]
+DIGEST_INDEX = 'digests.json'
+
+
+class ProxyJob(NamedTuple):
+    """Uma imagem a reduzir para caber em box_width x box_height vezes scale"""
+    path: str
+    box_width: int
+    box_height: int
+    scale: float
+    sha256: Optional[str] = None
+
+
+class ProxyResult(NamedTuple):
+    """
+    status: created, cached (já existia), not_needed (original pequeno),
+    unavailable (sem Pillow), unsupported (formato) ou failed; sha256 é o
+    hash do original quando ele foi calculado ou informado
+    """
+    status: str
+    proxy_path: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    error: Optional[str] = None
+    sha256: Optional[str] = None
+
+
+def proxy_dimensions(width: int, height: int, box_width: int, box_height: int,
+                     scale: float) -> Tuple[int, int]:
+    """
+    Tamanho em que a imagem aparece no vídeo
+
+    Como no OpenShot (modo "fit"), a imagem é ajustada para caber no quadro
+    do projeto mantendo a proporção e então multiplicada pela escala do
+    clip. O proxy mantém a proporção, então é ajustado ao mesmo tamanho.
+    """
+    fit = min(box_width / width, box_height / height) * scale
+    return (min(width, max(1, math.ceil(width * fit))),
+            min(height, max(1, math.ceil(height * fit))))
+
+
+def proxy_path(cache_dir: str, sha256: str, width: int, height: int, fmt: str) -> str:
+    extension = 'png' if fmt in _ALPHA_FORMATS else 'jpg'
+    return os.path.join(cache_dir, sha256[:2], f"{sha256}-{width}x{height}.{extension}")
+
+
+def _render(source: str, target: str, width: int, height: int):
+    """Reduz source para width x height e grava em target (atomicamente)"""
+    with Image.open(source) as image:
+        exif = image.info.get('exif')
+        # JPEG: decodifica já reduzido (1/2, 1/4, 1/8), bem mais rápido
+        image.draft('RGB', (width, height))
+        if target.endswith('.png'):
+            image = image.convert('RGBA')
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image = image.resize((width, height), Image.LANCZOS)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.proxy.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if target.endswith('.png'):
+                    image.save(f, 'PNG')
+                else:
+                    # A orientação EXIF continua valendo para o proxy
+                    image.save(f, 'JPEG', quality=JPEG_QUALITY, exif=exif or b'')
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def build_proxy(job: ProxyJob, cache_dir: str = DEFAULT_PROXY_DIR,
+                min_reduction: float = MIN_REDUCTION) -> ProxyResult:
+    """Gera (ou encontra no cache) o proxy de uma imagem"""
+    sha256 = job.sha256
+    try:
+        probe = probe_image(job.path)
+        if probe is None:
+            return ProxyResult('unsupported')
+        fmt, width, height = probe
+        target_width, target_height = proxy_dimensions(width, height, job.box_width,
+                                                       job.box_height, job.scale)
+        if target_width * min_reduction > width and target_height * min_reduction > height:
+            return ProxyResult('not_needed')
+        sha256 = job.sha256 or file_sha256(job.path)
+        target = proxy_path(cache_dir, sha256, target_width, target_height, fmt)
+        if os.path.exists(target):
+            return ProxyResult('cached', target, target_width, target_height, sha256=sha256)
+        if Image is None:
+            return ProxyResult('unavailable', sha256=sha256)
+        _render(job.path, target, target_width, target_height)
+        return ProxyResult('created', target, target_width, target_height, sha256=sha256)
+    except Exception as e:  # Imagem corrompida, disco cheio...: não interrompe o lote
+        return ProxyResult('failed', error=f"{type(e).__name__}: {e}", sha256=sha256)
+
+
+def _load_digests(cache_dir: str) -> Dict[str, list]:
+    try:
+        with open(os.path.join(cache_dir, DIGEST_INDEX), 'r', encoding='utf-8') as f:
+            digests = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return digests if isinstance(digests, dict) else {}
+
+
+def _save_digests(cache_dir: str, digests: Dict[str, list]):
+    """Grava o índice de hashes atomicamente (uma falha só custa rehash)"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.digests.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(digests, f, separators=(',', ':'))
+            os.replace(tmp_path, os.path.join(cache_dir, DIGEST_INDEX))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+def _with_known_digests(jobs: List[ProxyJob], digests: Dict[str, list]
+                        ) -> Tuple[List[ProxyJob], Dict[int, Tuple[str, int, int]]]:
+    """
+    Preenche o sha256 dos jobs cujo original não mudou desde o último hash
+
+    Returns:
+        (jobs, {índice: (caminho, tamanho, mtime_ns)} dos jobs sem hash)
+    """
+    prepared, unknown = [], {}
+    for i, job in enumerate(jobs):
+        if job.sha256 is None:
+            path = os.path.abspath(job.path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                prepared.append(job)
+                continue
+            known = digests.get(path)
+            if known is not None and known[:2] == [st.st_size, st.st_mtime_ns]:
+                job = job._replace(sha256=known[2])
+            else:
+                # O stat é anterior ao hash: se o arquivo mudar no meio, a
+                # próxima execução vê outro mtime e calcula de novo
+                unknown[i] = (path, st.st_size, st.st_mtime_ns)
+        prepared.append(job)
+    return prepared, unknown
+
+
+def _build_chunk(args) -> List[ProxyResult]:
+    jobs, cache_dir, min_reduction = args
+    return [build_proxy(job, cache_dir, min_reduction) for job in jobs]
+
+
+def build_proxies(jobs: List[ProxyJob], cache_dir: str = DEFAULT_PROXY_DIR,
+                  max_workers: Optional[int] = None,
+                  min_reduction: float = MIN_REDUCTION) -> List[ProxyResult]:
+    """
+    Gera os proxies de um lote em um pool de processos
+
+    Os jobs são enviados em blocos (menos comunicação entre processos);
+    lotes pequenos rodam no próprio processo. Jobs sem sha256 usam o hash
+    anotado em digests.json se o tamanho e o mtime do original não
+    mudaram; os hashes calculados no lote são anotados lá.
+
+    Returns:
+        Um ProxyResult por job, na mesma ordem
+    """
+    digests = _load_digests(cache_dir)
+    jobs, unknown = _with_known_digests(jobs, digests)
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        results = [build_proxy(job, cache_dir, min_reduction) for job in jobs]
+    else:
+        size = max(1, min(64, len(jobs) // (workers * 4)))
+        chunks = [(jobs[i:i + size], cache_dir, min_reduction)
+                  for i in range(0, len(jobs), size)]
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_build_chunk, chunks):
+                results.extend(chunk)
+    learned = {path: [size, mtime_ns, results[i].sha256]
+               for i, (path, size, mtime_ns) in unknown.items() if results[i].sha256}
+    if learned:
+        digests.update(learned)
+        _save_digests(cache_dir, digests)
+    return results
+
+
+def summarize(results: List[ProxyResult]) -> Dict[str, int]:
+    """Quantidade de resultados por status"""
+    report = {status: 0 for status in ('created', 'cached', 'not_needed', 'unavailable',
+                                       'unsupported', 'failed')}
+    for result in results:
+        report[result.status] += 1
+    return report
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Resolução em lote dos caminhos de mídia
+Agrupa os caminhos por diretório e lista cada diretório uma única vez com
+os.scandir, em paralelo, em vez de fazer um stat por imagem. Só arquivos
+contam como encontrados (não subdiretórios nem links quebrados)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_WORKERS = 8
+
+
+def _is_file(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+class MediaResolution:
+    """Resultado da resolução de um lote de caminhos"""
+
+    def __init__(self):
+        # caminho pedido -> caminho absoluto
+        self.found: Dict[str, str] = {}
+        # caminhos pedidos que não existem (ordem da primeira ocorrência)
+        self.missing: List[str] = []
+
+    def __repr__(self) -> str:
+        return f"<MediaResolution encontrados={len(self.found)} faltando={len(self.missing)}>"
+
+
+class MediaResolver:
+    """
+    Resolve caminhos de imagens listando cada diretório uma vez
+
+    As listagens ficam em cache na instância junto com o mtime do
+    diretório: lotes seguintes fazem só um stat por diretório e listam de
+    novo os que mudaram. Como o mtime pode não mudar dentro da sua
+    resolução, refresh_missing=True também relista os diretórios com
+    imagens faltando; clear() descarta tudo.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, refresh_missing: bool = False):
+        """
+        Args:
+            max_workers: Diretórios listados em paralelo
+            refresh_missing: Relista (uma vez por lote) os diretórios em cache
+                em que alguma imagem não foi encontrada, para achar arquivos
+                criados depois da listagem
+        """
+        self.max_workers = max_workers
+        self.refresh_missing = refresh_missing
+        self._listings: Dict[str, Optional[FrozenSet[str]]] = {}
+        self._mtimes: Dict[str, Optional[int]] = {}
+        self._folded: Dict[str, FrozenSet[str]] = {}
+
+    def clear(self):
+        """Descarta as listagens em cache"""
+        self._listings = {}
+        self._mtimes = {}
+        self._folded = {}
+
+    def _list_pending(self, directories: Iterable[str]):
+        """Lista (em paralelo) e guarda em cache os diretórios"""
+        directories = sorted(directories)
+        for directory in directories:
+            self._folded.pop(directory, None)
+        workers = max(1, min(self.max_workers, len(directories)))
+        if workers == 1:
+            listings = list(map(self._list_directory, directories))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                listings = list(pool.map(self._list_directory, directories))
+        for directory, (mtime_ns, names) in zip(directories, listings):
+            self._mtimes[directory] = mtime_ns
+            self._listings[directory] = names
+
+    @staticmethod
+    def _mtime(directory: str) -> Optional[int]:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def _list_directory(cls, directory: str) -> Tuple[Optional[int], Optional[FrozenSet[str]]]:
+        """(mtime_ns, nomes dos arquivos) do diretório"""
+        # O mtime é lido antes da listagem: uma mudança durante ela fica
+        # para a próxima verificação
+        mtime_ns = cls._mtime(directory)
+        try:
+            with os.scandir(directory) as entries:
+                return mtime_ns, frozenset(entry.name for entry in entries
+                                           if _is_file(entry))
+        except FileNotFoundError:
+            return mtime_ns, frozenset()
+        except OSError:
+            return mtime_ns, None  # Sem permissão de listagem: verifica arquivo a arquivo
+
+    def _exists(self, directory: str, name: str) -> bool:
+        """Verificação lenta, para nomes que não estão na listagem"""
+        names = self._listings[directory]
+        abs_path = os.path.join(directory, name)
+        if names is None:
+            return os.path.isfile(abs_path)
+        # Sistemas de arquivos sem distinção de maiúsculas: confirma no disco
+        folded = self._folded.get(directory)
+        if folded is None:
+            folded = self._folded[directory] = frozenset(n.casefold() for n in names)
+        return name.casefold() in folded and os.path.isfile(abs_path)
+
+    def resolve(self, paths: Iterable[str]) -> MediaResolution:
+        """
+        Resolve todos os caminhos antes de qualquer clip ser montado
+
+        Args:
+            paths: Caminhos das imagens (repetições são resolvidas uma vez)
+
+        Returns:
+            MediaResolution com os caminhos encontrados e os que faltam
+        """
+        # Agrupa pelo diretório como escrito; abspath só uma vez por diretório
+        abs_dirs: Dict[str, str] = {}
+        by_path: Dict[str, tuple] = {}
+        for path in paths:
+            if path not in by_path:
+                raw_dir, name = os.path.split(path)
+                directory = abs_dirs.get(raw_dir)
+                if directory is None:
+                    directory = abs_dirs[raw_dir] = os.path.abspath(raw_dir or os.curdir)
+                by_path[path] = (directory, name)
+
+        directories = set(abs_dirs.values())
+        pending = directories - self._listings.keys()
+        # Diretórios em cache cujo mtime mudou (arquivos criados ou apagados)
+        pending.update(directory for directory in directories - pending
+                       if self._mtime(directory) != self._mtimes.get(directory))
+        if pending:
+            self._list_pending(pending)
+
+        result = MediaResolution()
+        self._match(by_path.items(), result)
+        if self.refresh_missing and result.missing:
+            # Só os diretórios que vieram do cache podem estar desatualizados
+            stale = {by_path[path][0] for path in result.missing} - pending
+            if stale:
+                self._list_pending(stale)
+                missing, result.missing = result.missing, []
+                self._match(((path, by_path[path]) for path in missing), result)
+        return result
+
+    def _match(self, items: Iterable[tuple], result: MediaResolution):
+        """Confere cada (caminho, (diretório, nome)) nas listagens em cache"""
+        join = os.path.join
+        for path, (directory, name) in items:
+            names = self._listings[directory]
+            if names is not None and name in names:
+                result.found[path] = join(directory, name)
+            elif name and self._exists(directory, name):
+                result.found[path] = join(directory, name)
+            else:
+                result.missing.append(path)
+
+
+def resolve_media(paths: Iterable[str], max_workers: int = DEFAULT_WORKERS) -> MediaResolution:
+    """Resolve um lote de caminhos com um MediaResolver descartável"""
+    return MediaResolver(max_workers).resolve(paths)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Linha de comando unificada do sincronizador
+Todas as configurações dos scripts viram opções, e cada subcomando importa
+só o que usa: `--help` e `stats` não carregam o sincronizador, o NumPy nem
+o SQLite, para que tarefas curtas iniciem rápido (ver benchmark_startup.py)
+
+Uso:
+    python3 -m openshot_cli from-csv timestamps.csv -o video.osp
+    python3 -m openshot_cli interval logo.png intro.png --intervalo 5
+    python3 -m openshot_cli gallery minhas_fotos/ -o galeria.osp
+    python3 -m openshot_cli merge parte1.osp parte2.osp@120 -o final.osp
+    python3 -m openshot_cli proxies video.osp
+    python3 -m openshot_cli stats video.osp
+"""
+
+import argparse
+import os
+import sys
+
+# Padrões iguais às constantes de sync_from_csv.py / exemplo_uso.py / csv_watch.py (repetidos
+# aqui para não importar esses módulos só para montar as opções)
+PADRAO_LARGURA = 1920
+PADRAO_ALTURA = 1080
+PADRAO_FPS = 30.0
+PADRAO_BLOCO = 10000
+PADRAO_TRABALHADORES_MIDIA = 8
+PADRAO_PROGRESSO = 10000
+EXTENSOES_GALERIA = "jpg,jpeg,png,gif"
+# Ordens do gallery -> gallery_scan.SORT_*
+ORDENS_GALERIA = {"nome": "name", "modificacao": "mtime", "captura": "capture",
+                  "disco": "none"}
+PADRAO_DEBOUNCE = 1.0
+
+
+def _opcoes_projeto(parser, projeto):
+    grupo = parser.add_argument_group("projeto")
+    grupo.add_argument("-o", "--projeto", default=projeto,
+                       help=f"Arquivo .osp gerado (padrão: {projeto})")
+    grupo.add_argument("--carregar", action="store_true",
+                       help="Acrescenta a um projeto existente em vez de criar um novo")
+    grupo.add_argument("--largura", type=int, default=PADRAO_LARGURA)
+    grupo.add_argument("--altura", type=int, default=PADRAO_ALTURA)
+    grupo.add_argument("--fps", type=_taxa_quadros, default=PADRAO_FPS,
+                       help="Taxa de quadros: 30, 29.97 ou 30000/1001")
+    grupo.add_argument("--backend", choices=("records", "table"), default="records",
+                       help="Armazenamento dos clips em memória")
+    grupo.add_argument("--compacto", action="store_true", help="Grava o JSON sem indentação")
+    grupo.add_argument("--journal", action="store_true",
+                       help="Com --carregar ou --reconciliar, grava só as alterações no diário")
+    grupo = parser.add_argument_group("mídia")
+    grupo.add_argument("--trabalhadores-midia", type=int, default=PADRAO_TRABALHADORES_MIDIA,
+                       help="Diretórios de imagens listados em paralelo")
+    grupo.add_argument("--cache-midia", metavar="ARQUIVO",
+                       help="Cache persistente de metadados das imagens (SQLite)")
+    grupo.add_argument("--dedupe", action="store_true",
+                       help="Unifica imagens idênticas em caminhos diferentes")
+    grupo = parser.add_argument_group("saída e instrumentação")
+    grupo.add_argument("--modo-saida", choices=("normal", "progress", "quiet"),
+                       default="progress")
+    grupo.add_argument("--progresso-a-cada", type=int, default=PADRAO_PROGRESSO)
+    grupo.add_argument("--metrics", action="store_true",
+                       help="Tempos e contadores de cada etapa no log (stderr)")
+    grupo.add_argument("--tracemalloc", action="store_true",
+                       help="Inclui o pico de memória de cada etapa nas métricas")
+    grupo.add_argument("--profile", metavar="ARQUIVO", help="Grava o perfil do cProfile")
+
+
+def _opcoes_imagens(parser, layer, duracao):
+    grupo = parser.add_argument_group("imagens")
+    grupo.add_argument("--layer", type=int, default=layer,
+                       help=f"Camada (maior = mais na frente; padrão: {layer})")
+    grupo.add_argument("--duracao", type=float, default=duracao,
+                       help=f"Duração de cada imagem em segundos (padrão: {duracao})")
+    grupo.add_argument("--x", type=float, default=0.0, help="Posição horizontal (0-1)")
+    grupo.add_argument("--y", type=float, default=0.0, help="Posição vertical (0-1)")
+    grupo.add_argument("--escala-x", type=float, default=1.0)
+    grupo.add_argument("--escala-y", type=float, default=1.0)
+
+
+def _taxa_quadros(texto):
+    """'30', '29.97' (gravado como 30000/1001) ou '30000/1001'"""
+    if '/' in texto:
+        from fractions import Fraction
+        try:
+            valor = Fraction(texto)
+        except (ValueError, ZeroDivisionError):
+            raise argparse.ArgumentTypeError(f"taxa de quadros inválida: {texto!r}")
+    else:
+        try:
+            valor = float(texto)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"taxa de quadros inválida: {texto!r}")
+    if not 0 < valor < float('inf'):
+        raise argparse.ArgumentTypeError(f"taxa de quadros inválida: {texto!r}")
+    return valor
+
+
+def _nao_negativo(texto):
+    try:
+        valor = int(texto)
+    except ValueError:
+        valor = -1
+    if valor < 0:
+        raise argparse.ArgumentTypeError(f"esperado um inteiro >= 0: {texto!r}")
+    return valor
+
+
+def _posicao(args):
+    return {'x': args.x, 'y': args.y, 'scale_x': args.escala_x, 'scale_y': args.escala_y}
+
+
+def _executar_no_projeto(args, adicionar, salvar=True):
+    """
+    Cria (ou carrega) o projeto, chama adicionar(sync) e salva
+
+    Com salvar=False, adicionar(sync) é quem salva (modo de observação).
+
+    Returns:
+        Código de saída do processo
+    """
+    import logging
+    from contextlib import nullcontext
+
+    from instrumentation import Instrumentation
+    from sync_from_csv import abrir_cache
+    from sync_images_openshot import OpenShotImageSync
+
+    log = None
+    if args.metrics:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+        log = logging.getLogger("openshot_sync")
+    instrumentacao = Instrumentation(log=log, trace_memory=args.tracemalloc)
+    cache = abrir_cache(args.cache_midia)
+    perfil = instrumentacao.profile(args.profile) if args.profile else nullcontext()
+    try:
+        with perfil:
+            sync = OpenShotImageSync(args.projeto, media_workers=args.trabalhadores_midia,
+                                     media_cache=cache, dedupe_media=args.dedupe,
+                                     backend=args.backend, output=args.modo_saida,
+                                     progress_every=args.progresso_a_cada,
+                                     instrumentation=instrumentacao)
+            reconciliar = getattr(args, 'reconciliar', False)
+            if args.carregar or reconciliar:
+                # Clips que a reconciliação não altera são copiados byte a byte ao salvar
+                lazy = reconciliar or getattr(args, 'observar', False)
+                if not sync.load_project(lazy=lazy):
+                    return 1
+            else:
+                sync.create_new_project(width=args.largura, height=args.altura, fps=args.fps)
+            adicionar(sync)
+            if salvar and not sync.save_project(journal=args.journal, compact=args.compacto):
+                return 1
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+def cmd_from_csv(args):
+    from sync_from_csv import adicionar_em_blocos, iterar_timestamps_csv
+
+    delimitador = "\t" if args.delimitador == "tab" else args.delimitador
+
+    def observar(sync):
+        from csv_watch import ObservadorCSV
+        ObservadorCSV(sync, args.csv, args.layer, delimitador=delimitador,
+                      duracao_padrao=args.duracao, debounce=args.debounce,
+                      journal=args.journal, compacto=args.compacto,
+                      **_posicao(args)).executar()
+
+    def adicionar(sync):
+        timestamps = iterar_timestamps_csv(args.csv, avisar=args.modo_saida != "quiet",
+                                           duracao_padrao=args.duracao,
+                                           delimitador=delimitador)
+        if args.reconciliar:
+            sync.reconcile_images(timestamps, args.layer, **_posicao(args))
+            return
+        total, adicionadas = adicionar_em_blocos(sync, timestamps, args.layer, args.bloco,
+                                                 **_posicao(args))
+        sync.console.message(f"\n✓ Total: {adicionadas}/{total} imagens adicionadas com sucesso")
+
+    if not os.path.exists(args.csv):
+        print(f"❌ Arquivo não encontrado: {args.csv}")
+        return 1
+    if args.observar:
+        return _executar_no_projeto(args, observar, salvar=False)
+    return _executar_no_projeto(args, adicionar)
+
+
+def _adicionar_em_intervalos(args, imagens):
+    def adicionar(sync):
+        # Posições e durações alinhadas aos quadros do projeto
+        sync.add_images_at_interval(imagens, args.inicio, args.intervalo, args.duracao,
+                                    args.layer, **_posicao(args))
+    return adicionar
+
+
+def cmd_interval(args):
+    return _executar_no_projeto(args, _adicionar_em_intervalos(args, args.imagens))
+
+
+def cmd_gallery(args):
+    from gallery_scan import scan_gallery
+
+    try:
+        fotos = list(scan_gallery(args.pasta, args.extensoes.split(','), ORDENS_GALERIA[args.ordem],
+                                  args.decrescente, args.pular, args.limite,
+                                  not args.sem_subpastas, args.trabalhadores_midia))
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    if not fotos:
+        print(f"⚠️  Nenhuma foto encontrada em {args.pasta}")
+        return 1
+    return _executar_no_projeto(args, _adicionar_em_intervalos(args, fotos))
+
+
+def _entrada_merge(texto):
+    """'projeto.osp', 'projeto.osp@120' ou 'projeto.osp@120:2' (segundos:camadas)"""
+    caminho, separador, deslocamento = texto.rpartition('@')
+    if not separador:
+        return texto, 0.0, 0
+    segundos, _, camadas = deslocamento.partition(':')
+    try:
+        return caminho, float(segundos), int(camadas or 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"deslocamento inválido em {texto!r}")
+
+
+def cmd_merge(args):
+    from osp_merge import merge_projects
+
+    try:
+        relatorio = merge_projects(args.projetos, args.projeto, compact=args.compacto)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✓ {relatorio['projects']} projetos juntados em {args.projeto}: "
+          f"{relatorio['clips']} clips, {relatorio['files']} arquivos "
+          f"({relatorio['files_shared']} compartilhados, "
+          f"{relatorio['ids_remapped']} ids renumerados)")
+    return 0
+
+
+def cmd_proxies(args):
+    from sync_images_openshot import OpenShotImageSync
+
+    sync = OpenShotImageSync(args.projeto, output=args.modo_saida)
+    if not sync.load_project(lazy=True):
+        return 1
+    if args.originais:
+        sync.use_original_media()
+    else:
+        relatorio = sync.create_proxies(args.pasta_cache, args.trabalhadores)
+        if relatorio['failed']:
+            print(f"⚠️  {relatorio['failed']} proxies falharam")
+    return 0 if sync.save_project(journal=args.journal, compact=args.compacto) else 1
+
+
+def cmd_stats(args):
+    import json
+
+    from osp_lazy import load_project_lazy
+
+    try:
+        projeto = load_project_lazy(args.projeto)
+        alteracoes = 0
+        if os.path.exists(args.projeto + ".journal"):
+            import project_journal
+            alteracoes = project_journal.replay_journal(projeto, args.projeto)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    clips = projeto.get('clips', [])
+    arquivos = projeto.get('files', [])
+    por_camada = {}
+    fim = 0.0
+    for clip in clips:
+        por_camada[clip.get('layer')] = por_camada.get(clip.get('layer'), 0) + 1
+        fim = max(fim, clip.get('position', 0) + clip.get('end', 0) - clip.get('start', 0))
+    pasta = os.path.dirname(os.path.abspath(args.projeto))
+    faltando = [arquivo['path'] for arquivo in arquivos
+                if arquivo.get('path') and not os.path.exists(os.path.join(pasta, arquivo['path']))]
+    fps = projeto.get('fps', {})
+    dados = {
+        'projeto': args.projeto,
+        'tamanho': f"{projeto.get('width')}x{projeto.get('height')}",
+        'fps': f"{fps.get('num')}/{fps.get('den')}",
+        'clips': len(clips),
+        'arquivos': len(arquivos),
+        'arquivos_faltando': len(faltando),
+        'duracao': fim,
+        'camadas': {str(camada): n for camada, n in sorted(por_camada.items(),
+                                                          key=lambda item: str(item[0]))},
+        'alteracoes_no_diario': alteracoes,
+    }
+    if args.json:
+        print(json.dumps(dados, ensure_ascii=False, indent=2))
+        return 0
+    print(f"📂 {dados['projeto']} ({dados['tamanho']} @ {dados['fps']} fps)")
+    print(f"   {dados['clips']} clips, {dados['arquivos']} arquivos, "
+          f"duração {dados['duracao']:.1f}s")
+    for camada, n in dados['camadas'].items():
+        print(f"   camada {camada}: {n} clips")
+    if faltando:
+        print(f"⚠️  {len(faltando)} arquivos não encontrados (ex.: {faltando[0]})")
+    if alteracoes:
+        print(f"   ↳ inclui {alteracoes} alterações do diário ainda não consolidadas")
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="python3 -m openshot_cli",
+                                     description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="comando", required=True, metavar="COMANDO")
+
+    p = sub.add_parser("from-csv", help="Adiciona as imagens de um CSV (imagem,timestamp[,duracao])")
+    p.add_argument("csv", help="Arquivo CSV")
+    p.add_argument("--delimitador", help="Delimitador do CSV (',', ';' ou 'tab'); "
+                                         "sem ele, o formato é detectado")
+    p.add_argument("--bloco", type=int, default=PADRAO_BLOCO,
+                   help="Linhas enviadas ao projeto por vez")
+    p.add_argument("--reconciliar", action="store_true",
+                   help="Carrega o projeto e aplica só as diferenças entre o CSV e a "
+                        "camada --layer (rodar de novo não duplica as imagens)")
+    p.add_argument("--observar", action="store_true",
+                   help="Continua rodando e aplica as alterações do CSV e das pastas das "
+                        "imagens assim que acontecem (Ctrl+C encerra)")
+    p.add_argument("--debounce", type=float, default=PADRAO_DEBOUNCE,
+                   help="Com --observar: segundos sem alterações antes de salvar")
+    _opcoes_imagens(p, layer=2, duracao=3.0)
+    _opcoes_projeto(p, "video_com_imagens.osp")
+    p.set_defaults(funcao=cmd_from_csv)
+
+    p = sub.add_parser("interval", help="Adiciona imagens em intervalos regulares")
+    p.add_argument("imagens", nargs="+", help="Imagens, na ordem")
+    p.add_argument("--inicio", type=float, default=0.0, help="Tempo da primeira imagem")
+    p.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre as imagens")
+    _opcoes_imagens(p, layer=2, duracao=2.0)
+    _opcoes_projeto(p, "meu_video.osp")
+    p.set_defaults(funcao=cmd_interval)
+
+    p = sub.add_parser("gallery", help="Slideshow com as fotos de uma pasta")
+    p.add_argument("pasta", help="Pasta das fotos")
+    p.add_argument("--extensoes", default=EXTENSOES_GALERIA,
+                   help=f"Extensões aceitas (padrão: {EXTENSOES_GALERIA})")
+    p.add_argument("--inicio", type=float, default=0.0, help="Tempo da primeira foto")
+    p.add_argument("--intervalo", type=float, default=4.5, help="Segundos entre as fotos")
+    p.add_argument("--ordem", choices=tuple(ORDENS_GALERIA), default="nome",
+                   help="nome (ordem natural), modificacao, captura (data do EXIF) "
+                        "ou disco (sem ordenar; padrão: nome)")
+    p.add_argument("--decrescente", action="store_true", help="Inverte a ordem")
+    p.add_argument("--pular", type=_nao_negativo, default=0, metavar="N",
+                   help="Ignora as N primeiras fotos (após a ordenação)")
+    p.add_argument("--limite", type=_nao_negativo, metavar="N", help="Usa no máximo N fotos")
+    p.add_argument("--sem-subpastas", action="store_true",
+                   help="Não inclui as fotos das subpastas")
+    _opcoes_imagens(p, layer=1, duracao=4.0)
+    _opcoes_projeto(p, "galeria_fotos.osp")
+    p.set_defaults(funcao=cmd_gallery)
+
+    p = sub.add_parser("merge", help="Junta vários projetos em um")
+    p.add_argument("projetos", nargs="+", type=_entrada_merge,
+                   help="Projetos; PROJETO@SEGUNDOS[:CAMADAS] desloca os clips")
+    p.add_argument("-o", "--projeto", required=True, help="Projeto gerado")
+    p.add_argument("--compacto", action="store_true", help="Grava o JSON sem indentação")
+    p.set_defaults(funcao=cmd_merge)
+
+    p = sub.add_parser("proxies", help="Troca as imagens grandes por cópias reduzidas "
+                                       "(prévia mais leve no OpenShot)")
+    p.add_argument("projeto")
+    p.add_argument("--originais", action="store_true",
+                   help="Volta às imagens originais (antes da renderização final)")
+    p.add_argument("--pasta-cache", metavar="PASTA",
+                   help="Pasta dos proxies (padrão: ~/.cache/openshot_sync/proxies)")
+    p.add_argument("--trabalhadores", type=int, help="Processos (padrão: número de CPUs)")
+    p.add_argument("--journal", action="store_true",
+                   help="Grava só as entradas alteradas no diário")
+    p.add_argument("--compacto", action="store_true", help="Grava o JSON sem indentação")
+    p.add_argument("--modo-saida", choices=("normal", "progress", "quiet"), default="normal")
+    p.set_defaults(funcao=cmd_proxies)
+
+    p = sub.add_parser("stats", help="Resumo de um projeto")
+    p.add_argument("projeto")
+    p.add_argument("--json", action="store_true", help="Saída em JSON")
+    p.set_defaults(funcao=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Operação cancelada pelo usuário")
+        sys.exit(130)
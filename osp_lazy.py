@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Carregamento preguiçoso (lazy) de projetos OpenShot (.osp)
+Mapeia o arquivo em memória (mmap) e mantém apenas as configurações do
+projeto, os arquivos e o cabeçalho de cada clip; as subárvores de keyframes
+ficam no trecho de bytes do clip e só são interpretadas quando acessadas
+"""
+
+import json
+import mmap
+import re
+from sys import intern
+from collections.abc import MutableMapping
+from json.scanner import make_scanner
+from typing import Dict, Iterator, Optional
+
+_WS = re.compile(r'[ \t\n\r]*')
+# Caracteres que abrem/fecham objetos, arrays e strings
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+# Resto de uma string JSON até as aspas de fechamento (inclusive)
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+
+
+def _nested_pattern(depth: int) -> str:
+    """Objeto/array com até `depth` níveis, casado inteiro pelo motor de regex"""
+    pattern = ''
+    for _ in range(depth):
+        # Cada trecho fora de strings é casado até o fim (o lookahead impede
+        # dividi-lo), então uma falha não causa retrocesso exponencial
+        pattern = (r'[{\[](?:[^\[\]{}"]+(?=[\[\]{}"])|' + _STRING
+                   + (f'|{pattern}' if pattern else '') + r')*[}\]]')
+    return pattern
+
+
+# Subárvores de até 10 níveis (keyframes têm 5) são puladas numa única busca;
+# as mais profundas, ou cortadas pelo fim da janela, caractere a caractere
+_NESTED_VALUE = re.compile(_nested_pattern(10))
+# Um membro do clip: chave, valor simples (sem escapes) ou subárvore, e o
+# separador seguinte
+_MEMBER = re.compile(
+    r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*'
+    r'(?:(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null|"[^"\\]*")|'
+    + _nested_pattern(10) + r')[ \t\n\r]*([,}])')
+# Abertura de um clip indentado: '{', quebra de linha e a indentação dos membros
+_FIRST_MEMBER = re.compile(r'\{\n( +)"')
+_LITERALS = {'true': True, 'false': False, 'null': None}
+_EMPTY = ('{}', '[]')
+# Folga mínima da janela para ler um clip sem recarregá-la
+_CLIP_MARGIN = 1024 * 1024
+_CHUNK = 4 * 1024 * 1024
+# Bytes mantidos antes do clip ao recarregar a janela (para ver sua indentação)
+_INDENT_LOOKBACK = 256
+
+
+# Marca, no cabeçalho de um LazyClip, as chaves cujo valor é uma subárvore
+# (keyframes etc.) que fica apenas no arquivo
+_NESTED = object()
+
+
+class LazyClip(MutableMapping):
+    """
+    Clip carregado sob demanda
+
+    Os valores simples (id, file_id, position, layer, start, end...) ficam
+    disponíveis imediatamente. O primeiro acesso a uma subárvore (keyframes)
+    materializa o clip inteiro como dicionário; a partir daí ele é considerado
+    alterado e será serializado novamente ao salvar. Clips nunca
+    materializados são copiados byte a byte do arquivo original.
+    """
+
+    __slots__ = ('_source', '_start', '_end', '_header', '_data')
+
+    def __init__(self, source, start: int, end: int, header: Dict):
+        self._source = source
+        self._start = start
+        self._end = end
+        self._header = header
+        self._data: Optional[Dict] = None
+
+    @property
+    def touched(self) -> bool:
+        """True se o clip foi materializado (e pode ter sido alterado)"""
+        return self._data is not None
+
+    def _parse(self) -> Dict:
+        return json.loads(self._source[self._start:self._end])
+
+    def materialize(self) -> Dict:
+        """Interpreta o clip inteiro e passa a usar o dicionário resultante"""
+        if self._data is None:
+            self._data = self._parse()
+            self._header = None
+        return self._data
+
+    def __getitem__(self, key):
+        if self._data is not None:
+            return self._data[key]
+        value = self._header[key]
+        if value is _NESTED:
+            return self.materialize()[key]
+        return value
+
+    def __setitem__(self, key, value):
+        self.materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self.materialize()[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data if self._data is not None else self._header)
+
+    def __len__(self) -> int:
+        return len(self._data if self._data is not None else self._header)
+
+    def __repr__(self) -> str:
+        state = "alterado" if self.touched else "preguiçoso"
+        return f"<LazyClip {self.get('id')!r} ({state})>"
+
+    def to_dict(self) -> Dict:
+        """Dicionário completo do clip (sem materializá-lo)"""
+        return self._data if self._data is not None else self._parse()
+
+    def raw_json(self) -> Optional[str]:
+        """Texto JSON original do clip, ou None se ele foi materializado"""
+        if self._data is not None:
+            return None
+        return self._source[self._start:self._end].decode('utf-8')
+
+
+class _Reader:
+    """
+    Leitor de JSON sobre uma janela do arquivo mapeado
+
+    A janela é decodificada como latin-1 (um caractere por byte), então as
+    posições no texto correspondem às posições em bytes; valores com bytes
+    não ASCII são reinterpretados como UTF-8 a partir do trecho original.
+    """
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.size = len(buf)
+        self.scan_once = make_scanner(json.JSONDecoder())
+        # Chaves de clip já vistas (validadas e internadas) no caminho indentado
+        self.keys: Dict[str, str] = {}
+        self._load(0, _CHUNK)
+
+    def _load(self, pos: int, size: int):
+        self.base = pos
+        self.text = self.buf[pos:pos + size].decode('latin-1')
+        self.idx = 0
+
+    @property
+    def pos(self) -> int:
+        return self.base + self.idx
+
+    def _window_at_eof(self) -> bool:
+        return self.base + len(self.text) >= self.size
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, "", self.pos)
+
+    def skip_ws(self):
+        while True:
+            self.idx = _WS.match(self.text, self.idx).end()
+            if self.idx < len(self.text) or self._window_at_eof():
+                return
+            self._load(self.pos, _CHUNK)
+
+    def peek(self) -> str:
+        self.skip_ws()
+        if self.idx >= len(self.text):
+            raise self.error("Fim inesperado do arquivo")
+        return self.text[self.idx]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self.error(f"Esperado '{char}'")
+        self.idx += 1
+
+    def value(self):
+        """
+        Lê o próximo valor JSON
+
+        Returns:
+            Tupla (valor, início, fim) com as posições em bytes
+        """
+        self.skip_ws()
+        while True:
+            try:
+                value, end = self.scan_once(self.text, self.idx)
+            except (StopIteration, json.JSONDecodeError):
+                end = None
+            # Um valor que termina no fim da janela pode estar truncado
+            if end is not None and (end < len(self.text) or self._window_at_eof()):
+                break
+            if self._window_at_eof():
+                raise self.error("Valor JSON inválido")
+            self._load(self.pos, max(_CHUNK, 2 * len(self.text)))
+
+        start = self.pos
+        self.idx = end
+        stop = self.pos
+        # Texto não ASCII (como latin-1) pode ser UTF-8 mal interpretado: relê o trecho
+        if isinstance(value, str):
+            if not value.isascii():
+                value = json.loads(self.buf[start:stop])
+        elif isinstance(value, (dict, list)) and not self.buf[start:stop].isascii():
+            value = json.loads(self.buf[start:stop])
+        return value, start, stop
+
+    def skip_nested(self):
+        """
+        Pula o objeto ou array que começa na posição atual, só casando
+        colchetes/chaves e strings (o conteúdo não é validado nem
+        interpretado; isso fica para quando a subárvore for acessada)
+
+        Returns:
+            Tupla (início, fim) em bytes
+        """
+        self.skip_ws()
+        start = self.pos
+        match = _NESTED_VALUE.match(self.text, self.idx)
+        if match is not None:
+            self.idx = match.end()
+            return start, self.pos
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.text, self.idx)
+            if match is None:
+                if self._window_at_eof():
+                    raise self.error("Fim inesperado do arquivo")
+                self._load(self.base + len(self.text), _CHUNK)
+                continue
+            char = match.group()
+            if char == '"':
+                tail = _STRING_TAIL.match(self.text, match.end())
+                if tail is None:  # String cortada pelo fim da janela
+                    if self._window_at_eof():
+                        raise self.error("String não terminada")
+                    self._load(self.base + match.start(), max(_CHUNK, 2 * len(self.text)))
+                    continue
+                self.idx = tail.end()
+                continue
+            self.idx = match.end()
+            depth += 1 if char in '{[' else -1
+            if depth == 0:
+                return start, self.pos
+
+
+def _read_clip(reader: _Reader, source, clips: list):
+    """
+    Lê um clip (ou uma sequência de clips indentados) interpretando só os
+    valores simples; as subárvores são puladas sem construir objetos e
+    relidas do trecho original quando acessadas
+    """
+    reader.skip_ws()
+    if reader.size - reader.pos > len(reader.text) - reader.idx < _CLIP_MARGIN:
+        # Mantém o começo da linha na janela para o caminho indentado
+        back = min(reader.pos, _INDENT_LOOKBACK)
+        reader._load(reader.pos - back, back + _CHUNK)
+        reader.idx = back
+    if _read_clips_indented(reader, source, clips):
+        return
+    clip = _read_clip_fast(reader, source)
+    clips.append(clip if clip is not None else _read_clip_slow(reader, source))
+
+
+def _read_clips_indented(reader: _Reader, source, clips: list) -> int:
+    """
+    Caminho rápido para arquivos indentados (o formato gravado pelo
+    osp_writer e pelo json.dump com indent): o clip termina na primeira
+    chave de fechamento na sua própria indentação e cada membro começa numa
+    linha na indentação seguinte, então o clip é delimitado com str.find e
+    dividido em membros com str.split. Os valores simples passam pelo
+    scanner em C do json; das subárvores só é conferida a linha de
+    fechamento. Continua nos clips seguintes enquanto eles tiverem o mesmo
+    formato e couberem na janela.
+
+    Returns:
+        Quantidade de clips lidos; 0 (sem consumir nada) se o clip atual não
+        estiver nesse formato
+    """
+    text, idx = reader.text, reader.idx
+    line = text.rfind('\n', 0, idx) + 1
+    indent = text[line:idx]
+    first = _FIRST_MEMBER.match(text, idx)
+    if line == 0 or first is None or indent.strip(' '):
+        return 0
+    member_indent = ' ' * len(first.group(1))
+    if len(member_indent) <= len(indent):
+        return 0
+
+    scan_once, keys = reader.scan_once, reader.keys
+    clip_close = '\n' + indent + '}'
+    next_clip = ',\n' + indent + '{'
+    # A vírgula faz parte do separador: vírgulas faltando ou sobrando deixam
+    # restos que não passam nas verificações abaixo
+    separator = ',\n' + member_indent + '"'
+    opening = first.group()
+    closers = {'{': '\n' + member_indent + '}', '[': '\n' + member_indent + ']'}
+    limit = len(text) if reader._window_at_eof() else len(text) - _CLIP_MARGIN
+    count = 0
+    while True:
+        close = text.find(clip_close, idx)
+        if close < 0 or not text.startswith(opening, idx):
+            break
+        header = {}
+        for member in text[idx + len(opening):close].split(separator):
+            key, _, raw = member.partition('": ')
+            name = keys.get(key)
+            if name is None:
+                if not raw or '"' in key or '\\' in key:
+                    break
+                name = keys[key] = intern(key if key.isascii() else key.encode('latin-1').decode('utf-8'))
+            closer = closers.get(raw[:1])
+            if closer is not None:
+                if not raw.endswith(closer) and raw not in _EMPTY:
+                    break
+                header[name] = _NESTED
+                continue
+            try:
+                value, end = scan_once(raw, 0)
+            except (StopIteration, json.JSONDecodeError):
+                break
+            if end != len(raw):
+                break
+            if value.__class__ is str and not raw.isascii():
+                value = json.loads(raw.encode('latin-1'))  # O original é UTF-8
+            header[name] = value
+        else:
+            end = close + len(clip_close)
+            clips.append(LazyClip(source, reader.base + idx, reader.base + end, header))
+            count += 1
+            reader.idx = end
+            if end < limit and text.startswith(next_clip, end):
+                idx = end + len(next_clip) - 1
+                continue
+        break
+    return count
+
+
+def _header_value(raw: str):
+    """Valor simples de um membro a partir do texto casado pela regex"""
+    if raw[0] == '"':
+        value = raw[1:-1]
+        if not value.isascii():  # Veio da janela como latin-1; o original é UTF-8
+            value = value.encode('latin-1').decode('utf-8')
+        return value
+    if raw in _LITERALS:
+        return _LITERALS[raw]
+    if '.' in raw or 'e' in raw or 'E' in raw:
+        return float(raw)
+    return int(raw)
+
+
+def _read_clip_fast(reader: _Reader, source) -> Optional[LazyClip]:
+    """
+    Caminho para clips sem indentação: clip inteiro dentro da janela,
+    strings sem escapes e subárvores de até 10 níveis, com uma busca de
+    regex por membro. Retorna None (sem consumir nada) se o clip não se
+    encaixar.
+    """
+    text, idx = reader.text, reader.idx
+    start = reader.base + idx
+    if text[idx:idx + 1] != '{':
+        return None
+    member = _MEMBER.match
+    header = {}
+    idx += 1
+    while True:
+        match = member(text, idx)
+        if match is None:
+            return None
+        key, raw, separator = match.groups()
+        if not key.isascii():
+            key = key.encode('latin-1').decode('utf-8')
+        header[intern(key)] = _NESTED if raw is None else _header_value(raw)
+        idx = match.end()
+        if separator == '}':
+            break
+    reader.idx = idx
+    return LazyClip(source, start, reader.pos, header)
+
+
+def _read_clip_slow(reader: _Reader, source) -> LazyClip:
+    """Caminho geral de _read_clip, membro a membro, recarregando a janela"""
+    reader.skip_ws()
+    start = reader.pos
+    reader.expect('{')
+    header = {}
+    if reader.peek() == '}':
+        reader.idx += 1
+        return LazyClip(source, start, reader.pos, header)
+    while True:
+        key, _, _ = reader.value()
+        if not isinstance(key, str):
+            raise reader.error("Chave inválida")
+        reader.expect(':')
+        if reader.peek() in '{[':
+            reader.skip_nested()
+            header[intern(key)] = _NESTED
+        else:
+            header[intern(key)] = reader.value()[0]
+        char = reader.peek()
+        reader.idx += 1
+        if char == '}':
+            return LazyClip(source, start, reader.pos, header)
+        if char != ',':
+            raise reader.error("Esperado ',' ou '}'")
+
+
+def _read_clips(reader: _Reader, source) -> list:
+    reader.expect('[')
+    clips = []
+    if reader.peek() == ']':
+        reader.idx += 1
+        return clips
+    while True:
+        if reader.peek() == '{':
+            _read_clip(reader, source, clips)
+        else:
+            clips.append(reader.value()[0])
+        char = reader.peek()
+        reader.idx += 1
+        if char == ']':
+            return clips
+        if char != ',':
+            raise reader.error("Esperado ',' ou ']'")
+
+
+def load_project_lazy(project_path: str) -> Dict:
+    """
+    Carrega o projeto mantendo os clips como LazyClip sobre o arquivo mapeado
+
+    O mapeamento continua aberto enquanto os clips existirem. Salvar o
+    projeto por cima do mesmo arquivo é seguro: a gravação usa um arquivo
+    temporário e os.replace, e o mapeamento antigo continua válido.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir
+        json.JSONDecodeError: Se o conteúdo não for um projeto JSON válido
+    """
+    with open(project_path, 'rb') as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Arquivo vazio
+            raise json.JSONDecodeError("Arquivo vazio", "", 0)
+
+    reader = _Reader(source)
+    reader.expect('{')
+    project_data = {}
+    if reader.peek() == '}':
+        return project_data
+    while True:
+        key, _, _ = reader.value()
+        if not isinstance(key, str):
+            raise reader.error("Chave inválida")
+        reader.expect(':')
+        if key == 'clips' and reader.peek() == '[':
+            project_data[key] = _read_clips(reader, source)
+        else:
+            project_data[key], _, _ = reader.value()
+        char = reader.peek()
+        reader.idx += 1
+        if char == '}':
+            return project_data
+        if char != ',':
+            raise reader.error("Esperado ',' ou '}'")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Junção de projetos OpenShot (.osp)
+Combina os clips de vários projetos em um só, com deslocamento de tempo e
+de camada por projeto, renumerando ids repetidos e unificando as entradas
+de 'files' que apontam para o mesmo arquivo
+
+Os projetos são mapeados em memória (osp_lazy) e de cada um fica só um
+índice compacto (posição e trecho de bytes de cada clip, ordenados pela
+posição). Os clips são intercalados por uma junção k-way com heap e
+gravados em fluxo: cada clip é lido do arquivo de origem no momento da
+gravação, então a memória não depende do tamanho dos keyframes e nenhum
+projeto fica inteiro carregado.
+"""
+
+import heapq
+import json
+import os
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import project_journal
+from osp_lazy import LazyClip, load_project_lazy
+from osp_writer import StreamedItems, write_project
+
+# Entrada: 'projeto.osp' ou (projeto, deslocamento em segundos[, deslocamento de camada])
+MergeInput = Union[str, Tuple[str, float], Tuple[str, float, int]]
+
+
+def _media_key(path: str, project_dir: str) -> str:
+    """Caminho absoluto normalizado (relativos partem da pasta do projeto)"""
+    return os.path.normcase(os.path.abspath(os.path.join(project_dir, path)))
+
+
+def _free_id(prefix: str, used: set, counter: List[int]) -> str:
+    while True:
+        counter[0] += 1
+        candidate = f"{prefix}_{counter[0]}"
+        if candidate not in used:
+            return candidate
+
+
+def _as_input(item: MergeInput) -> Tuple[str, float, int]:
+    if isinstance(item, str):
+        return item, 0.0, 0
+    path, offset, *rest = item
+    return path, float(offset), int(rest[0]) if rest else 0
+
+
+class _RawClip:
+    """Clip copiado sem alterações do arquivo de origem"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def raw_json(self) -> str:
+        return self.text
+
+
+class _ProjectIndex:
+    """
+    Clips de um projeto de entrada, ordenados pela posição
+
+    Clips preguiçosos guardam só o trecho de bytes no arquivo mapeado; os
+    que vieram do diário (dicionários) ficam em `entries`, com início -1 e
+    o índice da lista no lugar do fim.
+    """
+
+    def __init__(self, source, offset: float, layer_offset: int,
+                 file_map: Dict[str, str]):
+        self.source = source
+        self.offset = offset
+        self.layer_offset = layer_offset
+        self.file_map = file_map
+        self.positions = array('d')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.entries: List[Dict] = []
+        # Clips renumerados: índice -> novo id
+        self.new_ids: Dict[int, str] = {}
+        # 1 para os clips que precisam ser reescritos (id ou file_id renumerado)
+        self.rewrite = bytearray()
+
+    def add(self, clip, new_id: Optional[str]):
+        index = len(self.positions)
+        self.positions.append(clip.get('position', 0) + self.offset)
+        if isinstance(clip, LazyClip) and not clip.touched:
+            self.starts.append(clip._start)
+            self.ends.append(clip._end)
+        else:
+            to_dict = getattr(clip, 'to_dict', None)
+            self.starts.append(-1)
+            self.ends.append(len(self.entries))
+            self.entries.append(to_dict() if to_dict is not None else clip)
+        if new_id is not None:
+            self.new_ids[index] = new_id
+        self.rewrite.append(new_id is not None or clip.get('file_id') in self.file_map)
+
+    def sort(self):
+        """Reordena os clips pela posição (estável: empates mantêm a ordem do arquivo)"""
+        order = sorted(range(len(self.positions)), key=self.positions.__getitem__)
+        self.positions = array('d', (self.positions[i] for i in order))
+        self.starts = array('q', (self.starts[i] for i in order))
+        self.ends = array('q', (self.ends[i] for i in order))
+        self.rewrite = bytearray(self.rewrite[i] for i in order)
+        self.new_ids = {new: self.new_ids[old] for new, old in enumerate(order)
+                        if old in self.new_ids}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def keys(self, k: int) -> Iterator[Tuple[float, int, int]]:
+        """(posição, projeto, índice) de cada clip, na ordem da timeline"""
+        for i, position in enumerate(self.positions):
+            yield position, k, i
+
+    def clip(self, i: int):
+        """Clip i pronto para gravar: o texto original ou um dicionário ajustado"""
+        start = self.starts[i]
+        shifted = self.offset or self.layer_offset
+        if start >= 0 and not shifted and not self.rewrite[i]:
+            return _RawClip(self.source[start:self.ends[i]].decode('utf-8'))
+        if start >= 0:
+            clip = json.loads(self.source[start:self.ends[i]])
+        else:
+            clip = dict(self.entries[self.ends[i]])
+        if shifted:
+            clip['position'] = self.positions[i]
+            clip['layer'] = clip.get('layer', 0) + self.layer_offset
+        if self.rewrite[i]:
+            clip['file_id'] = self.file_map.get(clip.get('file_id'), clip.get('file_id'))
+            if i in self.new_ids:
+                clip['id'] = self.new_ids[i]
+        return clip
+
+
+def merge_projects(inputs: Sequence[MergeInput], output_path: str,
+                   compact: bool = False) -> Dict:
+    """
+    Junta projetos em output_path
+
+    As configurações (tamanho, fps...) vêm do primeiro projeto. Os clips
+    ficam ordenados pela posição; em posições iguais, vale a ordem das
+    entradas. Ids repetidos são renumerados nos projetos seguintes (o
+    primeiro a usar um id o mantém). O diário de output_path, se houver,
+    é apagado: ele não corresponde ao projeto gerado.
+
+    Args:
+        inputs: Caminhos ou tuplas (projeto, deslocamento em segundos[,
+            deslocamento de camada])
+        output_path: Projeto gerado (pode ser uma das entradas)
+        compact: Grava o JSON sem indentação
+
+    Returns:
+        Relatório com as chaves projects, clips, files, files_shared,
+        ids_remapped e bytes_written
+    """
+    if not inputs:
+        raise ValueError("Nenhum projeto para juntar")
+    report = {'projects': len(inputs), 'clips': 0, 'files': 0, 'files_shared': 0,
+              'ids_remapped': 0, 'bytes_written': 0}
+    merged: Optional[Dict] = None
+    files: List[Dict] = []
+    layers: Dict[int, Dict] = {}
+    by_media: Dict[str, str] = {}
+    file_ids, clip_ids = set(), set()
+    file_counter, clip_counter = [0], [0]
+    indexes: List[_ProjectIndex] = []
+
+    for item in inputs:
+        path, offset, layer_offset = _as_input(item)
+        project = load_project_lazy(path)
+        project_journal.replay_journal(project, path)
+        if merged is None:
+            # Mantém a ordem das chaves; os clips são substituídos no fim
+            merged = dict(project, clips=None)
+        project_dir = os.path.dirname(os.path.abspath(path))
+
+        file_map = {}
+        for entry in project.get('files', []):
+            # Entradas que usam proxy são identificadas pela imagem original
+            media_path = (entry.get('original_media') or entry).get('path')
+            key = _media_key(media_path, project_dir) if media_path else None
+            if key is not None and key in by_media:
+                file_map[entry['id']] = by_media[key]
+                report['files_shared'] += 1
+                continue
+            entry = dict(entry)
+            if entry['id'] in file_ids:
+                file_map[entry['id']] = entry['id'] = _free_id("file", file_ids, file_counter)
+                report['ids_remapped'] += 1
+            file_ids.add(entry['id'])
+            if key is not None:
+                by_media[key] = entry['id']
+            files.append(entry)
+
+        for layer in project.get('layers', []):
+            layer = dict(layer)
+            layer['number'] = layer.get('number', 0) + layer_offset
+            layers.setdefault(layer['number'], layer)
+
+        clips = project.get('clips', [])
+        # O mapeamento é o mesmo para todos os clips preguiçosos do projeto
+        source = next((clip._source for clip in clips if isinstance(clip, LazyClip)), None)
+        index = _ProjectIndex(source, offset, layer_offset, file_map)
+        for clip in clips:
+            clip_id = clip.get('id')
+            new_id = None
+            if clip_id in clip_ids:
+                new_id = clip_id = _free_id("clip", clip_ids, clip_counter)
+                report['ids_remapped'] += 1
+            clip_ids.add(clip_id)
+            index.add(clip, new_id)
+        index.sort()
+        indexes.append(index)
+        # Libera os cabeçalhos dos clips; fica só o índice e o mapeamento
+        del project, clips
+
+    def merged_clips():
+        for _, k, i in heapq.merge(*(index.keys(k) for k, index in enumerate(indexes))):
+            yield indexes[k].clip(i)
+
+    report['clips'] = sum(len(index) for index in indexes)
+    report['files'] = len(files)
+    merged['clips'] = StreamedItems(merged_clips(), report['clips'])
+    merged['files'] = files
+    if layers:
+        merged['layers'] = [layers[number] for number in sorted(layers)]
+    report['bytes_written'] = write_project(merged, output_path, compact=compact)
+    project_journal.remove_journal(output_path)
+    return report
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Modelo compacto de clips e arquivos de projetos OpenShot
+Clip e MediaFile guardam os valores simples em __slots__ e as curvas de
+keyframe estáticas (um único ponto) como números; o dicionário no formato do
+OpenShot só é montado ao serializar, ou quando uma subárvore é acessada
+"""
+
+import copy
+import json
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Tuple
+
+_NESTED_TYPES = (dict, list)
+_UNSET = object()
+
+# Valores aninhados idênticos (texto JSON -> objeto compartilhado)
+_INTERNED: Dict[str, object] = {}
+# Ordens de chaves idênticas compartilham a mesma tupla
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_value(value):
+    """Retorna um objeto compartilhado equivalente a `value` (dict ou lista)"""
+    key = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return _INTERNED.setdefault(key, value)
+
+
+def _key_order(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _KEY_ORDERS.setdefault(keys, keys)
+
+
+def static_curve(value) -> Dict:
+    """Curva de keyframe com um único ponto (X=1) e o valor Y"""
+    return {"Points": [{"co": {"X": 1, "Y": value}, "interpolation": 0}]}
+
+
+def static_value(curve):
+    """
+    Valor Y de uma curva no formato de static_curve(), ou None se a curva
+    tiver outro formato (vários pontos, interpolação etc.)
+    """
+    if type(curve) is not dict or len(curve) != 1:
+        return None
+    points = curve.get("Points")
+    if type(points) is not list or len(points) != 1:
+        return None
+    point = points[0]
+    if type(point) is not dict or list(point) != ["co", "interpolation"]:
+        return None
+    co = point["co"]
+    if (point["interpolation"] != 0 or type(point["interpolation"]) is not int
+            or type(co) is not dict or list(co) != ["X", "Y"]
+            or type(co["X"]) is not int or co["X"] != 1):
+        return None
+    value = co["Y"]
+    return value if type(value) in (int, float) else None
+
+
+class _Record(MutableMapping):
+    """
+    Registro com acesso de dicionário sobre __slots__
+
+    Cada subclasse declara em _KINDS as chaves guardadas em slots: False para
+    valores simples e True para curvas de keyframe guardadas pelo valor Y.
+    As demais chaves, e valores que não cabem no slot, ficam em _extra (os
+    aninhados, compartilhados via intern_value). O primeiro acesso a um valor
+    aninhado materializa o registro como dicionário, que passa a ser a fonte
+    dos dados (como em osp_lazy.LazyClip).
+    """
+
+    __slots__ = ('_keys', '_extra', '_data')
+    _KINDS: Dict[str, bool] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        """Converte um registro lido do .osp, preservando a ordem das chaves"""
+        record = cls.__new__(cls)
+        kinds = cls._KINDS
+        extra = {}
+        for key, value in data.items():
+            kind = kinds.get(key)
+            if kind:
+                y = static_value(value)
+                if y is not None:
+                    setattr(record, key, y)
+                    continue
+            elif kind is not None and type(value) not in _NESTED_TYPES:
+                setattr(record, key, value)
+                continue
+            extra[key] = intern_value(value) if type(value) in _NESTED_TYPES else value
+        record._keys = _key_order(tuple(data))
+        record._extra = extra or None
+        record._data = None
+        return record
+
+    @property
+    def materialized(self) -> bool:
+        """True se o registro já foi convertido em dicionário"""
+        return self._data is not None
+
+    def _value(self, key):
+        """Valor guardado (curvas estáticas como número); KeyError se faltar"""
+        if key in self._KINDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        extra = self._extra
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        return extra[key]
+
+    def to_dict(self) -> Dict:
+        """
+        Dicionário no formato do OpenShot
+
+        Valores aninhados podem ser compartilhados com outros registros:
+        use o resultado apenas para leitura/serialização.
+        """
+        if self._data is not None:
+            return self._data
+        kinds = self._KINDS
+        result = {}
+        for key in self._keys:
+            value = self._value(key)
+            if kinds.get(key) and type(value) not in _NESTED_TYPES:
+                value = static_curve(value)
+            result[key] = value
+        return result
+
+    def materialize(self) -> Dict:
+        """Passa a guardar o registro como dicionário próprio (editável)"""
+        if self._data is None:
+            data = self.to_dict()
+            for key, value in data.items():
+                if type(value) in _NESTED_TYPES and self._extra and self._extra.get(key) is value:
+                    data[key] = copy.deepcopy(value)
+            self._data = data
+            self._extra = None
+        return self._data
+
+    def __getitem__(self, key):
+        if self._data is not None:
+            return self._data[key]
+        kind = self._KINDS.get(key)
+        if kind is not None:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                pass
+            else:
+                return self.materialize()[key] if kind else value
+        extra = self._extra
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        value = extra[key]
+        if type(value) in _NESTED_TYPES:
+            return self.materialize()[key]
+        return value
+
+    def __setitem__(self, key, value):
+        if self._data is not None:
+            self._data[key] = value
+            return
+        kind = self._KINDS.get(key)
+        stored = _UNSET
+        if kind:
+            y = static_value(value)
+            if y is not None:
+                stored = y
+        elif type(value) not in _NESTED_TYPES:
+            if kind is None:
+                # Chave sem slot com valor simples: fica em _extra
+                if key not in self._keys:
+                    self._keys = _key_order(self._keys + (key,))
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+                return
+            stored = value
+        if stored is _UNSET or (self._extra is not None and key in self._extra):
+            self.materialize()[key] = value
+            return
+        if key not in self._keys:
+            self._keys = _key_order(self._keys + (key,))
+        setattr(self, key, stored)
+
+    def __delitem__(self, key):
+        del self.materialize()[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data if self._data is not None else self._keys)
+
+    def __len__(self) -> int:
+        return len(self._data if self._data is not None else self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in (self._data if self._data is not None else self._keys)
+
+    def __eq__(self, other):
+        if not isinstance(other, MutableMapping):
+            return NotImplemented
+        other_dict = getattr(other, 'to_dict', None)
+        return self.to_dict() == (other_dict() if other_dict is not None else dict(other))
+
+    __hash__ = None
+
+
+class Clip(_Record):
+    """
+    Clip de imagem da timeline
+
+    position, start, end e layer são floats/ints comuns; as curvas alpha,
+    location_x, location_y, scale_x e scale_y ficam como o valor Y enquanto
+    forem estáticas (clip.scale_x == 0.5, por exemplo).
+    """
+
+    __slots__ = ('id', 'file_id', 'position', 'start', 'end', 'layer',
+                 'alpha', 'location_x', 'location_y', 'scale_x', 'scale_y')
+    _KINDS = {
+        'id': False, 'file_id': False, 'position': False, 'start': False,
+        'end': False, 'layer': False,
+        'alpha': True, 'location_x': True, 'location_y': True,
+        'scale_x': True, 'scale_y': True,
+    }
+    _DEFAULT_KEYS = _key_order(tuple(__slots__))
+
+    def __init__(self, clip_id: str, file_id: str, position: float, duration: float,
+                 layer: int = 1, x: float = 0.0, y: float = 0.0,
+                 scale_x: float = 1.0, scale_y: float = 1.0):
+        self.id = clip_id
+        self.file_id = file_id
+        self.position = position
+        self.start = 0
+        self.end = duration
+        self.layer = layer
+        self.alpha = 1
+        self.location_x = x
+        self.location_y = y
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        self._keys = self._DEFAULT_KEYS
+        self._extra = None
+        self._data = None
+
+    def to_dict(self) -> Dict:
+        if self._data is None and self._extra is None and self._keys is self._DEFAULT_KEYS:
+            # Caso comum (clips criados pelo sincronizador): monta direto
+            return {
+                "id": self.id,
+                "file_id": self.file_id,
+                "position": self.position,
+                "start": self.start,
+                "end": self.end,
+                "layer": self.layer,
+                "alpha": static_curve(self.alpha),
+                "location_x": static_curve(self.location_x),
+                "location_y": static_curve(self.location_y),
+                "scale_x": static_curve(self.scale_x),
+                "scale_y": static_curve(self.scale_y),
+            }
+        return super().to_dict()
+
+    def static_values(self) -> Optional[tuple]:
+        """
+        Valores de (id, file_id, position, start, end, layer, alpha,
+        location_x, location_y, scale_x, scale_y) se o clip tiver exatamente o
+        formato criado pelo sincronizador; None caso contrário
+        """
+        if self._data is None and self._extra is None and self._keys is self._DEFAULT_KEYS:
+            return (self.id, self.file_id, self.position, self.start, self.end, self.layer,
+                    self.alpha, self.location_x, self.location_y, self.scale_x, self.scale_y)
+        return None
+
+    def __repr__(self) -> str:
+        return f"<Clip {self.get('id')!r} {self.get('file_id')!r} @ {self.get('position')}s>"
+
+
+class MediaFile(_Record):
+    """Entrada de 'files' do projeto (imagem usada pelos clips)"""
+
+    __slots__ = ('id', 'path', 'media_type', 'width', 'height')
+    _KINDS = {'id': False, 'path': False, 'media_type': False,
+              'width': False, 'height': False}
+    _BASE_KEYS = _key_order(('id', 'path', 'media_type'))
+    _SIZED_KEYS = _key_order(tuple(__slots__))
+
+    def __init__(self, file_id: str, path: str, media_type: str = "image",
+                 width: Optional[int] = None, height: Optional[int] = None):
+        self.id = file_id
+        self.path = path
+        self.media_type = media_type
+        self._keys = self._BASE_KEYS
+        if width:
+            self.width = width
+            self.height = height
+            self._keys = self._SIZED_KEYS
+        self._extra = None
+        self._data = None
+
+    def __repr__(self) -> str:
+        return f"<MediaFile {self.get('id')!r} {self.get('path')!r}>"
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Gravação em fluxo de projetos OpenShot (.osp)
+Escreve as chaves do projeto e cada clip/arquivo diretamente no arquivo,
+um registro por vez, sem montar o JSON inteiro em memória
+"""
+
+import errno
+import json
+import os
+import tempfile
+from collections.abc import Sequence
+from typing import Dict, Iterable
+
+# Listas gravadas registro a registro
+STREAMED_KEYS = ('clips', 'files', 'effects')
+
+_BUFFER_SIZE = 1024 * 1024
+
+# Abertura exclusiva do temporário, como no tempfile.mkstemp
+_TEMP_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_EXCL
+               | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0))
+
+
+class StreamedItems:
+    """
+    Lista gerada durante a gravação
+
+    Os itens vêm de um iterável consumido uma única vez, na ordem em que
+    são gravados; o tamanho precisa ser conhecido de antemão. Permite gravar
+    listas que nunca existem inteiras em memória (junção de projetos).
+    """
+
+    __slots__ = ('_items', '_length')
+
+    def __init__(self, items: Iterable, length: int):
+        self._items = items
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+def to_jsonable(value):
+    """
+    Hook `default` do json: objetos de modelo são gravados via to_dict() e
+    sequências que não são listas (ClipTable, StreamedItems) como listas
+    """
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is None:
+        if isinstance(value, (Sequence, StreamedItems)) and not isinstance(value, (str, bytes)):
+            return list(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+class _Encoder:
+    """Codifica valores no modo compacto ou indentado"""
+
+    def __init__(self, compact: bool, indent: int):
+        self.compact = compact
+        self.indent = indent
+        if compact:
+            encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'),
+                                       default=to_jsonable)
+        else:
+            encoder = json.JSONEncoder(ensure_ascii=False, indent=indent,
+                                       default=to_jsonable)
+        self._dumps = encoder.encode
+
+    def value(self, value, level: int) -> str:
+        """Codifica um valor que começa no nível de indentação `level`"""
+        text = self._dumps(value)
+        if self.compact or level == 0 or "\n" not in text:
+            return text
+        return text.replace("\n", "\n" + " " * (self.indent * level))
+
+    def newline(self, level: int) -> str:
+        return "" if self.compact else "\n" + " " * (self.indent * level)
+
+
+def _create_temp(directory: str, prefix: str, suffix: str):
+    """
+    Como tempfile.mkstemp, mas com o modo 0o666: o sistema aplica a umask
+    (e as ACLs padrão do diretório) como em qualquer arquivo novo, sem que
+    o processo precise ler ou alterar a umask
+
+    Returns:
+        Tupla (descritor, caminho)
+    """
+    for _ in range(tempfile.TMP_MAX):
+        path = os.path.join(directory, prefix + os.urandom(6).hex() + suffix)
+        try:
+            return os.open(path, _TEMP_FLAGS, 0o666), path
+        except FileExistsError:
+            continue
+    raise FileExistsError(errno.EEXIST, "Nenhum nome temporário disponível", directory)
+
+
+def write_project(project_data: Dict, output_path: str,
+                  compact: bool = False, indent: int = 2) -> int:
+    """
+    Grava o projeto em output_path de forma atômica
+
+    O conteúdo vai para um arquivo temporário no mesmo diretório, que só
+    substitui o destino (os.replace) depois de gravado por completo. Os
+    clips, arquivos e efeitos são codificados um de cada vez, então o uso
+    de memória não depende da quantidade de clips. Clips preguiçosos ainda
+    não alterados são copiados byte a byte do arquivo de origem.
+
+    Args:
+        project_data: Dicionário do projeto
+        output_path: Arquivo de destino
+        compact: Sem indentação e com separadores mínimos
+        indent: Indentação do modo legível (o mesmo formato de json.dump)
+
+    Returns:
+        Número de bytes gravados
+    """
+    encoder = _Encoder(compact, indent)
+    key_sep = ':' if compact else ': '
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = _create_temp(directory, '.' + os.path.basename(output_path) + '.', '.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', buffering=_BUFFER_SIZE) as f:
+            write = f.write
+            write("{")
+            first_key = True
+            for key, value in project_data.items():
+                write(("" if first_key else ",") + encoder.newline(1))
+                first_key = False
+                write(encoder.value(key, 1) + key_sep)
+                if (key in STREAMED_KEYS and isinstance(value, (Sequence, StreamedItems))
+                        and not isinstance(value, str) and len(value)):
+                    write("[")
+                    first_item = True
+                    for item in value:
+                        write(("" if first_item else ",") + encoder.newline(2))
+                        first_item = False
+                        # Clips carregados sem alteração (osp_lazy) são copiados como estão
+                        raw_json = getattr(item, 'raw_json', None)
+                        text = raw_json() if raw_json is not None else None
+                        write(text if text is not None else encoder.value(item, 2))
+                    write(encoder.newline(1) + "]")
+                else:
+                    write(encoder.value(value, 1))
+            if not first_key:
+                write(encoder.newline(0))
+            write("}")
+        written = os.path.getsize(tmp_path)
+        # Um projeto existente mantém suas permissões; um novo fica com as do temporário
+        if os.path.exists(output_path):
+            os.chmod(tmp_path, os.stat(output_path).st_mode & 0o7777)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return written
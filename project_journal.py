@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Diário (journal) de alterações de projetos OpenShot
+Guarda os clips e arquivos adicionados ou alterados (e os ids dos clips
+removidos) em um arquivo lateral, uma linha JSON compacta por registro,
+para que cada checkpoint custe proporcionalmente à alteração e não ao
+tamanho do projeto
+"""
+
+import json
+import os
+from typing import Dict, Iterable
+
+from osp_writer import to_jsonable
+
+JOURNAL_SUFFIX = ".journal"
+
+# Tamanho a partir do qual o diário é consolidado no .osp
+JOURNAL_MAX_BYTES = 64 * 1024 * 1024
+
+_SEPARATORS = (',', ':')
+
+
+def journal_path(project_path: str) -> str:
+    """Caminho do diário associado ao projeto"""
+    return project_path + JOURNAL_SUFFIX
+
+
+def journal_size(project_path: str) -> int:
+    """Tamanho do diário em bytes (0 se não existir)"""
+    try:
+        return os.path.getsize(journal_path(project_path))
+    except OSError:
+        return 0
+
+
+def append_journal(project_path: str, clips: Iterable[Dict], files: Iterable[Dict],
+                   removed_clips: Iterable[str] = ()) -> int:
+    """
+    Acrescenta os registros ao diário do projeto
+
+    Args:
+        removed_clips: Ids de clips removidos (gravados antes dos clips, para
+            que um id removido e adicionado de novo continue no projeto)
+
+    Returns:
+        Número de bytes escritos
+    """
+    encode = json.JSONEncoder(ensure_ascii=False, separators=_SEPARATORS,
+                              default=to_jsonable).encode
+    lines = [encode({"file": entry}) for entry in files]
+    lines.extend(encode({"remove_clip": clip_id}) for clip_id in removed_clips)
+    lines.extend(encode({"clip": entry}) for entry in clips)
+    if not lines:
+        return 0
+    data = ("\n".join(lines) + "\n").encode('utf-8')
+    with open(journal_path(project_path), 'ab') as f:
+        f.write(data)
+    return len(data)
+
+
+def replay_journal(project_data: Dict, project_path: str) -> int:
+    """
+    Aplica o diário sobre o project_data carregado do .osp
+
+    Cada registro substitui o clip/arquivo de mesmo id ou é acrescentado
+    ao final; registros remove_clip retiram o clip. Uma última linha
+    incompleta (gravação interrompida) é ignorada.
+
+    Returns:
+        Número de registros aplicados
+    """
+    path = journal_path(project_path)
+    if not os.path.exists(path):
+        return 0
+
+    positions = {
+        key: {entry.get('id'): i for i, entry in enumerate(project_data.setdefault(key, []))}
+        for key in ('clips', 'files')
+    }
+    applied = 0
+    removed = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith("\n"):
+                    raise
+                break
+            if 'remove_clip' in record:
+                # A posição só é descartada no fim, para não deslocar os índices
+                index = positions['clips'].pop(record['remove_clip'], None)
+                if index is not None:
+                    removed.add(index)
+                applied += 1
+                continue
+            for kind, key in (("clip", 'clips'), ("file", 'files')):
+                entry = record.get(kind)
+                if entry is None:
+                    continue
+                items = project_data[key]
+                index = positions[key].get(entry.get('id'))
+                if index is None:
+                    positions[key][entry.get('id')] = len(items)
+                    items.append(entry)
+                else:
+                    items[index] = entry
+                applied += 1
+    if removed:
+        clips = project_data['clips']
+        clips[:] = [clip for i, clip in enumerate(clips) if i not in removed]
+    return applied
+
+
+def remove_journal(project_path: str):
+    """Apaga o diário do projeto, se existir"""
+    try:
+        os.remove(journal_path(project_path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Servidor local de projetos OpenShot
+Mantém instâncias de OpenShotImageSync abertas em memória e recebe comandos
+em JSON, um por linha, por um socket Unix ou uma porta local. As escritas
+de cada projeto são serializadas e o projeto é gravado em disco depois de
+um intervalo sem alterações (debounce), como checkpoint do diário
+
+Uso:
+    python3 project_server.py --socket /tmp/openshot_sync.sock
+    python3 project_server.py --porta 8765
+
+Protocolo (uma linha JSON por requisição e por resposta):
+    {"id": 1, "cmd": "open", "project": "video.osp", "create": true}
+    {"id": 2, "cmd": "add-clips", "project": "video.osp",
+     "clips": [{"image": "foto1.jpg", "position": 5.0, "duration": 3.0}]}
+    {"id": 3, "cmd": "query-range", "project": "video.osp", "t0": 0, "t1": 10}
+    {"id": 4, "cmd": "save", "project": "video.osp"}
+    -> {"id": 2, "ok": true, "added": 1}
+    -> {"id": 9, "ok": false, "error": "..."}
+
+Comandos: ping, open, add-clips, query-range, save, close, stats
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+from typing import Dict, Optional
+
+from instrumentation import Instrumentation
+from osp_writer import to_jsonable
+from sync_images_openshot import OpenShotImageSync
+
+DEFAULT_DEBOUNCE = 0.5   # Segundos sem alterações antes de gravar
+DEFAULT_MAX_DELAY = 5.0  # Gravação garantida mesmo com alterações contínuas
+DEFAULT_HOST = "127.0.0.1"
+MAX_LINE = 64 * 1024 * 1024
+
+# Campos de cada clip em add-clips e seus valores padrão
+_CLIP_FIELDS = (('duration', 2.0), ('layer', 1), ('x', 0.0), ('y', 0.0),
+                ('scale_x', 1.0), ('scale_y', 1.0))
+
+logger = logging.getLogger("openshot_sync.server")
+
+
+class _OpenProject:
+    """Projeto aberto no servidor"""
+
+    __slots__ = ('sync', 'lock', 'compact', 'changes', 'first_change', 'timer')
+
+    def __init__(self, sync: OpenShotImageSync, compact: bool):
+        self.sync = sync
+        # Serializa as escritas (add-clips, save) do projeto
+        self.lock = asyncio.Lock()
+        self.compact = compact
+        self.changes = 0
+        self.first_change = None
+        self.timer = None
+
+
+class ProjectServer:
+    """
+    Executa os comandos do protocolo sobre os projetos abertos
+
+    Todo comando sobre um projeto (inclusive as consultas) passa pelo lock
+    dele. Inserções e gravações rodam em uma thread com o lock tomado, então
+    o laço de eventos continua atendendo as outras conexões e projetos; uma
+    consulta ao mesmo projeto espera a escrita em andamento e nunca vê um
+    lote pela metade.
+    """
+
+    def __init__(self, debounce: float = DEFAULT_DEBOUNCE,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 instrumentation: Optional[Instrumentation] = None):
+        """
+        Args:
+            debounce: Segundos sem alterações até o projeto ser gravado
+            max_delay: Tempo máximo entre a primeira alteração pendente e a
+                gravação, mesmo que as alterações não parem
+            instrumentation: Recebe os tempos e contadores de todos os projetos
+        """
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.instrumentation = (instrumentation if instrumentation is not None
+                                else Instrumentation(log=logger))
+        self.projects: Dict[str, _OpenProject] = {}
+        self._tasks = set()
+        self._commands = {
+            'ping': self._ping,
+            'open': self._open,
+            'add-clips': self._add_clips,
+            'query-range': self._query_range,
+            'save': self._save,
+            'close': self._close,
+            'stats': self._stats,
+        }
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def _project(self, request: Dict) -> _OpenProject:
+        path = request.get('project')
+        if not path:
+            raise ValueError("Campo obrigatório ausente: project")
+        project = self.projects.get(self._key(path))
+        if project is None:
+            raise ValueError(f"Projeto não aberto: {path}")
+        return project
+
+    async def execute(self, request: Dict) -> Dict:
+        """Executa uma requisição e monta a resposta (erros não levantam exceção)"""
+        response = {'id': request.get('id')} if 'id' in request else {}
+        handler = self._commands.get(request.get('cmd'))
+        if handler is None:
+            response.update(ok=False, error=f"Comando desconhecido: {request.get('cmd')!r}")
+            return response
+        try:
+            result = await handler(request)
+        except (KeyError, TypeError, ValueError) as e:
+            if isinstance(e, KeyError):
+                e = f"Campo obrigatório ausente: {e.args[0]}"
+            response.update(ok=False, error=str(e))
+            return response
+        except Exception as e:
+            logger.exception("Erro no comando %s", request.get('cmd'))
+            response.update(ok=False, error=f"{type(e).__name__}: {e}")
+            return response
+        response['ok'] = True
+        response.update(result)
+        return response
+
+    async def _ping(self, request):
+        return {}
+
+    async def _open(self, request):
+        """Abre (ou cria, com create=true) um projeto; reabrir não recarrega"""
+        path = request['project']
+        key = self._key(path)
+        if key in self.projects:
+            return {'clips': len(self.projects[key].sync.project_data['clips']), 'loaded': False}
+        sync = OpenShotImageSync(path, backend=request.get('backend', 'records'),
+                                 output="quiet", instrumentation=self.instrumentation)
+        # As listagens de diretório ficam em cache entre os add-clips: relista
+        # só os diretórios em que alguma imagem falta (pode ter sido criada depois)
+        sync.media_resolver.refresh_missing = True
+        if os.path.exists(path):
+            if not await asyncio.to_thread(sync.load_project, bool(request.get('lazy', True))):
+                raise ValueError(f"Não foi possível carregar o projeto: {path}")
+        elif request.get('create'):
+            sync.create_new_project(width=request.get('width', 1920),
+                                    height=request.get('height', 1080),
+                                    fps=request.get('fps', 30.0))
+        else:
+            raise ValueError(f"Projeto não encontrado: {path} (use create=true)")
+        if key in self.projects:  # Aberto por outra conexão durante o carregamento
+            return {'clips': len(self.projects[key].sync.project_data['clips']), 'loaded': False}
+        self.projects[key] = _OpenProject(sync, bool(request.get('compact', False)))
+        return {'clips': len(sync.project_data['clips']), 'loaded': True}
+
+    async def _add_clips(self, request):
+        project = self._project(request)
+        clips = request['clips']
+        paths = [clip['image'] for clip in clips]
+        positions = [clip['position'] for clip in clips]
+        columns = [[clip.get(field, default) for clip in clips] for field, default in _CLIP_FIELDS]
+        async with project.lock:
+            # Um close pode ter fechado o projeto enquanto este lote esperava o lock
+            if self.projects.get(self._key(request['project'])) is not project:
+                raise ValueError(f"Projeto não aberto: {request['project']}")
+            added = await asyncio.to_thread(project.sync.add_images_batch,
+                                            paths, positions, *columns)
+            if added:
+                project.changes += added
+                self._schedule_flush(project)
+        return {'added': added, 'skipped': len(clips) - added}
+
+    async def _query_range(self, request):
+        """
+        Clips entre t0 e t1 (ou, com 'at', os visíveis nesse instante)
+
+        Toma o lock do projeto: espera o lote ou a gravação em andamento
+        (que rodam em outra thread) em vez de ler o índice enquanto ele muda.
+        """
+        project = self._project(request)
+        layer = request.get('layer')
+        async with project.lock:
+            if 'at' in request:
+                clips = project.sync.clips_at(float(request['at']), layer)
+            else:
+                clips = project.sync.clips_in(float(request['t0']), float(request['t1']), layer)
+        return {'clips': clips}
+
+    async def _save(self, request):
+        """Grava agora; journal=true acrescenta só as alterações ao diário"""
+        project = self._project(request)
+        ok = await self.flush(project, journal=bool(request.get('journal', False)), force=True)
+        if not ok:
+            raise RuntimeError("Falha ao salvar o projeto")
+        return {'bytes_written': project.sync.bytes_written}
+
+    async def _close(self, request):
+        """
+        Grava e fecha o projeto; o lock fica tomado da gravação até a
+        remoção, então nenhum lote entra entre as duas e se perde
+        """
+        project = self._project(request)
+        async with project.lock:
+            ok = await self._flush_locked(project, journal=True, force=False)
+            if not ok:
+                raise RuntimeError("Falha ao salvar o projeto; ele continua aberto")
+            if self.projects.get(self._key(request['project'])) is project:
+                del self.projects[self._key(request['project'])]
+        return {}
+
+    async def _stats(self, request):
+        projects = {project.sync.project_path: {'clips': len(project.sync.project_data['clips']),
+                                                'pending_changes': project.changes}
+                    for project in self.projects.values()}
+        return {'projects': projects, **self.instrumentation.summary()}
+
+    def _schedule_flush(self, project: _OpenProject):
+        """Reagenda a gravação do projeto (debounce limitado por max_delay)"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if project.first_change is None:
+            project.first_change = now
+        delay = max(0.0, min(self.debounce, project.first_change + self.max_delay - now))
+        if project.timer is not None:
+            project.timer.cancel()
+        project.timer = loop.call_later(delay, self._start_flush, project)
+
+    def _start_flush(self, project: _OpenProject):
+        project.timer = None
+        task = asyncio.ensure_future(self.flush(project, journal=True))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, project: _OpenProject, journal: bool = True, force: bool = False) -> bool:
+        """
+        Grava o projeto se houver alterações pendentes (ou sempre, com force)
+
+        Com journal=True só as alterações vão para o diário (o .osp é
+        reescrito quando ainda não existe ou o diário fica grande).
+        """
+        async with project.lock:
+            return await self._flush_locked(project, journal, force)
+
+    async def _flush_locked(self, project: _OpenProject, journal: bool, force: bool) -> bool:
+        """flush() com o lock do projeto já tomado"""
+        if project.timer is not None:
+            project.timer.cancel()
+            project.timer = None
+        if not project.changes and not force:
+            return True
+        changes, project.changes = project.changes, 0
+        project.first_change = None
+        ok = await asyncio.to_thread(project.sync.save_project, None, journal, project.compact)
+        if not ok:
+            # Continua pendente; a próxima alteração (ou save) tenta de novo
+            project.changes += changes
+            logger.error("Falha ao gravar %s", project.sync.project_path)
+        return ok
+
+    async def flush_all(self):
+        """Grava todos os projetos com alterações pendentes"""
+        await asyncio.gather(*(self.flush(project) for project in list(self.projects.values())))
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão: as requisições são respondidas na ordem em que chegam"""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    response = {'ok': False, 'error': f"Linha maior que {MAX_LINE} bytes"}
+                    writer.write(_encode(response))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a requisição deve ser um objeto")
+                except ValueError as e:
+                    response = {'ok': False, 'error': f"JSON inválido: {e}"}
+                else:
+                    response = await self.execute(request)
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _encode(response: Dict) -> bytes:
+    return (json.dumps(response, ensure_ascii=False, separators=(',', ':'),
+                       default=to_jsonable) + "\n").encode('utf-8')
+
+
+async def serve(server: ProjectServer, socket_path: Optional[str] = None,
+                host: str = DEFAULT_HOST, port: Optional[int] = None):
+    """Atende até receber SIGINT/SIGTERM; grava os projetos pendentes ao sair"""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        listener = await asyncio.start_unix_server(server.handle_connection, socket_path,
+                                                   limit=MAX_LINE)
+        address = socket_path
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port,
+                                              limit=MAX_LINE)
+        address = f"{host}:{port}"
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # Windows
+            pass
+    print(f"✓ Servidor ouvindo em {address}", flush=True)
+    async with listener:
+        await stop.wait()
+    await server.flush_all()
+    if socket_path and os.path.exists(socket_path):
+        os.remove(socket_path)
+    print("✓ Servidor encerrado; projetos gravados")
+
+
+class ProjectClient:
+    """
+    Cliente síncrono do servidor (para scripts e testes)
+
+    Exemplo:
+        with ProjectClient(socket_path="/tmp/openshot_sync.sock") as client:
+            client.call("open", project="video.osp", create=True)
+            client.call("add-clips", project="video.osp",
+                        clips=[{"image": "foto.jpg", "position": 1.0}])
+    """
+
+    def __init__(self, socket_path: Optional[str] = None,
+                 host: str = DEFAULT_HOST, port: Optional[int] = None):
+        if socket_path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._file = self._socket.makefile('rwb')
+        self._next_id = 0
+
+    def call(self, cmd: str, **params) -> Dict:
+        """
+        Envia um comando e espera a resposta
+
+        Raises:
+            RuntimeError: O servidor respondeu com erro
+        """
+        self._next_id += 1
+        request = dict(params, id=self._next_id, cmd=cmd)
+        self._file.write(json.dumps(request).encode('utf-8') + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Conexão encerrada pelo servidor")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error'))
+        return response
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", help="Caminho do socket Unix")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Endereço (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, help="Porta TCP (quando não usar --socket)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="Segundos sem alterações antes de gravar (padrão: 0.5)")
+    parser.add_argument("--atraso-maximo", type=float, default=DEFAULT_MAX_DELAY,
+                        help="Gravação garantida a cada N segundos com alterações (padrão: 5)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Registra no log os tempos de cada etapa")
+    args = parser.parse_args()
+    if not args.socket and args.porta is None:
+        parser.error("informe --socket ou --porta")
+
+    logging.basicConfig(level=logging.INFO if args.metrics else logging.WARNING,
+                        format="%(asctime)s %(name)s %(message)s")
+    server = ProjectServer(args.debounce, args.atraso_maximo)
+    asyncio.run(serve(server, args.socket, args.host, args.porta))
+
+
+if __name__ == "__main__":
+    main()
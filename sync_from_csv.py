@@ -5,22 +5,180 @@ Lê os timestamps de um arquivo CSV e adiciona as imagens automaticamente
 """
 
 import csv
+import logging
+import math
+import sys
+from itertools import islice
+
+from instrumentation import Instrumentation
 from sync_images_openshot import OpenShotImageSync
 
 # ===== CONFIGURAÇÕES =====
 ARQUIVO_CSV = "timestamps.csv"  # Arquivo com as informações
 PROJETO = "video_com_imagens.osp"
 CRIAR_NOVO = True
+# Com CRIAR_NOVO = False: aplica só as diferenças entre o CSV e a camada
+# LAYER_PADRAO do projeto (rodar de novo não duplica as imagens). False
+# acrescenta todas as linhas do CSV ao projeto
+RECONCILIAR = True
 
 # Configurações do vídeo (se criar novo)
 LARGURA = 1920
 ALTURA = 1080
-FPS = 30
+FPS = 30  # Também 29.97 (gravado como 30000/1001) ou "30000/1001"
 
 # Configurações das imagens
 LAYER_PADRAO = 2
 DURACAO_PADRAO = 3.0  # Se não especificada no CSV
 
+# Leitura em fluxo
+TAMANHO_BLOCO = 10000  # Linhas enviadas ao projeto por vez
+LINHAS_PREVIEW = 20    # Linhas mostradas no preview
+TRABALHADORES_MIDIA = 8  # Diretórios de imagens listados em paralelo
+DELIMITADOR = None     # Ex.: ";" — None detecta pelo início do arquivo
+
+# Cache persistente de metadados das imagens (None = desativado)
+# Ex.: CACHE_MIDIA = media_cache.DEFAULT_CACHE_PATH  (~/.cache/openshot_sync/media.sqlite)
+# Execute com --cache-stats para ver as taxas de acerto ao final
+CACHE_MIDIA = None
+
+# Saída no terminal: "normal", "progress" (uma linha a cada PROGRESSO_A_CADA
+# imagens) ou "quiet"
+MODO_SAIDA = "progress"
+PROGRESSO_A_CADA = 10000
+
+# Instrumentação (opcional, por execução):
+#   --metrics          tempos e contadores de cada etapa no log (stderr)
+#   --tracemalloc      inclui o pico de memória de cada etapa nas métricas
+#   --profile ARQUIVO  grava o perfil do cProfile (ex.: perfil.prof)
+#
+# Modo de observação (--observar): depois da sincronização, continua rodando
+# e aplica as alterações do CSV e das pastas das imagens (ver csv_watch.py)
+
+
+def _detectar_dialeto(f):
+    """
+    Detecta o delimitador a partir de uma amostra do início do arquivo
+    
+    Quando o Sniffer não decide (linhas com e sem duração misturadas), vale
+    o delimitador presente em mais linhas.
+    """
+    sample = f.read(1024)
+    f.seek(0)
+    linhas = [l for l in sample.splitlines() if l.strip() and not l.startswith('#')]
+    try:
+        return csv.Sniffer().sniff("\n".join(linhas), delimiters=",;\t")
+    except csv.Error:
+        pass
+    contagem = {d: sum(d in linha for linha in linhas) for d in ",;\t"}
+    delimitador = max(contagem, key=contagem.get)
+    if not contagem[delimitador] or delimitador == ',':
+        return csv.excel
+    return type('Dialeto', (csv.excel,), {'delimiter': delimitador})
+
+
+def _parece_cabecalho(row):
+    """Uma linha é cabeçalho quando a coluna de timestamp não é numérica"""
+    if len(row) < 2:
+        return False
+    try:
+        float(row[1].strip())
+        return False
+    except ValueError:
+        return True
+
+
+def filtrar_linhas_csv(reader, procurar_cabecalho=True, linha_inicial=0):
+    """
+    Gera (numero_da_linha, row) das linhas de dados de um csv.reader
+    
+    Linhas vazias, comentários e o cabeçalho (se procurar_cabecalho) não são
+    gerados. linha_inicial é somada aos números, para trechos que não
+    começam no início do arquivo.
+    """
+    for row in reader:
+        if not row or not row[0].strip() or row[0].startswith('#'):
+            continue
+        if procurar_cabecalho:
+            procurar_cabecalho = False
+            if _parece_cabecalho(row):
+                continue
+        yield linha_inicial + reader.line_num, row
+
+
+def iterar_linhas_csv(arquivo_csv, delimitador=None):
+    """
+    Gera (numero_da_linha, row) para cada linha de dados do CSV
+    
+    O número é a linha real no arquivo (contando cabeçalho, comentários e
+    linhas vazias), para que os avisos apontem para o lugar certo.
+    Linhas vazias, comentários e o cabeçalho não são gerados.
+    Com o delimitador informado, o Sniffer não é usado.
+    """
+    with open(arquivo_csv, 'r', encoding='utf-8', newline='') as f:
+        if delimitador:
+            reader = csv.reader(f, delimiter=delimitador)
+        else:
+            reader = csv.reader(f, _detectar_dialeto(f))
+        yield from filtrar_linhas_csv(reader)
+
+
+def parsear_linhas(linhas, avisar=True, duracao_padrao=None):
+    """
+    Converte as linhas do CSV em tuplas (imagem, timestamp, duracao)
+    
+    Linhas malformadas são reportadas com o número real da linha e ignoradas.
+    Linhas sem duração usam duracao_padrao (padrão: DURACAO_PADRAO).
+    """
+    if duracao_padrao is None:
+        duracao_padrao = DURACAO_PADRAO
+    
+    def aviso(mensagem):
+        if avisar:
+            print(mensagem)
+    
+    for linha_num, row in linhas:
+        try:
+            if len(row) >= 3:
+                # Formato: imagem, timestamp, duração
+                imagem = row[0].strip()
+                timestamp = float(row[1].strip())
+                duracao = float(row[2].strip())
+            elif len(row) >= 2:
+                # Formato: imagem, timestamp (usa duração padrão)
+                imagem = row[0].strip()
+                timestamp = float(row[1].strip())
+                duracao = duracao_padrao
+            else:
+                aviso(f"⚠️  Linha {linha_num} ignorada: formato inválido")
+                continue
+        except ValueError as e:
+            aviso(f"⚠️  Erro na linha {linha_num}: {e}")
+            continue
+        
+        # nan e inf passariam pelas comparações abaixo
+        if (not (math.isfinite(timestamp) and math.isfinite(duracao))
+                or timestamp < 0 or duracao <= 0):
+            aviso(f"⚠️  Linha {linha_num} ignorada: timestamp ou duração inválidos")
+            continue
+        
+        yield imagem, timestamp, duracao
+
+
+def iterar_timestamps_csv(arquivo_csv, avisar=True, duracao_padrao=None, delimitador=None):
+    """Gera as tuplas (imagem, timestamp, duracao) do CSV sem carregá-lo inteiro"""
+    return parsear_linhas(iterar_linhas_csv(arquivo_csv, delimitador), avisar, duracao_padrao)
+
+
+def em_blocos(iteravel, tamanho):
+    """Agrupa um iterável em listas de no máximo `tamanho` itens"""
+    iterador = iter(iteravel)
+    while True:
+        bloco = list(islice(iterador, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
 
 def ler_timestamps_csv(arquivo_csv):
     """
@@ -35,49 +193,11 @@ def ler_timestamps_csv(arquivo_csv):
     imagem,timestamp
     foto1.jpg,5.0
     foto2.jpg,10.5
-    """
-    imagens = []
     
+    Carrega tudo em memória; para arquivos grandes use iterar_timestamps_csv().
+    """
     try:
-        with open(arquivo_csv, 'r', encoding='utf-8') as f:
-            # Detecta automaticamente se tem cabeçalho
-            sniffer = csv.Sniffer()
-            sample = f.read(1024)
-            f.seek(0)
-            has_header = sniffer.has_header(sample)
-            
-            reader = csv.reader(f)
-            
-            if has_header:
-                next(reader)  # Pula o cabeçalho
-            
-            for linha_num, row in enumerate(reader, start=1):
-                if not row or row[0].startswith('#'):  # Ignora linhas vazias ou comentários
-                    continue
-                
-                try:
-                    if len(row) >= 3:
-                        # Formato: imagem, timestamp, duração
-                        imagem = row[0].strip()
-                        timestamp = float(row[1].strip())
-                        duracao = float(row[2].strip())
-                    elif len(row) >= 2:
-                        # Formato: imagem, timestamp (usa duração padrão)
-                        imagem = row[0].strip()
-                        timestamp = float(row[1].strip())
-                        duracao = DURACAO_PADRAO
-                    else:
-                        print(f"⚠️  Linha {linha_num} ignorada: formato inválido")
-                        continue
-                    
-                    imagens.append((imagem, timestamp, duracao))
-                    
-                except ValueError as e:
-                    print(f"⚠️  Erro na linha {linha_num}: {e}")
-                    continue
-        
-        return imagens
-        
+        return list(iterar_timestamps_csv(arquivo_csv))
     except FileNotFoundError:
         print(f"❌ Arquivo não encontrado: {arquivo_csv}")
         return []
@@ -86,16 +206,42 @@ def ler_timestamps_csv(arquivo_csv):
         return []
 
 
+def adicionar_em_blocos(sync, timestamps, layer, tamanho_bloco=None, **posicao):
+    """
+    Adiciona as imagens ao projeto em blocos de tamanho limitado
+    
+    Argumentos extras (x, y, scale_x, scale_y) vão para add_images_batch.
+    
+    Returns:
+        Tupla (linhas_validas, imagens_adicionadas)
+    """
+    if tamanho_bloco is None:
+        tamanho_bloco = TAMANHO_BLOCO
+    total = 0
+    adicionadas = 0
+    for bloco in em_blocos(timestamps, tamanho_bloco):
+        paths, posicoes, duracoes = zip(*bloco)
+        adicionadas += sync.add_images_batch(paths, posicoes, duracoes, layer, **posicao)
+        total += len(bloco)
+    return total, adicionadas
+
+
 def main():
     print("\n" + "="*60)
     print("🎬 SINCRONIZAÇÃO DE IMAGENS (CSV) PARA OPENSHOT")
     print("="*60 + "\n")
     
-    # Lê os timestamps do arquivo CSV
+    # Mostra preview das primeiras imagens (o arquivo é lido em fluxo)
     print(f"📄 Lendo timestamps de: {ARQUIVO_CSV}\n")
-    imagens = ler_timestamps_csv(ARQUIVO_CSV)
+    try:
+        preview = list(islice(iterar_timestamps_csv(ARQUIVO_CSV, avisar=False,
+                                                    delimitador=DELIMITADOR),
+                              LINHAS_PREVIEW))
+    except FileNotFoundError:
+        print(f"❌ Arquivo não encontrado: {ARQUIVO_CSV}")
+        return
     
-    if not imagens:
+    if not preview:
         print("❌ Nenhuma imagem válida encontrada no arquivo CSV")
         print("\nFormato esperado do CSV:")
         print("imagem,timestamp,duracao")
@@ -103,30 +249,109 @@ def main():
         print("foto2.jpg,10.5,2.5")
         return
     
-    print(f"✓ {len(imagens)} imagens encontradas no CSV\n")
-    
-    # Mostra preview das imagens
-    print("📋 Preview das imagens:")
+    print(f"\n📋 Preview das primeiras {len(preview)} imagens:")
     print("-" * 60)
-    for i, (img, ts, dur) in enumerate(imagens, 1):
+    for i, (img, ts, dur) in enumerate(preview, 1):
         print(f"{i:2d}. {img:30s} → {ts:6.1f}s (dura {dur:.1f}s)")
     print("-" * 60 + "\n")
     
+    # Abre o cache de mídia (se configurado) e sincroniza
+    cache = abrir_cache(CACHE_MIDIA)
+    instrumentacao = criar_instrumentacao(sys.argv)
+    perfil = _valor_opcao(sys.argv, "--profile")
+    try:
+        sincronizar = observar_projeto if "--observar" in sys.argv else sincronizar_projeto
+        if perfil:
+            with instrumentacao.profile(perfil):
+                sincronizar(cache, instrumentacao)
+            print(f"\n📊 Perfil gravado em {perfil}")
+        else:
+            sincronizar(cache, instrumentacao)
+    finally:
+        if cache is not None:
+            if "--cache-stats" in sys.argv:
+                from media_cache import imprimir_estatisticas
+                print()
+                imprimir_estatisticas(cache)
+            cache.close()
+
+
+def abrir_cache(caminho):
+    """Abre o cache de metadados (None = desativado; o sqlite3 só é importado se usado)"""
+    if not caminho:
+        return None
+    from media_cache import MediaMetadataCache
+    return MediaMetadataCache(caminho)
+
+
+def _valor_opcao(argv, nome):
+    """Valor de uma opção '--nome valor' da linha de comando (ou None)"""
+    if nome in argv:
+        posicao = argv.index(nome) + 1
+        if posicao < len(argv):
+            return argv[posicao]
+    return None
+
+
+def criar_instrumentacao(argv):
+    """Monta a instrumentação conforme --metrics e --tracemalloc"""
+    log = None
+    if "--metrics" in argv:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+        log = logging.getLogger("openshot_sync")
+    return Instrumentation(log=log, trace_memory="--tracemalloc" in argv)
+
+
+def _abrir_projeto(cache, instrumentacao, lazy):
+    """Cria ou carrega o projeto conforme CRIAR_NOVO (None se não carregar)"""
     # Inicializa o sincronizador
-    sync = OpenShotImageSync(PROJETO)
+    sync = OpenShotImageSync(PROJETO, media_workers=TRABALHADORES_MIDIA, media_cache=cache,
+                             output=MODO_SAIDA, progress_every=PROGRESSO_A_CADA,
+                             instrumentation=instrumentacao)
     
     if CRIAR_NOVO:
         print(f"📝 Criando novo projeto: {PROJETO}")
         sync.create_new_project(width=LARGURA, height=ALTURA, fps=FPS)
     else:
         print(f"📂 Carregando projeto existente: {PROJETO}")
-        if not sync.load_project():
+        if not sync.load_project(lazy=lazy):
             print("❌ Erro ao carregar projeto. Abortando.")
-            return
+            return None
+    return sync
+
+
+def observar_projeto(cache, instrumentacao=None):
+    """Sincroniza o projeto com o CSV e continua aplicando as alterações até Ctrl+C"""
+    from csv_watch import ObservadorCSV
+    
+    sync = _abrir_projeto(cache, instrumentacao, lazy=True)
+    if sync is None:
+        return
+    print(f"\n🔄 Sincronizando a camada {LAYER_PADRAO} com {ARQUIVO_CSV}...\n")
+    ObservadorCSV(sync, ARQUIVO_CSV, LAYER_PADRAO, delimitador=DELIMITADOR).executar()
+    print(f"\n📂 Projeto: {PROJETO}")
+
+
+def sincronizar_projeto(cache, instrumentacao=None):
+    """Cria/carrega o projeto, adiciona as imagens do CSV e salva"""
+    # Na reconciliação, os clips sem alteração são copiados byte a byte ao salvar
+    sync = _abrir_projeto(cache, instrumentacao, lazy=RECONCILIAR)
+    if sync is None:
+        return
     
-    # Adiciona todas as imagens
-    print(f"\n📸 Adicionando imagens ao projeto...\n")
-    sync.add_multiple_images(imagens, layer=LAYER_PADRAO)
+    if RECONCILIAR and not CRIAR_NOVO:
+        print(f"\n🔄 Comparando o CSV com a camada {LAYER_PADRAO} do projeto...\n")
+        sync.reconcile_images(iterar_timestamps_csv(ARQUIVO_CSV, delimitador=DELIMITADOR),
+                              LAYER_PADRAO)
+    else:
+        # Adiciona as imagens em blocos, lendo o CSV novamente em fluxo
+        print(f"\n📸 Adicionando imagens ao projeto (blocos de {TAMANHO_BLOCO})...\n")
+        total, adicionadas = adicionar_em_blocos(
+            sync, iterar_timestamps_csv(ARQUIVO_CSV, delimitador=DELIMITADOR), LAYER_PADRAO
+        )
+        print(f"\n✓ Total: {adicionadas}/{total} imagens adicionadas com sucesso")
+    if sync.media_reused:
+        print(f"♻️  {sync.media_reused} entradas de arquivo reaproveitadas")
     
     # Salva o projeto
     print("\n💾 Salvando projeto...")
@@ -4,59 +4,309 @@ Script para sincronizar imagens com timestamps no OpenShot
 Automatiza a adição de múltiplas imagens em momentos específicos do vídeo
 """
 
+import gc
 import json
+import math
 import os
-from typing import List, Dict, Tuple
+from fractions import Fraction
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional, Sequence, Tuple, Union
+
+import project_journal
+from clip_table import ClipRow, ClipTable, TableTimeline, clip_id_number
+from frame_rate import FrameRate, RationalLike, parse_rational, scale_frames
+from image_probe import fit_scale, probe_images
+from instrumentation import DEFAULT_PROGRESS_EVERY, Console, Instrumentation
+from media_dedupe import ContentIndex, find_duplicate_groups, hash_files
+from media_resolver import MediaResolver
+from osp_lazy import LazyClip, load_project_lazy
+from osp_merge import MergeInput, merge_projects
+from osp_model import Clip, MediaFile, static_value
+from osp_writer import write_project
+from timeline_index import TimelineIndex, allocate_layers, clip_interval
+
+if TYPE_CHECKING:  # O cache (e o sqlite3) só é importado por quem o usa
+    from media_cache import MediaMetadataCache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+# Valor de `layers`/`layer` que distribui as imagens entre camadas livres
+AUTO_LAYER = "auto"
+
+
+def _as_column(values, n: int, name: str):
+    """
+    Converte uma coluna do lote (lista, array NumPy ou escalar) em uma
+    sequência de tamanho n
+    """
+    if np is not None:
+        column = np.asarray(values, dtype=float)
+        if column.ndim == 0:
+            return np.full(n, float(column))
+        if column.shape != (n,):
+            raise ValueError(f"Coluna '{name}' tem {len(column)} valores, esperado {n}")
+        return column
+    
+    if isinstance(values, (int, float)):
+        return [float(values)] * n
+    column = [float(v) for v in values]
+    if len(column) != n:
+        raise ValueError(f"Coluna '{name}' tem {len(column)} valores, esperado {n}")
+    return column
+
+
+def _valid_rows(positions, durations) -> List[int]:
+    """Índices das linhas com timestamp >= 0 e duração > 0 (ambos finitos)"""
+    if np is not None:
+        mask = (np.isfinite(positions) & np.isfinite(durations)
+                & (positions >= 0) & (durations > 0))
+        return np.flatnonzero(mask).tolist()
+    isfinite = math.isfinite
+    return [i for i, (p, d) in enumerate(zip(positions, durations))
+            if isfinite(p) and isfinite(d) and p >= 0 and d > 0]
+
+
+def _to_list(column) -> list:
+    """Converte a coluna para lista de floats do Python (serializável em JSON)"""
+    return column.tolist() if np is not None else column
 
 
 class OpenShotImageSync:
     """Classe para sincronizar imagens com timestamps no OpenShot"""
     
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, media_workers: int = 8,
+                 media_cache: Optional["MediaMetadataCache"] = None,
+                 dedupe_media: bool = False, backend: str = "records",
+                 output: str = "normal", progress_every: int = DEFAULT_PROGRESS_EVERY,
+                 instrumentation: Optional[Instrumentation] = None):
         """
         Inicializa o sincronizador
         
         Args:
             project_path: Caminho para o arquivo .osp do projeto OpenShot
+            media_workers: Threads usadas para listar os diretórios de mídia
+                nas adições em lote
+            media_cache: Cache persistente de metadados das imagens; quando
+                informado, é consultado antes de abrir qualquer arquivo e as
+                dimensões conhecidas entram na entrada de 'files'
+            dedupe_media: Compara o conteúdo das imagens novas com as já
+                registradas e reaproveita a entrada de 'files' de arquivos
+                idênticos em caminhos diferentes
+            backend: "records" guarda cada clip como objeto (Clip/dict);
+                "table" guarda os clips em colunas (ClipTable), com
+                shift_clips/retime_clips vetorizados
+            output: "normal" imprime uma linha por imagem adicionada;
+                "progress" troca essas linhas por um resumo a cada
+                progress_every imagens; "quiet" não imprime nada
+            progress_every: Itens entre as linhas de resumo do modo "progress"
+            instrumentation: Recebe os tempos das etapas (carregar, adicionar
+                em lote, salvar...) e os contadores (clips adicionados, mídias
+                ausentes, bytes gravados...)
         """
+        if backend not in ("records", "table"):
+            raise ValueError(f"Backend desconhecido: {backend!r}")
         self.project_path = project_path
         self.project_data = None
+        # Listagens de diretório em cache para verificar as imagens em lote
+        self.media_resolver = MediaResolver(media_workers)
+        self.media_cache = media_cache
+        # Registro de mídia: caminho absoluto normalizado -> file_id
+        self._media_index: Dict[str, str] = {}
+        self._file_ids = set()
+        self.media_reused = 0
+        # Relatório da última distribuição automática de camadas (layer="auto")
+        self.layer_allocation: Optional[Dict] = None
+        # Deduplicação por conteúdo (hash SHA-256 com pré-filtro por tamanho)
+        self.dedupe_media = dedupe_media
+        self._content_index: Optional[ContentIndex] = None
+        self.media_deduped = 0
+        self.dedupe_bytes_saved = 0
+        # Índice de intervalos da timeline, por camada (no backend colunar,
+        # as próprias colunas respondem às consultas)
+        self.backend = backend
+        self._timeline = TableTimeline() if backend == "table" else TimelineIndex()
+        # Clips e arquivos alterados desde o último salvamento (por id)
+        self._dirty_clips: Dict[str, Dict] = {}
+        self._dirty_files: Dict[str, Dict] = {}
+        self._removed_clips: Dict[str, None] = {}
+        # Maior n dos ids "clip_<n>" já usados (os novos clips seguem daqui)
+        self._clip_number = 0
+        # True quando o .osp em disco + diário correspondem ao projeto carregado
+        self._journal_base_ok = False
+        self.journal_max_bytes = project_journal.JOURNAL_MAX_BYTES
+        self.bytes_written = 0
+        # Saída no terminal e métricas
+        self.console = Console(output, progress_every)
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
         
-    def load_project(self) -> bool:
-        """Carrega o projeto OpenShot existente"""
-        try:
-            with open(self.project_path, 'r', encoding='utf-8') as f:
-                self.project_data = json.load(f)
-            print(f"✓ Projeto carregado: {self.project_path}")
-            return True
-        except FileNotFoundError:
-            print(f"✗ Arquivo não encontrado: {self.project_path}")
-            return False
-        except json.JSONDecodeError:
-            print(f"✗ Erro ao decodificar JSON do projeto")
-            return False
+    def load_project(self, lazy: bool = False) -> bool:
+        """
+        Carrega o projeto OpenShot existente
+        
+        Args:
+            lazy: Mapeia o arquivo e interpreta só o cabeçalho de cada clip;
+                os keyframes são lidos quando acessados e os clips não
+                alterados são copiados byte a byte ao salvar
+        """
+        with self.instrumentation.stage('load', lazy=lazy) as metrics:
+            try:
+                if lazy:
+                    self.project_data = load_project_lazy(self.project_path)
+                else:
+                    with open(self.project_path, 'r', encoding='utf-8') as f:
+                        self.project_data = json.load(f)
+                replayed = project_journal.replay_journal(self.project_data, self.project_path)
+                if self.backend == "table":
+                    self.project_data['clips'] = ClipTable.from_clips(self.project_data.get('clips', []))
+                self._rebuild_media_index()
+                self.rebuild_timeline_index()
+                self._sync_clip_number()
+                self._clear_dirty()
+                self._journal_base_ok = True
+            except FileNotFoundError:
+                metrics['error'] = 'FileNotFoundError'
+                self.console.message(f"✗ Arquivo não encontrado: {self.project_path}")
+                return False
+            except json.JSONDecodeError:
+                metrics['error'] = 'JSONDecodeError'
+                self.console.message(f"✗ Erro ao decodificar JSON do projeto")
+                return False
+            metrics['clips'] = len(self.project_data.get('clips', []))
+            metrics['journal_replayed'] = replayed
+        self.instrumentation.count('clips_loaded', metrics['clips'])
+        self.console.message(f"✓ Projeto carregado: {self.project_path}")
+        if replayed:
+            self.console.message(f"  ↳ {replayed} alterações aplicadas do diário")
+        return True
     
-    def create_new_project(self, width: int = 1920, height: int = 1080, fps: float = 30.0):
-        """Cria um novo projeto OpenShot"""
+    def create_new_project(self, width: int = 1920, height: int = 1080,
+                           fps: RationalLike = 30.0):
+        """
+        Cria um novo projeto OpenShot
+        
+        Args:
+            width, height: Resolução do vídeo
+            fps: Taxa de quadros: 30, 29.97 (gravado como 30000/1001),
+                "30000/1001" ou Fraction
+        """
+        rate = FrameRate.from_value(fps)
         self.project_data = {
             "version": {"openshot-qt": "3.1.1", "libopenshot": "0.3.2"},
             "width": width,
             "height": height,
-            "fps": {"num": int(fps), "den": 1},
+            "fps": rate.as_dict(),
             "sample_rate": 44100,
             "channels": 2,
             "channel_layout": 3,
-            "clips": [],
+            "clips": ClipTable() if self.backend == "table" else [],
             "files": [],
             "effects": [],
             "layers": [],
             "scale": 15,
             "tick_pixels": 100,
             "playhead_position": 0,
-            "profile": "HD 1080p 30 fps",
+            "profile": f"HD {height}p {rate} fps",
             "markers": []
         }
-        print(f"✓ Novo projeto criado ({width}x{height} @ {fps}fps)")
+        self._rebuild_media_index()
+        self.rebuild_timeline_index()
+        self._sync_clip_number()
+        self._clear_dirty()
+        self._journal_base_ok = False
+        self.console.message(f"✓ Novo projeto criado ({width}x{height} @ {rate}fps)")
+    
+    @property
+    def frame_rate(self) -> FrameRate:
+        """Taxa de quadros exata do projeto (30 se o projeto não informar)"""
+        return FrameRate.from_value(self.project_data.get('fps') or 30)
+    
+    @staticmethod
+    def _normalize_media_path(path: str) -> str:
+        """Normaliza o caminho usado como chave do registro de mídia"""
+        return os.path.normcase(os.path.abspath(path))
+    
+    def _rebuild_media_index(self):
+        """Reconstrói o registro de mídia a partir de project_data['files']"""
+        self._media_index = {}
+        self._file_ids = set()
+        self.media_reused = 0
+        self.media_deduped = 0
+        self.dedupe_bytes_saved = 0
+        self._content_index = None
+        if self.dedupe_media:
+            self._content_index = ContentIndex(self.media_resolver.max_workers, self.media_cache)
+        for file_entry in self.project_data.get('files', []):
+            self._file_ids.add(file_entry['id'])
+            path = self._media_source(file_entry)
+            if path:
+                key = self._normalize_media_path(path)
+                if key not in self._media_index:
+                    self._media_index[key] = file_entry['id']
+                    if self._content_index is not None:
+                        self._content_index.add(key, file_entry['id'])
+    
+    @staticmethod
+    def _media_source(file_entry) -> Optional[str]:
+        """Caminho da imagem original de uma entrada de 'files' (mesmo usando proxy)"""
+        original = file_entry.get('original_media')
+        return original['path'] if original else file_entry.get('path')
+    
+    def _is_registered(self, image_path: str) -> bool:
+        return self._normalize_media_path(image_path) in self._media_index
+    
+    def _register_media(self, image_path: str, metadata: Optional[Dict] = None) -> str:
+        """
+        Retorna o file_id da imagem, reaproveitando a entrada existente em
+        'files' quando o mesmo caminho já foi adicionado
+        """
+        key = self._normalize_media_path(image_path)
+        file_id = self._media_index.get(key)
+        if file_id is not None:
+            self.media_reused += 1
+            return file_id
+        
+        if self._content_index is not None:
+            match = self._content_index.lookup(key)
+            if match is not None:
+                file_id, size = match
+                self._media_index[key] = file_id
+                self.media_deduped += 1
+                self.dedupe_bytes_saved += size
+                return file_id
+        
+        file_id = self._new_file_id()
+        file_entry = MediaFile(file_id, os.path.abspath(image_path), "image")
+        if metadata and metadata.get('width'):
+            file_entry["width"] = metadata['width']
+            file_entry["height"] = metadata['height']
+        self.project_data['files'].append(file_entry)
+        self._media_index[key] = file_id
+        self._file_ids.add(file_id)
+        if self._content_index is not None:
+            self._content_index.register(key, file_id)
+        self._dirty_files[file_id] = file_entry
+        return file_id
+    
+    def _sync_clip_number(self):
+        """
+        Recalcula o último número de clip usado; os ids novos não repetem
+        os existentes mesmo depois de remoções
+        """
+        clips = self.project_data.get('clips', [])
+        if isinstance(clips, ClipTable):
+            highest = max(clips.number, default=0)
+        else:
+            highest = max((clip_id_number(clip.get('id')) for clip in clips), default=0)
+        self._clip_number = max(len(clips), highest)
+    
+    def _new_file_id(self) -> str:
+        """Próximo file_id livre (a deduplicação pode remover entradas)"""
+        n = len(self.project_data['files']) + 1
+        while f"file_{n}" in self._file_ids:
+            n += 1
+        return f"file_{n}"
     
     def add_image_at_timestamp(self, 
                                image_path: str, 
@@ -66,7 +316,9 @@ class OpenShotImageSync:
                                x: float = 0.0,
                                y: float = 0.0,
                                scale_x: float = 1.0,
-                               scale_y: float = 1.0) -> bool:
+                               scale_y: float = 1.0,
+                               fit: Optional[str] = None,
+                               fit_width: Optional[float] = None) -> bool:
         """
         Adiciona uma imagem em um timestamp específico
         
@@ -77,116 +329,924 @@ class OpenShotImageSync:
             layer: Camada/layer do vídeo (maior = mais na frente)
             x, y: Posição da imagem (0-1, normalizado)
             scale_x, scale_y: Escala da imagem
+            fit: Enquadramento calculado pelas dimensões da imagem: "contain",
+                "cover" ou "fixed-width" (ver image_probe.fit_scale); a
+                escala resultante é multiplicada por scale_x/scale_y
+            fit_width: Largura em pixels do modo "fixed-width" (padrão: a
+                largura do projeto)
             
         Returns:
             True se sucesso, False caso contrário
         """
-        if not os.path.exists(image_path):
-            print(f"✗ Imagem não encontrada: {image_path}")
+        metadata = None
+        if self.media_cache is not None and not self._is_registered(image_path):
+            metadata = self.media_cache.get(image_path)
+            exists = metadata is not None
+        else:
+            exists = os.path.exists(image_path)
+        if not exists:
+            self.instrumentation.count('media_missing')
+            self.console.items(1, self._progress_summary,
+                               f"✗ Imagem não encontrada: {image_path}")
             return False
         
-        # Adiciona o arquivo à lista de arquivos do projeto
-        file_id = f"file_{len(self.project_data['files']) + 1}"
-        file_entry = {
-            "id": file_id,
-            "path": os.path.abspath(image_path),
-            "media_type": "image"
-        }
-        self.project_data['files'].append(file_entry)
+        if fit is not None:
+            factor = self._fit_factors([image_path], fit, fit_width, {image_path: metadata})[0]
+            scale_x, scale_y = scale_x * factor, scale_y * factor
+        
+        # Adiciona o arquivo à lista de arquivos do projeto (ou reaproveita)
+        file_id = self._register_media(image_path, metadata)
         
         # Cria o clip
-        clip_id = f"clip_{len(self.project_data['clips']) + 1}"
-        clip_entry = {
-            "id": clip_id,
-            "file_id": file_id,
-            "position": timestamp,
-            "start": 0,
-            "end": duration,
-            "layer": layer,
-            "alpha": {
-                "Points": [
-                    {"co": {"X": 1, "Y": 1}, "interpolation": 0}
-                ]
-            },
-            "location_x": {
-                "Points": [
-                    {"co": {"X": 1, "Y": x}, "interpolation": 0}
-                ]
-            },
-            "location_y": {
-                "Points": [
-                    {"co": {"X": 1, "Y": y}, "interpolation": 0}
-                ]
-            },
-            "scale_x": {
-                "Points": [
-                    {"co": {"X": 1, "Y": scale_x}, "interpolation": 0}
-                ]
-            },
-            "scale_y": {
-                "Points": [
-                    {"co": {"X": 1, "Y": scale_y}, "interpolation": 0}
-                ]
-            }
-        }
+        self._clip_number += 1
+        clip_id = f"clip_{self._clip_number}"
+        clip_entry = self._build_clip_entry(clip_id, file_id, timestamp, duration,
+                                            layer, x, y, scale_x, scale_y)
         self.project_data['clips'].append(clip_entry)
+        # No backend colunar o clip passa a ser uma linha da tabela
+        clip_entry = self.project_data['clips'][-1]
+        self._timeline.add(clip_entry)
+        self._dirty_clips[clip_id] = clip_entry
         
-        print(f"✓ Imagem adicionada: {os.path.basename(image_path)} em {timestamp}s")
+        self.instrumentation.count('clips_added')
+        self.console.items(1, self._progress_summary,
+                           f"✓ Imagem adicionada: {os.path.basename(image_path)} em {timestamp}s")
         return True
     
+    def _fit_factors(self, paths: Sequence[str], fit: str, fit_width: Optional[float] = None,
+                     metadata: Optional[Dict[str, Optional[Dict]]] = None) -> List[float]:
+        """
+        Escala de enquadramento (image_probe.fit_scale) de cada imagem
+        
+        As dimensões vêm dos metadados já conhecidos (cache de mídia) ou do
+        cabeçalho dos arquivos; imagens sem dimensões ficam com 1.0.
+        """
+        metadata = dict(metadata or {})
+        if self.media_cache is not None:
+            missing = [path for path in paths if not metadata.get(path)]
+            if missing:
+                metadata.update(self.media_cache.get_many(missing))
+        pending = [path for path in paths if not (metadata.get(path) or {}).get('width')]
+        probes = probe_images(pending, self.media_resolver.max_workers) if pending else {}
+        width, height = self.project_data['width'], self.project_data['height']
+        factors = []
+        for path in paths:
+            known = metadata.get(path) or {}
+            if known.get('width'):
+                size = (known['width'], known['height'])
+            else:
+                probe = probes.get(path)
+                size = probe[1:] if probe else (0, 0)
+            factors.append(fit_scale(fit, size[0], size[1], width, height, fit_width)[0])
+        return factors
+    
+    def _progress_summary(self) -> str:
+        """Linha de resumo do modo de saída progress"""
+        counters = self.instrumentation.counters
+        line = f"▶ {counters.get('clips_added', 0)} imagens adicionadas"
+        missing = counters.get('media_missing', 0)
+        if missing:
+            line += f", {missing} não encontradas"
+        return line
+    
+    @staticmethod
+    def _build_clip_entry(clip_id: str, file_id: str, position: float, duration: float,
+                          layer: int, x: float, y: float,
+                          scale_x: float, scale_y: float) -> Clip:
+        """
+        Monta um clip; o dicionário no formato do OpenShot (com as curvas de
+        keyframe) só é gerado ao salvar
+        """
+        return Clip(clip_id, file_id, position, duration, layer, x, y, scale_x, scale_y)
+    
+    def add_images_batch(self,
+                         image_paths: Sequence[str],
+                         positions,
+                         durations=2.0,
+                         layers=1,
+                         x=0.0,
+                         y=0.0,
+                         scale_x=1.0,
+                         scale_y=1.0,
+                         layer_band: Tuple[int, Optional[int]] = (1, None),
+                         fit: Optional[str] = None,
+                         fit_width: Optional[float] = None) -> int:
+        """
+        Adiciona um lote de imagens a partir de colunas (listas ou arrays NumPy)
+        
+        Cada coluna pode ser uma sequência com o mesmo tamanho de image_paths
+        ou um valor escalar aplicado a todas as imagens. A validação é feita em
+        uma única passada vetorizada e os registros de clip/arquivo são gerados
+        em bloco, sem imprimir uma linha por imagem.
+        
+        Args:
+            image_paths: Caminhos das imagens
+            positions: Tempo em segundos de cada imagem
+            durations: Duração de cada imagem em segundos
+            layers: Camada de cada imagem, ou "auto" para dar a cada imagem a
+                menor camada de layer_band livre durante todo o clip
+                (relatório em self.layer_allocation)
+            x, y: Posição de cada imagem (0-1, normalizado)
+            scale_x, scale_y: Escala de cada imagem
+            layer_band: Primeira e última camada (None = sem limite) usadas
+                com layers="auto"; os clips que já estão nessas camadas
+                continuam ocupando seus intervalos
+            fit, fit_width: Enquadramento de cada imagem pelas suas dimensões,
+                como em add_image_at_timestamp (os cabeçalhos são lidos em
+                paralelo)
+            
+        Returns:
+            Número de clips adicionados
+        """
+        paths = list(image_paths)
+        n = len(paths)
+        if n == 0:
+            return 0
+        
+        auto_layer = isinstance(layers, str) and layers == AUTO_LAYER
+        with self.instrumentation.stage('add_batch', rows=n) as metrics:
+            columns = [
+                _as_column(positions, n, "positions"),
+                _as_column(durations, n, "durations"),
+                _as_column(layer_band[0] if auto_layer else layers, n, "layers"),
+                _as_column(x, n, "x"),
+                _as_column(y, n, "y"),
+                _as_column(scale_x, n, "scale_x"),
+                _as_column(scale_y, n, "scale_y"),
+            ]
+            if fit is not None:
+                factors = _as_column(self._fit_factors(paths, fit, fit_width), n, "fit")
+                for index in (5, 6):
+                    columns[index] = (factors * columns[index] if np is not None else
+                                      [a * b for a, b in zip(factors, columns[index])])
+            added = self._add_batch_rows(paths, columns, metrics,
+                                         layer_band if auto_layer else None)
+        self.console.items(added, self._progress_summary)
+        return added
+    
+    def _add_batch_rows(self, paths: List[str], columns: List, metrics: Dict,
+                        layer_band: Optional[Tuple[int, Optional[int]]] = None) -> int:
+        """Valida as colunas já convertidas e acrescenta os clips do lote"""
+        n = len(paths)
+        valid = _valid_rows(columns[0], columns[1])
+        
+        # Resolve todos os caminhos (um scandir por diretório) antes de montar os clips
+        resolution = self.media_resolver.resolve(paths)
+        found = resolution.found
+        missing = resolution.missing
+        for path in missing[:10]:
+            self.console.message(f"✗ Imagem não encontrada: {path}")
+        if len(missing) > 10:
+            self.console.message(f"✗ ... e mais {len(missing) - 10} imagens não encontradas")
+        
+        rows = [i for i in valid if paths[i] in found]
+        invalid = n - len(valid)
+        if invalid:
+            self.console.message(f"⚠️  {invalid} linhas ignoradas: timestamp ou duração inválidos")
+        
+        used = list(dict.fromkeys(paths[i] for i in rows))
+        new_paths = [found[path] for path in used if not self._is_registered(found[path])]
+        metadata = {}
+        if self.media_cache is not None:
+            metadata = self.media_cache.get_many(new_paths)
+        if self._content_index is not None:
+            # Tamanhos e hashes do lote inteiro de uma vez, em paralelo
+            self._content_index.prepare(self._normalize_media_path(path) for path in new_paths)
+        file_ids = {}
+        for path in used:
+            file_ids[path] = self._register_media(found[path], metadata.get(found[path]))
+        
+        position_col, duration_col, layer_col, x_col, y_col, sx_col, sy_col = (
+            _to_list(column) for column in columns
+        )
+        if layer_band is not None:
+            # Só as linhas que viram clips disputam as camadas
+            batch_positions = [position_col[i] for i in rows]
+            batch_durations = [duration_col[i] for i in rows]
+            allocated, report = allocate_layers(
+                batch_positions, batch_durations, *layer_band,
+                occupied=self._occupied_in_band(batch_positions, batch_durations, layer_band))
+            for i, layer in zip(rows, allocated):
+                layer_col[i] = layer
+            self.layer_allocation = report
+            metrics.update(report)
+            if report['overflow']:
+                self.console.message(
+                    f"⚠️  {report['overflow']} imagens sobrepostas: a faixa de camadas "
+                    f"{layer_band[0]}-{layer_band[1]} comporta só {report['layers_used']} "
+                    f"ao mesmo tempo (máximo simultâneo: {report['max_concurrency']})")
+            if report['conflicts']:
+                self.console.message(
+                    f"⚠️  {report['conflicts']} imagens sobre clips que já estavam na faixa "
+                    f"{layer_band[0]}-{layer_band[1]} (todas as camadas ocupadas)")
+        base = self._clip_number
+        self._clip_number += len(rows)
+        build = self._build_clip_entry
+        # Os clips só criam objetos novos (sem ciclos); pausar o coletor de
+        # lixo evita varreduras repetidas de gerações enquanto o lote cresce
+        clips = self.project_data['clips']
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if isinstance(clips, ClipTable):
+                append = clips.append_values
+                for k, i in enumerate(rows, start=1):
+                    append(f"clip_{base + k}", file_ids[paths[i]], position_col[i], 0,
+                           duration_col[i], int(layer_col[i]), 1,
+                           x_col[i], y_col[i], sx_col[i], sy_col[i])
+                # As colunas já são o índice da timeline
+                for row in range(len(clips) - len(rows), len(clips)):
+                    self._dirty_clips[clips.clip_id(row)] = ClipRow(clips, row)
+            else:
+                clips.extend(
+                    build(f"clip_{base + k}", file_ids[paths[i]],
+                          position_col[i], duration_col[i], int(layer_col[i]),
+                          x_col[i], y_col[i], sx_col[i], sy_col[i])
+                    for k, i in enumerate(rows, start=1)
+                )
+                for clip_entry in clips[len(clips) - len(rows):]:
+                    self._timeline.add(clip_entry)
+                    self._dirty_clips[clip_entry['id']] = clip_entry
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        
+        counters = (('clips_added', len(rows)), ('media_missing', len(missing)),
+                    ('rows_invalid', invalid))
+        for name, value in counters:
+            metrics[name] = value
+            self.instrumentation.count(name, value)
+        return len(rows)
+    
+    def _occupied_in_band(self, positions: List[float], durations: List[float],
+                          layer_band: Tuple[int, Optional[int]]) -> List[Tuple[float, float, int]]:
+        """(início, fim, camada) dos clips da faixa que cruzam o período do lote"""
+        if not positions:
+            return []
+        t0 = min(positions)
+        t1 = max(position + duration for position, duration in zip(positions, durations))
+        first, last = layer_band
+        occupied = []
+        for clip in self._timeline.clips_in(t0, t1):
+            layer = clip['layer']
+            if layer >= first and (last is None or layer <= last):
+                start, end = clip_interval(clip)
+                occupied.append((start, end, layer))
+        return occupied
+    
     def add_multiple_images(self, 
                            image_timestamps: List[Tuple[str, float, float]],
-                           layer: int = 1):
+                           layer: Union[int, str] = 1,
+                           layer_band: Tuple[int, Optional[int]] = (1, None),
+                           fit: Optional[str] = None):
         """
         Adiciona múltiplas imagens com seus timestamps
         
         Args:
             image_timestamps: Lista de tuplas (caminho_imagem, timestamp, duração)
-            layer: Camada para todas as imagens
+            layer: Camada para todas as imagens, ou "auto" para que imagens
+                simultâneas fiquem em camadas diferentes dentro de layer_band
+            layer_band: Primeira e última camada (None = sem limite) do modo "auto"
+            fit: Enquadramento de cada imagem ("contain", "cover" ou
+                "fixed-width"), como em add_image_at_timestamp
         """
-        successful = 0
-        for img_path, timestamp, duration in image_timestamps:
-            if self.add_image_at_timestamp(img_path, timestamp, duration, layer):
-                successful += 1
+        if image_timestamps:
+            paths, timestamps, durations = zip(*image_timestamps)
+        else:
+            paths, timestamps, durations = (), (), ()
+        successful = self.add_images_batch(paths, timestamps, durations, layer,
+                                           layer_band=layer_band, fit=fit)
         
-        print(f"\n✓ Total: {successful}/{len(image_timestamps)} imagens adicionadas com sucesso")
+        message = self.console.message
+        message(f"\n✓ Total: {successful}/{len(image_timestamps)} imagens adicionadas com sucesso")
+        if layer == AUTO_LAYER and self.layer_allocation is not None:
+            report = self.layer_allocation
+            message(f"📚 {report['layers_used']} camadas usadas "
+                    f"(máximo de {report['max_concurrency']} imagens simultâneas)")
+        if self.media_reused:
+            message(f"♻️  {self.media_reused} entradas de arquivo reaproveitadas")
+        if self.media_deduped:
+            message(f"♻️  {self.media_deduped} imagens idênticas unificadas "
+                    f"({self.dedupe_bytes_saved / 1e6:.1f} MB)")
+        return successful
     
     def add_images_at_interval(self,
                               image_paths: List[str],
                               start_time: float = 0.0,
                               interval: float = 5.0,
                               duration: float = 2.0,
-                              layer: int = 1):
+                              layer: int = 1,
+                              **placement):
         """
         Adiciona imagens em intervalos regulares
         
+        As posições e a duração são alinhadas aos quadros do projeto; cada
+        posição é calculada em quadros inteiros a partir do índice da
+        imagem, então longas sequências não se desviam da grade.
+        
         Args:
             image_paths: Lista de caminhos das imagens
             start_time: Tempo inicial em segundos
             interval: Intervalo entre imagens em segundos
             duration: Duração de cada imagem
             layer: Camada das imagens
+            placement: x, y, scale_x, scale_y, fit e fit_width das imagens
+                (ver add_images_batch)
+        """
+        rate = self.frame_rate
+        count = len(image_paths)
+        starts = rate.grid(start_time, interval, count)
+        # Os fins também vêm da grade: com duration == interval, cada imagem
+        # termina exatamente no quadro em que a próxima começa
+        ends = rate.grid(parse_rational(start_time) + parse_rational(duration), interval, count)
+        positions = rate.seconds(starts)
+        durations = [rate.to_seconds(max(end - begin, 1)) for begin, end in zip(starts, ends)]
+        successful = self.add_images_batch(image_paths, positions, durations, layer, **placement)
+        
+        self.console.message(f"\n✓ {successful} imagens adicionadas em intervalos de {interval}s")
+        return successful
+    
+    def reconcile_images(self,
+                         image_timestamps: Iterable[Tuple[str, float, float]],
+                         layer: int = 1,
+                         **placement) -> Dict:
+        """
+        Faz a camada refletir a lista de imagens aplicando só as diferenças
+        
+        Para sincronizar de novo um CSV editado sem duplicar a timeline.
+        Cada imagem é identificada pelo caminho e pelo timestamp, e casada
+        com os clips de imagem da camada por tabelas hash:
+        
+            sem mudança: mesmo caminho e timestamp e mesma duração
+            retimed: mesmo caminho e timestamp, outra duração
+            moved: a imagem continua na lista em outro timestamp (as sobras
+                de cada caminho são pareadas em ordem de tempo)
+            added / removed: o que sobrou da lista / dos clips
+        
+        Os clips mantidos conservam id e keyframes; só os alterados são
+        interpretados e marcados para o diário. Clips de vídeo/áudio e de
+        outras camadas não são considerados.
+        
+        Args:
+            image_timestamps: Tuplas (caminho_imagem, timestamp, duração),
+                como em add_multiple_images (pode ser um gerador)
+            layer: Camada sincronizada
+            placement: x, y, scale_x, scale_y dos clips adicionados
+            
+        Returns:
+            Relatório com as chaves unchanged, added, removed, moved e retimed
+        """
+        report = {'unchanged': 0, 'added': 0, 'removed': 0, 'moved': 0, 'retimed': 0}
+        normalized: Dict[str, str] = {}
+        
+        def normalize(path):
+            key = normalized.get(path)
+            if key is None:
+                key = normalized[path] = self._normalize_media_path(path)
+            return key
+        
+        def set_duration(clip, duration):
+            start = clip.get('start', 0)
+            if math.isclose(clip['end'] - start, duration, rel_tol=1e-9, abs_tol=1e-9):
+                return False
+            clip['end'] = start + duration
+            return True
+        
+        with self.instrumentation.stage('reconcile', layer=layer) as metrics:
+            image_paths = {entry['id']: normalize(self._media_source(entry))
+                           for entry in self.project_data.get('files', [])
+                           if entry.get('path') and entry.get('media_type', 'image') == 'image'}
+            # (caminho, posição) -> clips da camada; chaves repetidas são clips duplicados
+            existing: Dict[Tuple[str, float], List[Dict]] = {}
+            for clip in self.project_data['clips']:
+                if clip.get('layer') != layer:
+                    continue
+                path = image_paths.get(clip.get('file_id'))
+                if path is not None:
+                    existing.setdefault((path, clip['position']), []).append(clip)
+            
+            changed = []
+            unmatched: Dict[str, List[Tuple[float, float, str]]] = {}
+            for image_path, timestamp, duration in image_timestamps:
+                path = normalize(image_path)
+                matches = existing.get((path, timestamp))
+                if not matches:
+                    unmatched.setdefault(path, []).append((timestamp, duration, image_path))
+                    continue
+                clip = matches.pop()
+                if not matches:
+                    del existing[(path, timestamp)]
+                if set_duration(clip, duration):
+                    report['retimed'] += 1
+                    changed.append(clip)
+                else:
+                    report['unchanged'] += 1
+            
+            leftover: Dict[str, List[Dict]] = {}
+            for (path, _), clips in existing.items():
+                leftover.setdefault(path, []).extend(clips)
+            removed, added = [], []
+            for path, rows in unmatched.items():
+                rows.sort()
+                clips = sorted(leftover.pop(path, []), key=lambda clip: clip['position'])
+                for clip, (timestamp, duration, _) in zip(clips, rows):
+                    clip['position'] = timestamp
+                    set_duration(clip, duration)
+                    changed.append(clip)
+                report['moved'] += min(len(clips), len(rows))
+                removed.extend(clips[len(rows):])
+                added.extend(rows[len(clips):])
+            for clips in leftover.values():
+                removed.extend(clips)
+            
+            for clip in changed:
+                self._dirty_clips[clip['id']] = clip
+            if changed:
+                self.rebuild_timeline_index()
+            if added:
+                report['added'] = self.add_images_batch(
+                    [image_path for _, _, image_path in added],
+                    [timestamp for timestamp, _, _ in added],
+                    [duration for _, duration, _ in added], layer, **placement)
+            report['removed'] = self.remove_clips(removed)
+            metrics.update(report)
+        
+        self.console.message(f"✓ Sincronização: {report['added']} adicionadas, "
+                             f"{report['removed']} removidas, {report['moved']} movidas, "
+                             f"{report['retimed']} com nova duração, "
+                             f"{report['unchanged']} sem alteração")
+        return report
+    
+    def deduplicate_media(self) -> Dict:
+        """
+        Unifica as entradas de 'files' com conteúdo idêntico
+        
+        Os arquivos são agrupados por tamanho e só os de mesmo tamanho têm o
+        hash calculado (em paralelo, via mmap). Os clips passam a apontar
+        para a primeira entrada de cada grupo e as demais são removidas.
+        
+        Returns:
+            Relatório com as chaves groups, entries_removed, clips_remapped
+            e bytes_saved
+        """
+        files = self.project_data.get('files', [])
+        by_path: Dict[str, List[Dict]] = {}
+        for file_entry in files:
+            path = self._media_source(file_entry)
+            if path:
+                by_path.setdefault(self._normalize_media_path(path), []).append(file_entry)
+        
+        groups = [(size, [entry for path in paths for entry in by_path[path]])
+                  for size, paths in find_duplicate_groups(
+                      by_path, self.media_resolver.max_workers, self.media_cache)]
+        grouped = {path for _, group in groups for path in
+                   (self._normalize_media_path(self._media_source(entry)) for entry in group)}
+        # Entradas repetidas com o mesmo caminho (projetos editados à mão)
+        for path, entries in by_path.items():
+            if len(entries) > 1 and path not in grouped:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = 0
+                groups.append((size, entries))
+        
+        remap = {}
+        bytes_saved = 0
+        for size, group in groups:
+            canonical = group[0]['id']
+            for entry in group[1:]:
+                remap[entry['id']] = canonical
+                bytes_saved += size
+        
+        report = {'groups': len(groups), 'entries_removed': len(remap),
+                  'clips_remapped': 0, 'bytes_saved': bytes_saved}
+        if not remap:
+            self.instrumentation.emit({'event': 'dedupe', **report})
+            self.console.message("✓ Nenhuma imagem duplicada encontrada")
+            return report
+        
+        for clip in self.project_data.get('clips', []):
+            file_id = clip.get('file_id')
+            if file_id in remap:
+                clip['file_id'] = remap[file_id]
+                self._dirty_clips[clip['id']] = clip
+                report['clips_remapped'] += 1
+        aliases = {self._normalize_media_path(self._media_source(entry)): remap[entry['id']]
+                   for entry in files if entry['id'] in remap and entry.get('path')}
+        files[:] = [entry for entry in files if entry['id'] not in remap]
+        self._rebuild_media_index()
+        self._media_index.update(aliases)
+        # Remoções de 'files' não cabem no diário: o próximo salvamento é completo
+        self._journal_base_ok = False
+        
+        self.instrumentation.emit({'event': 'dedupe', **report})
+        self.console.message(f"♻️  {report['entries_removed']} entradas duplicadas removidas "
+              f"({report['groups']} grupos, {report['clips_remapped']} clips, "
+              f"{bytes_saved / 1e6:.1f} MB)")
+        return report
+    
+    def _clip_records(self) -> Iterable[Dict]:
+        """Clips como dicionários, sem materializar linhas da tabela nem clips preguiçosos"""
+        clips = self.project_data['clips']
+        if isinstance(clips, ClipTable):
+            return (clips.record(row) for row in range(len(clips)))
+        return (json.loads(clip.raw_json()) if isinstance(clip, LazyClip) and not clip.touched
+                else clip for clip in clips)
+    
+    @staticmethod
+    def _max_scale(clip: Dict) -> float:
+        """Maior escala do clip (o maior ponto das curvas scale_x/scale_y)"""
+        scale = 0.0
+        for key in ('scale_x', 'scale_y'):
+            curve = clip.get(key)
+            value = static_value(curve)
+            if value is None and isinstance(curve, dict):
+                values = [point.get('co', {}).get('Y') for point in curve.get('Points', [])]
+                value = max((v for v in values if isinstance(v, (int, float))), default=None)
+            scale = max(scale, 1.0 if value is None else float(value))
+        return scale
+    
+    def create_proxies(self, cache_dir: Optional[str] = None, max_workers: Optional[int] = None,
+                       min_reduction: Optional[float] = None) -> Dict:
+        """
+        Troca as imagens grandes por proxies reduzidos (prévia mais leve)
+        
+        Cada imagem é reduzida ao maior tamanho em que aparece na timeline
+        (resolução do projeto vezes a maior escala entre os clips que a
+        usam). Os proxies são gerados em um pool de processos e guardados
+        em um cache endereçado pelo conteúdo (media_proxy), então os já
+        existentes não são refeitos. As entradas de 'files' passam a apontar
+        para o proxy e guardam a original em 'original_media'; use
+        use_original_media() antes da renderização final. Sem o Pillow,
+        só os proxies já existentes no cache são usados.
+        
+        Args:
+            cache_dir: Pasta dos proxies (padrão: media_proxy.DEFAULT_PROXY_DIR)
+            max_workers: Processos do pool (padrão: número de CPUs)
+            min_reduction: Só reduz imagens pelo menos esta vez maiores que o
+                tamanho exibido (padrão: media_proxy.MIN_REDUCTION)
+            
+        Returns:
+            Relatório com as chaves created, cached, not_needed, unavailable,
+            unsupported, failed e switched (entradas que mudaram de caminho)
+        """
+        import media_proxy
+        
+        cache_dir = os.path.abspath(cache_dir or media_proxy.DEFAULT_PROXY_DIR)
+        if min_reduction is None:
+            min_reduction = media_proxy.MIN_REDUCTION
+        with self.instrumentation.stage('proxies') as metrics:
+            scales: Dict[str, float] = {}
+            for clip in self._clip_records():
+                file_id = clip.get('file_id')
+                scales[file_id] = max(scales.get(file_id, 0.0), self._max_scale(clip))
+            entries = [entry for entry in self.project_data.get('files', [])
+                       if entry.get('media_type', 'image') == 'image'
+                       and entry['id'] in scales and self._media_source(entry)]
+            sources = [os.path.abspath(self._media_source(entry)) for entry in entries]
+            hashes = {}
+            if self.media_cache is not None:
+                # Sem cache, o media_proxy anota os hashes na pasta dos proxies
+                hashes = hash_files(sources, self.media_resolver.max_workers, self.media_cache)
+            width, height = self.project_data['width'], self.project_data['height']
+            jobs = [media_proxy.ProxyJob(path, width, height, scales[entry['id']], hashes.get(path))
+                    for entry, path in zip(entries, sources)]
+            results = media_proxy.build_proxies(jobs, cache_dir, max_workers, min_reduction)
+            
+            report = media_proxy.summarize(results)
+            report['switched'] = 0
+            for entry, source, result in zip(entries, sources, results):
+                original = entry.get('original_media')
+                if result.proxy_path is None:
+                    # Proxy desnecessário (a escala aumentou) ou indisponível: volta à original
+                    if original and result.status == 'not_needed':
+                        self._restore_original(entry)
+                        report['switched'] += 1
+                    continue
+                if entry['path'] == result.proxy_path:
+                    continue
+                if not original:
+                    original = {'path': entry['path']}
+                    if entry.get('width'):
+                        original['width'], original['height'] = entry['width'], entry['height']
+                    entry['original_media'] = original
+                entry['path'] = result.proxy_path
+                if entry.get('width'):
+                    entry['width'], entry['height'] = result.width, result.height
+                self._dirty_files[entry['id']] = entry
+                report['switched'] += 1
+            for result in results:
+                if result.status == 'failed':
+                    self.console.message(f"⚠️  Proxy não gerado: {result.error}")
+            metrics.update(report)
+        
+        self.console.message(f"✓ Proxies: {report['created']} criados, {report['cached']} "
+                             f"reaproveitados, {report['not_needed']} desnecessários")
+        if report['unavailable']:
+            self.console.message(f"⚠️  Pillow não instalado: {report['unavailable']} "
+                                 f"proxies não gerados (pip install Pillow)")
+        return report
+    
+    def _restore_original(self, entry):
+        original = entry['original_media']
+        entry['path'] = original['path']
+        if 'width' in original:
+            entry['width'], entry['height'] = original['width'], original['height']
+        del entry['original_media']
+        self._dirty_files[entry['id']] = entry
+    
+    def use_original_media(self) -> int:
         """
-        current_time = start_time
-        for img_path in image_paths:
-            self.add_image_at_timestamp(img_path, current_time, duration, layer)
-            current_time += interval
+        Volta as entradas de 'files' que usam proxy para as imagens originais
+        (para a renderização final); create_proxies() reativa os proxies
+        sem refazê-los
         
-        print(f"\n✓ {len(image_paths)} imagens adicionadas em intervalos de {interval}s")
+        Returns:
+            Número de entradas alteradas
+        """
+        entries = [entry for entry in self.project_data.get('files', [])
+                   if entry.get('original_media')]
+        for entry in entries:
+            self._restore_original(entry)
+        self.console.message(f"✓ {len(entries)} imagens voltaram aos originais")
+        return len(entries)
     
-    def save_project(self, output_path: str = None):
-        """Salva o projeto OpenShot"""
+    def merge_projects(self, inputs: Sequence[MergeInput], compact: bool = False) -> Optional[Dict]:
+        """
+        Junta outros projetos neste (project_path) e carrega o resultado
+        
+        Os clips são intercalados pela posição e gravados em fluxo, sem
+        carregar os projetos inteiros (veja osp_merge). Para incluir o
+        próprio projeto, passe project_path entre as entradas; o conteúdo
+        atual em memória não é usado, salve-o antes.
+        
+        Args:
+            inputs: Caminhos ou tuplas (projeto, deslocamento em segundos[,
+                deslocamento de camada])
+            compact: Grava o JSON sem indentação
+        
+        Returns:
+            Relatório da junção (projects, clips, files, files_shared,
+            ids_remapped, bytes_written) ou None em caso de erro
+        """
+        with self.instrumentation.stage('merge', projects=len(inputs)) as metrics:
+            try:
+                report = merge_projects(inputs, self.project_path, compact=compact)
+            except (OSError, ValueError) as e:
+                metrics['error'] = type(e).__name__
+                self.console.message(f"✗ Erro ao juntar projetos: {e}")
+                return None
+            metrics.update(report)
+        self.instrumentation.count('bytes_written', report['bytes_written'])
+        self.console.message(f"✓ {report['projects']} projetos juntados: {report['clips']} clips, "
+                             f"{report['files']} arquivos ({report['files_shared']} compartilhados, "
+                             f"{report['ids_remapped']} ids renumerados)")
+        self.load_project(lazy=True)
+        return report
+    
+    def rebuild_timeline_index(self):
+        """
+        Reconstrói o índice da timeline a partir de project_data['clips']
+        
+        Necessário apenas se a lista de clips for editada diretamente.
+        """
+        self._timeline.rebuild(self.project_data.get('clips', []))
+    
+    def clips_at(self, t: float, layer: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna os clips visíveis no instante t (em segundos)
+        
+        Args:
+            t: Instante consultado
+            layer: Restringe a consulta a uma camada (None = todas)
+        """
+        return self._timeline.clips_at(t, layer)
+    
+    def clips_in(self, t0: float, t1: float, layer: Optional[int] = None) -> List[Dict]:
+        """
+        Retorna os clips que aparecem em algum momento do intervalo [t0, t1)
+        
+        Args:
+            t0, t1: Início e fim do intervalo em segundos
+            layer: Restringe a consulta a uma camada (None = todas)
+        """
+        return self._timeline.clips_in(t0, t1, layer)
+    
+    def overlaps(self, layer: Optional[int] = None) -> List[Tuple[Dict, Dict]]:
+        """
+        Retorna os pares de clips sobrepostos na mesma camada (colisões)
+        
+        A comparação é feita em quadros do projeto: clips encostados cujo
+        fim e início diferem só por arredondamento não colidem.
+        
+        Args:
+            layer: Restringe a verificação a uma camada (None = todas)
+        """
+        return self._timeline.overlaps(layer, self.frame_rate)
+    
+    def shift_clips(self, after: float, delta: float, layer: Optional[int] = None) -> int:
+        """
+        Desloca em `delta` segundos os clips que começam em `after` ou depois
+        
+        Args:
+            after: Instante a partir do qual os clips são deslocados
+            delta: Deslocamento em segundos (negativo antecipa)
+            layer: Restringe a uma camada (None = todas)
+            
+        Returns:
+            Número de clips deslocados
+        """
+        clips = self.project_data['clips']
+        if isinstance(clips, ClipTable):
+            changed = [clips[row] for row in clips.shift(after, delta, layer)]
+        else:
+            changed = [clip for clip in clips
+                       if (layer is None or clip['layer'] == layer) and clip['position'] >= after]
+            for clip in changed:
+                clip['position'] += delta
+            if changed:
+                self.rebuild_timeline_index()
+        for clip in changed:
+            self._dirty_clips[clip['id']] = clip
+        return len(changed)
+    
+    def retime_clips(self, factor: Union[float, str, Fraction], origin: float = 0.0,
+                     layer: Optional[int] = None) -> int:
+        """
+        Multiplica o tempo dos clips por `factor` (2.0 = duas vezes mais lento)
+        
+        A distância de cada clip até `origin` e a duração são multiplicadas.
+        Com um fator racional (Fraction ou texto como "1001/1000"), a conta é
+        exata, em quadros inteiros do projeto: posições e durações resultantes
+        caem na grade de quadros (durações de pelo menos 1 quadro).
+        
+        Returns:
+            Número de clips alterados
+        """
+        if isinstance(factor, (str, Fraction)):
+            return self._retime_frames(parse_rational(factor), origin, layer)
+        clips = self.project_data['clips']
+        if isinstance(clips, ClipTable):
+            changed = [clips[row] for row in clips.retime(factor, origin, layer)]
+        else:
+            if factor <= 0 or not math.isfinite(factor):
+                raise ValueError("O fator de tempo deve ser positivo")
+            changed = [clip for clip in clips if layer is None or clip['layer'] == layer]
+            for clip in changed:
+                start = clip.get('start', 0)
+                clip['position'] = origin + (clip['position'] - origin) * factor
+                clip['end'] = start + (clip['end'] - start) * factor
+            if changed:
+                self.rebuild_timeline_index()
+        for clip in changed:
+            self._dirty_clips[clip['id']] = clip
+        return len(changed)
+    
+    def _retime_frames(self, factor: Fraction, origin: float,
+                       layer: Optional[int]) -> int:
+        """retime_clips() com fator racional, em quadros inteiros"""
+        if factor <= 0:
+            raise ValueError("O fator de tempo deve ser positivo")
+        rate = self.frame_rate
+        origin_frame = rate.to_frame(origin)
+        clips = self.project_data['clips']
+        if isinstance(clips, ClipTable):
+            rows = clips.retime_frames(rate, factor, origin_frame, layer)
+            changed = [clips[row] for row in rows]
+        else:
+            changed = [clip for clip in clips if layer is None or clip['layer'] == layer]
+            for clip in changed:
+                start = clip.get('start', 0)
+                position = scale_frames(rate.to_frame(clip['position']), factor, origin_frame)
+                duration = scale_frames(rate.to_frame(clip['end'] - start), factor)
+                clip['position'] = rate.to_seconds(position)
+                clip['end'] = start + rate.to_seconds(max(duration, 1))
+            if changed:
+                self.rebuild_timeline_index()
+        for clip in changed:
+            self._dirty_clips[clip['id']] = clip
+        return len(changed)
+    
+    def remove_clips(self, clips: Iterable[Dict]) -> int:
+        """
+        Remove clips do projeto
+        
+        A lista (ou tabela) de clips é reconstruída uma única vez, então
+        remova em lote. No próximo save_project(journal=True), as remoções
+        vão para o diário.
+        
+        Args:
+            clips: Clips do projeto (os próprios objetos de project_data['clips'])
+            
+        Returns:
+            Número de clips removidos
+        """
+        current = self.project_data['clips']
+        if isinstance(current, ClipTable):
+            rows = {clip.row for clip in clips}
+            removed_ids = [current.clip_id(row) for row in rows]
+            keep = current.delete(rows)
+            # As linhas seguintes subiram: os clips pendentes passam a apontar para elas
+            new_row = {old: new for new, old in enumerate(keep)}
+            for clip_id in removed_ids:
+                self._dirty_clips.pop(clip_id, None)
+            for clip_id, clip in self._dirty_clips.items():
+                if isinstance(clip, ClipRow) and clip.table is current:
+                    self._dirty_clips[clip_id] = ClipRow(current, new_row[clip.row])
+        else:
+            targets = {id(clip): clip for clip in clips}
+            current[:] = [clip for clip in current if id(clip) not in targets]
+            removed_ids = [clip.get('id') for clip in targets.values()]
+            for clip_id in removed_ids:
+                self._dirty_clips.pop(clip_id, None)
+        if removed_ids:
+            # Reconstruir só reagenda a montagem das árvores para a próxima consulta
+            self.rebuild_timeline_index()
+        self._removed_clips.update(dict.fromkeys(removed_ids))
+        self.instrumentation.count('clips_removed', len(removed_ids))
+        return len(removed_ids)
+    
+    def mark_clip_changed(self, clip: Dict):
+        """
+        Marca um clip editado diretamente: atualiza o índice da timeline e
+        inclui o clip no próximo checkpoint do diário (journal=True)
+        """
+        self._timeline.remove(clip)
+        self._timeline.add(clip)
+        self._dirty_clips[clip['id']] = clip
+    
+    def _clear_dirty(self):
+        self._dirty_clips = {}
+        self._dirty_files = {}
+        self._removed_clips = {}
+    
+    def save_project(self, output_path: str = None, journal: bool = False,
+                     compact: bool = False):
+        """
+        Salva o projeto OpenShot
+        
+        O arquivo é gravado em fluxo (um clip por vez) em um temporário que
+        substitui o destino atomicamente.
+        
+        Args:
+            output_path: Arquivo de saída (padrão: o próprio projeto)
+            compact: Grava o JSON sem indentação (arquivo bem menor)
+            journal: Em vez de reescrever o .osp, acrescenta apenas os clips e
+                arquivos alterados ao diário (projeto.osp.journal). O diário é
+                consolidado no .osp quando passa de journal_max_bytes.
+        """
         if output_path is None:
             output_path = self.project_path
         
-        try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(self.project_data, f, indent=2, ensure_ascii=False)
-            print(f"\n✓ Projeto salvo: {output_path}")
-            return True
-        except Exception as e:
-            print(f"\n✗ Erro ao salvar projeto: {e}")
-            return False
+        same_file = os.path.abspath(output_path) == os.path.abspath(self.project_path)
+        if journal and same_file and self._journal_base_ok:
+            return self._save_journal()
+        
+        self.console.flush(self._progress_summary)
+        with self.instrumentation.stage('save', compact=compact) as metrics:
+            try:
+                self.bytes_written = write_project(self.project_data, output_path, compact=compact)
+            except Exception as e:
+                metrics['error'] = type(e).__name__
+                self.console.message(f"\n✗ Erro ao salvar projeto: {e}")
+                return False
+            if same_file:
+                project_journal.remove_journal(self.project_path)
+                self._clear_dirty()
+                self._journal_base_ok = True
+            metrics['clips'] = len(self.project_data['clips'])
+            metrics['bytes_written'] = self.bytes_written
+        self.instrumentation.count('bytes_written', self.bytes_written)
+        self.console.message(f"\n✓ Projeto salvo: {output_path}")
+        return True
+    
+    def _save_journal(self) -> bool:
+        """Acrescenta as alterações pendentes ao diário do projeto"""
+        self.console.flush(self._progress_summary)
+        changes = len(self._dirty_clips) + len(self._dirty_files) + len(self._removed_clips)
+        with self.instrumentation.stage('journal', changes=changes) as metrics:
+            try:
+                written = project_journal.append_journal(
+                    self.project_path, self._dirty_clips.values(), self._dirty_files.values(),
+                    self._removed_clips
+                )
+            except Exception as e:
+                metrics['error'] = type(e).__name__
+                self.console.message(f"\n✗ Erro ao gravar diário: {e}")
+                return False
+            metrics['bytes_written'] = written
+        
+        self._clear_dirty()
+        self.instrumentation.count('bytes_written', written)
+        self.console.message(f"\n✓ Checkpoint gravado: {changes} alterações ({written} bytes)")
+        
+        if project_journal.journal_size(self.project_path) > self.journal_max_bytes:
+            return self.compact_journal()
+        return True
+    
+    def compact_journal(self, compact: bool = False) -> bool:
+        """Consolida o diário reescrevendo o .osp completo"""
+        return self.save_project(self.project_path, compact=compact)
 
 
 def exemplo_uso_basico():
@@ -0,0 +1,49 @@
+"""Configuração comum dos testes: módulos do repositório e projetos de exemplo"""
+
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_probe import _jpeg  # noqa: E402
+from sync_images_openshot import OpenShotImageSync  # noqa: E402
+
+
+def write_png(path, width=64, height=64):
+    """PNG mínimo (só o cabeçalho): suficiente para o probe de dimensões"""
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + width.to_bytes(4, 'big')
+                + height.to_bytes(4, 'big') + b'\x08\x06\x00\x00\x00')
+    return str(path)
+
+
+def exif_jpeg(taken, width=640, height=480):
+    """JPEG com EXIF: IFD0 -> IFD Exif -> DateTimeOriginal ("AAAA:MM:DD hh:mm:ss")"""
+    tiff = (b'II*\x00' + struct.pack('<I', 8)
+            + struct.pack('<H', 1) + struct.pack('<HHII', 0x8769, 4, 1, 26) + b'\x00' * 4
+            + struct.pack('<H', 1) + struct.pack('<HHII', 0x9003, 2, 20, 44) + b'\x00' * 4
+            + taken.encode('ascii') + b'\x00')
+    exif = b'Exif\x00\x00' + tiff
+    return b'\xff\xd8\xff\xe1' + struct.pack('>H', len(exif) + 2) + exif + _jpeg(width, height)[2:]
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Cinco imagens PNG em tmp_path/imgs"""
+    folder = tmp_path / "imgs"
+    folder.mkdir()
+    return [write_png(folder / f"img_{i}.png") for i in range(5)]
+
+
+@pytest.fixture
+def make_sync(tmp_path):
+    """Cria um OpenShotImageSync silencioso com um projeto novo em tmp_path"""
+    def make(name="projeto.osp", **kwargs):
+        kwargs.setdefault('output', 'quiet')
+        sync = OpenShotImageSync(str(tmp_path / name), **kwargs)
+        sync.create_new_project()
+        return sync
+    return make
@@ -0,0 +1,82 @@
+"""Construção em lote: impressão digital, saídas duplicadas e processos que morrem"""
+
+import os
+
+import pytest
+
+import batch_build
+from batch_build import (EstadoLote, _job, executar_lote, impressao_digital,
+                         jobs_da_pasta)
+from conftest import write_png
+
+_construir_projeto = batch_build.construir_projeto
+
+
+def _construir_ou_morrer(job):
+    """Derruba o processo do pool nos jobs cujo CSV se chama morre*.csv"""
+    if os.path.basename(job['csv']).startswith('morre'):
+        os._exit(1)
+    return _construir_projeto(job)
+
+
+def _csv(pasta, nome, imagens):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("imagem,timestamp,duracao\n")
+        for i, imagem in enumerate(imagens):
+            f.write(f"{os.path.basename(imagem)},{i * 2.0},2.0\n")
+    return caminho
+
+
+def test_fingerprint_follows_media(tmp_path, images):
+    csv = _csv(str(tmp_path / "imgs"), "video.csv",
+               images + [str(tmp_path / "imgs" / "depois.png")])
+    job = _job(csv, str(tmp_path / "video.osp"), {})
+    antes = impressao_digital(job)
+    assert impressao_digital(job) == antes
+
+    write_png(str(tmp_path / "imgs" / "depois.png"))  # Imagem que faltava
+    criada = impressao_digital(job)
+    assert criada['midia_sha256'] != antes['midia_sha256']
+    assert criada['csv_sha256'] == antes['csv_sha256']
+
+    write_png(images[0], 128, 128)  # Mesmo nome, conteúdo (tamanho) diferente
+    assert impressao_digital(job)['midia_sha256'] != criada['midia_sha256']
+
+
+def test_duplicate_outputs_are_rejected(tmp_path, images):
+    pasta = str(tmp_path / "imgs")
+    jobs = [_job(_csv(pasta, "a.csv", images), str(tmp_path / "video.osp"), {}),
+            _job(_csv(pasta, "b.csv", images), str(tmp_path / "video.osp"), {})]
+    with pytest.raises(ValueError, match="mesmo projeto"):
+        executar_lote(jobs, EstadoLote(str(tmp_path / "estado.json")))
+
+
+def test_second_run_skips_and_rebuilds_on_media_change(tmp_path, images):
+    pasta = str(tmp_path / "imgs")
+    _csv(pasta, "video.csv", images)
+    estado = str(tmp_path / "estado.json")
+
+    primeira = executar_lote(jobs_da_pasta(pasta), EstadoLote(estado), trabalhadores=1)
+    assert (primeira['construidos'], primeira['clips']) == (1, len(images))
+    segunda = executar_lote(jobs_da_pasta(pasta), EstadoLote(estado), trabalhadores=1)
+    assert (segunda['construidos'], segunda['pulados']) == (0, 1)
+
+    os.remove(images[-1])
+    terceira = executar_lote(jobs_da_pasta(pasta), EstadoLote(estado), trabalhadores=1)
+    assert (terceira['construidos'], terceira['clips']) == (1, len(images) - 1)
+
+
+def test_dead_worker_fails_only_its_job(tmp_path, images, monkeypatch):
+    monkeypatch.setattr(batch_build, 'construir_projeto', _construir_ou_morrer)
+    pasta = str(tmp_path / "imgs")
+    for nome in ("a.csv", "b.csv", "morre.csv", "c.csv", "d.csv"):
+        _csv(pasta, nome, images)
+
+    relatorio = executar_lote(jobs_da_pasta(pasta), EstadoLote(str(tmp_path / "estado.json")),
+                              trabalhadores=2)
+    assert relatorio['construidos'] == 4
+    assert relatorio['falhas'] == 1
+    (projeto, erro), = relatorio['erros'].items()
+    assert os.path.basename(projeto) == "morre.osp"
+    assert erro.startswith("processo encerrado")
@@ -0,0 +1,32 @@
+"""Suíte de benchmark: execução pequena do pipeline e detecção de regressões"""
+
+import os
+
+from benchmark_suite import ETAPAS, comparar, executar_pipeline, gerar_dados
+
+
+def test_pipeline_pequeno_mede_todas_as_etapas(tmp_path):
+    arquivo_csv = gerar_dados(str(tmp_path), 50)
+    assert gerar_dados(str(tmp_path), 50) == arquivo_csv  # Reaproveitado
+    etapas = executar_pipeline(arquivo_csv)
+    assert list(etapas) == ETAPAS
+    assert all(metricas['segundos'] >= 0 for metricas in etapas.values())
+    projeto = os.path.join(os.path.dirname(arquivo_csv), "bench.osp")
+    assert etapas['gravacao']['bytes'] == os.path.getsize(projeto)
+
+    rastreadas = executar_pipeline(arquivo_csv, rastrear=True)
+    assert all('tracemalloc_pico_mb' in metricas for metricas in rastreadas.values())
+
+
+def _execucao(segundos, rss):
+    return {'resultados': {'1000': {'clips': {'segundos': segundos, 'rss_pico_mb': rss}}}}
+
+
+def test_comparar_ignora_ruido_e_aponta_regressoes(capsys):
+    base = _execucao(1.0, 100.0)
+    assert comparar(base, _execucao(1.05, 101.0)) == []
+    # +50% mas só 5 ms: abaixo do mínimo absoluto
+    assert comparar(_execucao(0.01, 100.0), _execucao(0.015, 100.0)) == []
+    assert comparar(base, _execucao(1.5, 150.0)) == [
+        ('1000', 'clips', 'segundos', 1.0, 1.5), ('1000', 'clips', 'rss_pico_mb', 100.0, 150.0)]
+    assert "regressão" in capsys.readouterr().out
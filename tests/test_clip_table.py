@@ -0,0 +1,106 @@
+"""ClipTable: índice da timeline (bisect) comparado à força bruta após cada tipo de edição"""
+
+import random
+from fractions import Fraction
+
+import pytest
+
+from clip_table import ClipTable
+from frame_rate import FrameRate
+from timeline_index import TimelineIndex
+
+
+def _table(rng, n):
+    table = ClipTable()
+    for i in range(n):
+        table.append_values(f"clip_{i + 1}", f"F{i % 7}", round(rng.uniform(0, 200), 2), 0,
+                            round(rng.uniform(0.5, 8), 2), rng.randint(1, 4))
+    return table
+
+
+def _ids(clips):
+    return [clip['id'] for clip in clips]
+
+
+def _brute_in(table, t0, t1, layer=None, closed=False):
+    rows = []
+    for row in range(len(table)):
+        clip = table[row]
+        if isinstance(clip['position'], str):
+            continue
+        begin, finish = clip['position'], clip['position'] + clip['end'] - clip['start']
+        if (layer is None or clip['layer'] == layer) and finish > t0 and (
+                begin <= t1 if closed else begin < t1):
+            rows.append(row)
+    rows.sort(key=lambda row: (table[row]['layer'], table[row]['position'], row))
+    return [table.clip_id(row) for row in rows]
+
+
+def _check(table, rng):
+    for _ in range(30):
+        t0 = rng.uniform(-5, 210)
+        t1 = t0 + rng.choice([0.0, 0.5, 5.0, 50.0])
+        layer = rng.choice([None, 1, 2, 3, 4, 9])
+        assert _ids(table.clips_in(t0, t1, layer)) == _brute_in(table, t0, t1, layer)
+        assert _ids(table.clips_at(t0, layer)) == _brute_in(table, t0, t0, layer, closed=True)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(5)
+
+
+def test_queries_match_brute_force_through_edits(rng):
+    table = _table(rng, 400)
+    _check(table, rng)
+
+    # Poucas linhas acrescentadas/alteradas: testadas fora do índice
+    for i in range(10):
+        table.append_values(f"clip_{1000 + i}", "F0", rng.uniform(0, 200), 0, 3.0, 2)
+    table[5]['position'] = 150.0
+    table[6]['layer'] = 4
+    table[7]['end'] = 40.0
+    assert table._indexed == 400 and table._stale == {5, 6, 7}
+    _check(table, rng)
+
+    # Muitas linhas novas: o índice é remontado
+    for i in range(200):
+        table.append_values(f"clip_{2000 + i}", "F1", rng.uniform(0, 200), 0, 1.0, 1)
+    _check(table, rng)
+    assert table._indexed == len(table)
+
+    table.delete(range(0, 600, 3))
+    _check(table, rng)
+    table.shift(100.0, 12.5, layer=2)
+    _check(table, rng)
+    table.retime(1.5, origin=10.0)
+    _check(table, rng)
+    table.retime_frames(FrameRate(30000, 1001), Fraction(2, 3))
+    _check(table, rng)
+
+
+def test_free_format_rows_without_position_are_not_indexed(rng):
+    table = _table(rng, 20)
+    table.append({'id': "titulo", 'layer': 2, 'position': "abc", 'start': 0, 'end': 5})
+    table.append({'id': "animado", 'layer': 2, 'position': 1, 'start': 0, 'end': 5,
+                  'alpha': {'Points': [{'co': {'X': 1, 'Y': 0.0}}, {'co': {'X': 30, 'Y': 1.0}}]}})
+    ids = _ids(table.clips_at(2.0, 2))
+    assert "animado" in ids and "titulo" not in ids
+    _check(table, rng)
+
+
+@pytest.mark.parametrize("rate", [None, FrameRate(25)])
+def test_overlaps_match_timeline_index(rng, rate):
+    table = _table(rng, 300)
+    table[3]['position'] = 77.0  # Linha alterada depois da primeira consulta
+    table.clips_at(0.0)
+    table[4]['layer'] = 3
+
+    index = TimelineIndex()
+    index.rebuild([table[row] for row in range(len(table))])
+    expected = [(a['id'], b['id']) for a, b in index.overlaps(None, rate)]
+    assert expected
+    assert [(a['id'], b['id']) for a, b in table.overlaps(None, rate)] == expected
+    for layer in (1, 2, 9):
+        expected = [(a['id'], b['id']) for a, b in index.overlaps(layer, rate)]
+        assert [(a['id'], b['id']) for a, b in table.overlaps(layer, rate)] == expected
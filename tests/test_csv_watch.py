@@ -0,0 +1,130 @@
+"""Modo de observação: acréscimos lidos pelo fim, reconciliação e imagens novas"""
+
+import os
+
+import pytest
+
+from conftest import write_png
+from csv_watch import JANELA_VERIFICACAO, ObservadorCSV
+
+
+def _escrever(caminho, texto, modo='w'):
+    with open(caminho, modo, encoding='utf-8') as f:
+        f.write(texto)
+
+
+def _linhas(imagens, inicio=0):
+    return "".join(f"{imagem},{(inicio + i) * 2.0},2.0\n" for i, imagem in enumerate(imagens))
+
+
+@pytest.fixture
+def observador(tmp_path, images, make_sync):
+    # O projeto fica na pasta das imagens: salvá-lo não pode disparar nada
+    sync = make_sync(os.path.join("imgs", "video.osp"))
+    arquivo_csv = str(tmp_path / "timestamps.csv")
+    _escrever(arquivo_csv, "imagem,timestamp,duracao\n" + _linhas(images[:3]))
+    observador = ObservadorCSV(sync, arquivo_csv, layer=2)
+    assert observador.sincronizar()
+    return observador
+
+
+def _posicoes(observador):
+    return sorted(clip['position'] for clip in observador.sync.project_data['clips'])
+
+
+def test_acrescimo_le_so_as_linhas_novas(observador, images):
+    assert not observador.verificar()
+    lidos = observador.sync.instrumentation.counters['csv_bytes_read']
+    novas = _linhas(images[3:], inicio=3)
+    _escrever(observador.arquivo_csv, novas, 'a')
+    assert observador.verificar()
+    assert observador.aplicar() == {'added': 2, 'reconciled': False, 'saved': True}
+    # Releitura da janela antes do fim (aqui o arquivo inteiro) e os bytes novos
+    tamanho = os.path.getsize(observador.arquivo_csv) - len(novas)
+    assert observador.sync.instrumentation.counters['csv_bytes_read'] == lidos + tamanho + len(novas)
+    assert _posicoes(observador) == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert observador.salvamentos == 2
+
+
+def test_linha_incompleta_nao_duplica_ao_ser_completada(observador, images):
+    _escrever(observador.arquivo_csv, f"{images[3]},6.0,2", 'a')
+    observador.verificar()
+    assert observador.aplicar()['added'] == 1
+    _escrever(observador.arquivo_csv, ".5\n", 'a')
+    observador.verificar()
+    assert observador.aplicar()['reconciled']
+    clips = observador.sync.project_data['clips']
+    assert len(clips) == 4
+    assert [clip['end'] - clip['start'] for clip in clips if clip['position'] == 6.0] == [2.5]
+
+
+def test_edicao_no_meio_reconcilia(observador, images):
+    _escrever(observador.arquivo_csv, "imagem,timestamp,duracao\n"
+              + _linhas([images[0], images[2]]))
+    observador.verificar()
+    relatorio = observador.aplicar()
+    assert relatorio['reconciled'] and relatorio['saved']
+    assert _posicoes(observador) == [0.0, 2.0]
+
+
+def test_imagem_criada_depois_entra_no_projeto(observador, tmp_path):
+    nova = str(tmp_path / "imgs" / "depois.png")
+    _escrever(observador.arquivo_csv, _linhas([nova], inicio=10), 'a')
+    observador.verificar()
+    assert observador.aplicar() == {'added': 0, 'reconciled': False, 'saved': False}
+
+    observador.sync.save_project()  # Arquivos não citados no CSV não contam
+    assert not observador.verificar()
+    write_png(nova)
+    assert observador.verificar()
+    assert observador.aplicar() == {'added': 1, 'reconciled': False, 'saved': True}
+    assert _posicoes(observador)[-1] == 20.0
+    assert observador._ausentes == {} and observador._pastas == {}
+
+
+def test_acrescimo_em_csv_grande_le_so_a_janela_e_o_fim(observador, images):
+    _escrever(observador.arquivo_csv, _linhas(images[:3] * 400, inicio=3), 'a')
+    observador.verificar()
+    assert observador.aplicar()['added'] == 1200
+    lidos = observador.sync.instrumentation.counters['csv_bytes_read']
+    novas = _linhas(images[3:4], inicio=2000)
+    _escrever(observador.arquivo_csv, novas, 'a')
+    observador.verificar()
+    assert observador.aplicar()['added'] == 1
+    assert (observador.sync.instrumentation.counters['csv_bytes_read']
+            == lidos + JANELA_VERIFICACAO + len(novas))
+
+
+def test_edicao_perto_do_fim_sem_encolher_reconcilia(observador, images):
+    with open(observador.arquivo_csv, 'r+b') as f:
+        texto = f.read()
+        f.seek(0)
+        f.write(texto.replace(b",4.0,2.0\n", b",4.0,3.0\n"))
+    observador.verificar()
+    relatorio = observador.aplicar()
+    assert relatorio['reconciled'] and relatorio['saved']
+    durações = {clip['position']: clip['end'] - clip['start']
+                for clip in observador.sync.project_data['clips']}
+    assert durações == {0.0: 2.0, 2.0: 2.0, 4.0: 3.0}
+
+
+def test_arquivo_substituido_maior_reconcilia(observador, images, tmp_path):
+    # Editores salvam num arquivo novo e renomeiam: outro inode; a linha
+    # editada fica antes da janela conferida, só o inode denuncia a troca
+    _escrever(observador.arquivo_csv, _linhas(images[:3] * 400, inicio=3), 'a')
+    observador.verificar()
+    observador.aplicar()
+    with open(observador.arquivo_csv, encoding='utf-8') as f:
+        texto = f.read()
+    assert texto.index(images[1]) < len(texto) - JANELA_VERIFICACAO
+    novo = str(tmp_path / "novo.csv")
+    _escrever(novo, texto.replace(f"{images[1]},2.0,", f"{images[4]},2.0,", 1)
+              + _linhas(images[3:4], inicio=2000))
+    os.replace(novo, observador.arquivo_csv)
+    observador.verificar()
+    relatorio = observador.aplicar()
+    assert relatorio['reconciled']
+    assert len(observador.sync.project_data['clips']) == 1204
+    clip, = observador.sync.clips_at(2.5, 2)
+    caminhos = {f['id']: f['path'] for f in observador.sync.project_data['files']}
+    assert os.path.basename(caminhos[clip['file_id']]) == os.path.basename(images[4])
@@ -0,0 +1,82 @@
+"""Taxa de quadros racional: conversões, grade sem desvio e mudança de velocidade exata"""
+
+from fractions import Fraction
+
+import pytest
+
+import frame_rate
+from frame_rate import FrameRate, parse_rational, scale_frames
+
+
+@pytest.mark.parametrize("value, expected", [
+    (30, (30, 1)), (29.97, (30000, 1001)), (23.976, (24000, 1001)), (59.94, (60000, 1001)),
+    ("30000/1001", (30000, 1001)), (Fraction(25, 1), (25, 1)), ({'num': 50, 'den': 2}, (25, 1)),
+    (12.5, (25, 2)),
+])
+def test_from_value(value, expected):
+    rate = FrameRate.from_value(value)
+    assert (rate.num, rate.den) == expected
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        FrameRate(0)
+    with pytest.raises(ValueError):
+        parse_rational(float('nan'))
+
+
+@pytest.mark.parametrize("rate", [FrameRate(30000, 1001), FrameRate(24), FrameRate(25, 2)])
+def test_to_seconds_is_nearest_float_and_round_trips(rate):
+    for frame in (0, 1, 1001, 123457, 10 ** 9 + 7):
+        seconds = rate.to_seconds(frame)
+        assert seconds == float(Fraction(frame) / rate.fraction)
+        assert rate.to_frame(seconds) == frame
+        assert rate.snap(seconds) == seconds
+
+
+def test_grid_does_not_drift():
+    rate = FrameRate(30000, 1001)
+    count = 100000
+    frames = rate.grid("1/3", "0.1", count)
+    for i in (0, 1, 2, 999, count - 1):
+        assert frames[i] == _nearest((Fraction(1, 3) + Fraction(i, 10)) * rate.fraction)
+
+
+def _nearest(value: Fraction) -> int:
+    """Quadro mais próximo, meio para cima (como a grade)"""
+    return (2 * value.numerator + value.denominator) // (2 * value.denominator)
+
+
+def test_scale_frames_exact():
+    assert scale_frames(1000, Fraction(1001, 1000)) == 1001
+    assert scale_frames([0, 3, 10], Fraction(1, 2), origin=2) == [1, 3, 6]
+    # Meio quadro arredonda para cima, inclusive em valores negativos
+    assert scale_frames(-3, Fraction(1, 2)) == -1
+
+
+def test_seconds_and_frames_without_numpy_match_scalars(monkeypatch):
+    monkeypatch.setattr(frame_rate, 'np', None)
+    rate = FrameRate(24000, 1001)
+    frames = [0, 1, 48, 100001]
+    assert rate.seconds(frames) == [rate.to_seconds(frame) for frame in frames]
+    assert rate.frames(rate.seconds(frames)) == frames
+
+
+@pytest.mark.parametrize("backend", ["records", "table"])
+def test_retime_clips_rational_round_trip(make_sync, images, backend):
+    sync = make_sync(backend=backend)
+    sync.create_new_project(fps="30000/1001")
+    sync.add_images_at_interval(images, start_time=1.0, interval=2.5, duration=2.5)
+    rate = sync.frame_rate
+    before = [(rate.to_frame(c['position']), rate.to_frame(c['end'] - c['start']))
+              for c in sync.project_data['clips']]
+
+    sync.retime_clips("1001/1000")
+    sync.retime_clips("1000/1001")
+    after = [(rate.to_frame(c['position']), rate.to_frame(c['end'] - c['start']))
+             for c in sync.project_data['clips']]
+    assert after == before
+    # Posições na grade: cada uma é exatamente o início de um quadro
+    for clip in sync.project_data['clips']:
+        assert clip['position'] == rate.to_seconds(rate.to_frame(clip['position']))
+    assert sync.overlaps() == []
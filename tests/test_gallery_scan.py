@@ -0,0 +1,74 @@
+"""Galeria: filtro de extensões, ordenações e paginação com heap"""
+
+import os
+
+import pytest
+
+from benchmark_probe import _jpeg
+from conftest import exif_jpeg
+from gallery_scan import iter_images, natural_key, normalize_extensions, scan_gallery
+
+
+@pytest.fixture
+def galeria(tmp_path):
+    raiz = tmp_path / "galeria"
+    (raiz / "sub" / "funda").mkdir(parents=True)
+    nomes = ["foto10.JPG", "foto2.jpg", "Foto1.png", "sub/foto3.webp", "sub/funda/foto11.gif",
+             "notas.txt", "sub/leia.md"]
+    for i, nome in enumerate(nomes):
+        caminho = raiz / nome
+        caminho.write_bytes(_jpeg(10, 10))
+        # Modificações em 2023, na ordem inversa da lista
+        os.utime(caminho, (1_700_000_000 - i * 60, 1_700_000_000 - i * 60))
+    os.symlink(raiz / "sub", raiz / "atalho")  # Não é seguido
+    return str(raiz)
+
+
+def _nomes(caminhos):
+    return [os.path.basename(caminho) for caminho in caminhos]
+
+
+def test_filters_and_natural_order(galeria):
+    assert sorted(_nomes(entry.path for entry in iter_images(galeria))) == sorted(
+        ["foto10.JPG", "foto2.jpg", "Foto1.png", "foto3.webp", "foto11.gif"])
+    assert _nomes(scan_gallery(galeria)) == [
+        "Foto1.png", "foto2.jpg", "foto10.JPG", "foto3.webp", "foto11.gif"]
+    assert _nomes(scan_gallery(galeria, extensions=["PNG", ".gif"], recursive=False)) == [
+        "Foto1.png"]
+    assert normalize_extensions({"JPG", " .png", "webp", ""}) == {".jpg", ".png", ".webp"}
+    assert natural_key("foto2") < natural_key("Foto10")
+
+
+@pytest.mark.parametrize("sort", ["name", "mtime", "capture"])
+def test_pages_match_full_sort(galeria, sort):
+    completa = list(scan_gallery(galeria, sort=sort))
+    assert len(completa) == 5
+    for reverse in (False, True):
+        ordem = completa[::-1] if reverse else completa
+        for offset, limit in ((0, 2), (2, 2), (4, 10), (1, None), (0, 0)):
+            fim = None if limit is None else offset + limit
+            assert list(scan_gallery(galeria, sort=sort, reverse=reverse, offset=offset,
+                                     limit=limit)) == ordem[offset:fim]
+
+
+def test_mtime_and_capture_orders(galeria, tmp_path):
+    assert _nomes(scan_gallery(galeria, sort="mtime")) == [
+        "foto11.gif", "foto3.webp", "Foto1.png", "foto2.jpg", "foto10.JPG"]
+    # A data do EXIF vale mais que a modificação: esta foto vai para o início
+    antiga = os.path.join(galeria, "foto2.jpg")
+    with open(antiga, 'wb') as f:
+        f.write(exif_jpeg("1999:01:01 00:00:00"))
+    assert _nomes(scan_gallery(galeria, sort="capture"))[0] == "foto2.jpg"
+
+
+def test_unsorted_listing_stops_early(galeria):
+    assert len(list(scan_gallery(galeria, sort="none", offset=1, limit=2))) == 2
+
+
+def test_invalid_arguments(galeria, tmp_path):
+    with pytest.raises(ValueError):
+        scan_gallery(galeria, sort="tamanho")
+    with pytest.raises(ValueError):
+        scan_gallery(galeria, offset=-1)
+    with pytest.raises(OSError):
+        list(scan_gallery(str(tmp_path / "nao_existe")))
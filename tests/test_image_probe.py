@@ -0,0 +1,55 @@
+"""Dimensões pelo cabeçalho, data de captura do EXIF e escala de enquadramento"""
+
+import pytest
+
+from benchmark_probe import _jpeg, preparar_imagens
+from conftest import exif_jpeg, write_png
+from image_probe import fit_scale, probe_capture_time, probe_image, probe_images
+from osp_model import static_value
+
+
+def test_all_formats_serial_and_parallel(tmp_path):
+    esperado = preparar_imagens(str(tmp_path), 600)  # Mais de 512: leitura em threads
+    for caminho, dimensoes in list(esperado.items())[:14]:
+        assert probe_image(caminho) == dimensoes
+    (tmp_path / "texto.png").write_bytes(b"nao sou uma imagem")
+    caminhos = list(esperado) + [str(tmp_path / "texto.png"), str(tmp_path / "nao_existe.jpg")]
+    resultado = probe_images(caminhos + caminhos[:10], max_workers=4)
+    assert resultado == dict(esperado, **{caminhos[-2]: None, caminhos[-1]: None})
+
+
+def test_capture_time(tmp_path):
+    foto = tmp_path / "foto.jpg"
+    foto.write_bytes(exif_jpeg("2021:05:06 07:08:09"))
+    assert probe_capture_time(str(foto)).isoformat() == "2021-05-06T07:08:09"
+    assert probe_image(str(foto)) == ('jpeg', 640, 480)
+
+    foto.write_bytes(exif_jpeg("0000:00:00 00:00:00"))
+    assert probe_capture_time(str(foto)) is None
+    foto.write_bytes(_jpeg(10, 10))  # EXIF sem data
+    assert probe_capture_time(str(foto)) is None
+    assert probe_capture_time(str(tmp_path / "nao_existe.jpg")) is None
+
+
+@pytest.mark.parametrize("mode, expected", [
+    ("contain", 1.0), ("cover", 2.25), ("fixed-width", 0.5)])
+def test_fit_scale(mode, expected):
+    # 4000x1000 num quadro 1920x1080: a base "contain" reduz para 0.48
+    scale = fit_scale(mode, 4000, 1000, 1920, 1080, 960 if mode == "fixed-width" else None)
+    assert scale == pytest.approx((expected, expected))
+
+
+def test_fit_scale_edge_cases():
+    assert fit_scale("cover", 0, 0, 1920, 1080) == (1.0, 1.0)  # Dimensões desconhecidas
+    assert fit_scale("fixed-width", 1920, 1080, 1920, 1080) == (1.0, 1.0)
+    with pytest.raises(ValueError):
+        fit_scale("stretch", 10, 10, 1920, 1080)
+
+
+def test_sync_fit_uses_header_dimensions(make_sync, images, tmp_path):
+    panoramica = write_png(tmp_path / "imgs" / "panoramica.png", 4000, 1000)
+    sync = make_sync()
+    sync.add_images_batch([panoramica, images[0]], [0.0, 2.0], fit="cover", scale_x=2.0)
+    clips = sync.project_data['clips']
+    assert static_value(clips[0]['scale_x']) == pytest.approx(4.5)  # 2.25 * 2.0
+    assert static_value(clips[1]['scale_y']) == pytest.approx(1920 / 1080)
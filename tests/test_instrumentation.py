@@ -0,0 +1,82 @@
+"""Instrumentação: eventos de etapa, contadores e modos de saída"""
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from instrumentation import Console, Instrumentation, format_event
+
+
+def test_stage_events_and_counters():
+    events = []
+    instrumentation = Instrumentation(callback=events.append)
+    with instrumentation.stage('save', compact=True) as metrics:
+        metrics['bytes_written'] = 10
+    instrumentation.count('clips_added', 3)
+    instrumentation.count('clips_added')
+    with pytest.raises(OSError):
+        with instrumentation.stage('save'):
+            raise OSError("disco cheio")
+
+    assert [(e['stage'], e.get('compact'), e.get('error')) for e in events] == [
+        ('save', True, None), ('save', None, 'OSError')]
+    assert events[0]['bytes_written'] == 10
+    summary = instrumentation.summary()
+    assert summary['counters'] == {'clips_added': 4}
+    assert summary['timings']['save'] == pytest.approx(sum(e['seconds'] for e in events))
+
+
+def test_counters_from_many_threads():
+    instrumentation = Instrumentation()
+
+    def work(_):
+        for _ in range(10000):
+            instrumentation.count('clips_added')
+
+    # Troca de thread o mais cedo possível: sem o lock, incrementos se perdem
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert instrumentation.summary()['counters'] == {'clips_added': 80000}
+
+
+def test_log_lines_and_memory_peak(caplog):
+    instrumentation = Instrumentation(log=logging.getLogger("openshot_sync"),
+                                      trace_memory=True)
+    with caplog.at_level(logging.INFO, logger="openshot_sync"):
+        with instrumentation.stage('load', path="a b.osp"):
+            bytearray(1 << 20)
+    record, = caplog.records
+    assert record.metrics['memory_peak_bytes'] >= 1 << 20
+    assert 'stage=load' in record.getMessage() and 'path="a b.osp"' in record.getMessage()
+    assert format_event({'x': 0.1 + 0.2, 'vazio': ""}) == 'x=0.3 vazio=""'
+
+
+def test_progress_mode_groups_items(capsys):
+    console = Console("progress", progress_every=3)
+    summary = iter(f"▶ resumo {i}" for i in range(10)).__next__
+    for _ in range(7):
+        console.items(1, summary, "linha por imagem")
+    console.flush(summary)
+    console.flush(summary)  # Nada pendente
+    assert capsys.readouterr().out.splitlines() == ["▶ resumo 0", "▶ resumo 1", "▶ resumo 2"]
+
+    Console("quiet").message("nada")
+    Console("normal").items(1, summary, "✓ imagem")
+    assert capsys.readouterr().out == "✓ imagem\n"
+    with pytest.raises(ValueError):
+        Console("verboso")
+
+
+def test_quiet_sync_prints_nothing(make_sync, images, capsys):
+    sync = make_sync(output='quiet')
+    sync.add_images_batch(images, [0.0, 1.0, 2.0, 3.0, 4.0])
+    sync.save_project()
+    assert capsys.readouterr().out == ""
+    assert sync.instrumentation.counters['clips_added'] == len(images)
@@ -0,0 +1,60 @@
+"""Cache de metadados: validação por tamanho/mtime e despejo LRU sem COUNT(*) por lote"""
+
+import os
+
+import media_cache
+from conftest import write_png
+from media_cache import MediaMetadataCache
+
+
+def test_hits_and_invalidation(tmp_path, images):
+    with MediaMetadataCache(str(tmp_path / "cache.sqlite")) as cache:
+        first = cache.get_many(images)
+        assert (cache.hits, cache.misses) == (0, len(images))
+        assert first[images[0]]['width'] == 64 and first[images[0]]['format'] == 'png'
+        cache.get_many(images)
+        assert cache.hits == len(images)
+
+        write_png(images[0], 32, 16)
+        os.utime(images[0], ns=(0, 1))
+        assert cache.get(images[0])['width'] == 32
+        assert cache.misses == len(images) + 1
+        assert cache.get(str(tmp_path / "nao_existe.png")) is None
+
+
+def test_evicts_least_recently_used(tmp_path, images):
+    with MediaMetadataCache(":memory:", max_entries=3) as cache:
+        for path in images:
+            cache.get(path)
+        assert cache.stats()['entries'] == 3
+        cache.get(images[0])  # O mais antigo foi despejado
+        assert cache.misses == len(images) + 1
+        assert cache.stats()['entries'] == 3
+
+
+def test_no_count_scan_per_batch(tmp_path, images, monkeypatch):
+    monkeypatch.setattr(media_cache, '_SIZE_CHECK_INTERVAL', 4)
+    statements = []
+    with MediaMetadataCache(":memory:", max_entries=100, max_bytes=10 ** 9) as cache:
+        cache._conn.set_trace_callback(statements.append)
+        for path in images:
+            cache.get(path)
+        counts = [sql for sql in statements if 'COUNT(*)' in sql]
+        page_counts = [sql for sql in statements if 'page_count' in sql]
+        assert counts == []
+        assert len(page_counts) == 1  # Só depois da 4ª inserção
+        assert cache._count == cache.stats()['entries'] == len(images)
+
+
+def test_count_follows_normalized_keys(tmp_path, images, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    relative = [os.path.relpath(path) for path in images]
+    dotted = [os.path.join('.', path) for path in relative]
+    with MediaMetadataCache(":memory:") as cache:
+        result = cache.get_many(images + relative + dotted)
+        assert cache.misses == len(images)
+        assert result[dotted[0]] is result[images[0]]
+        assert cache._count == cache.stats()['entries'] == len(images)
+        cache.get_many(dotted)
+        assert cache.hits == len(images)
+        assert cache._count == len(images)
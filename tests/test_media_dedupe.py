@@ -0,0 +1,49 @@
+"""Deduplicação por conteúdo: hash paralelo, cache de hashes e grupos idênticos"""
+
+import hashlib
+import os
+import shutil
+
+import media_dedupe
+from media_cache import MediaMetadataCache
+from media_dedupe import find_duplicate_groups, hash_files
+
+
+def test_hash_files_matches_hashlib(tmp_path, images):
+    empty = tmp_path / "vazio.png"
+    empty.write_bytes(b'')
+    paths = images + [str(empty), str(tmp_path / "nao_existe.png")]
+    digests = hash_files(paths, max_workers=4)
+    for path in images + [str(empty)]:
+        with open(path, 'rb') as f:
+            assert digests[path] == hashlib.sha256(f.read()).hexdigest()
+    assert digests[str(tmp_path / "nao_existe.png")] is None
+
+
+def test_cache_misses_use_parallel_hasher_and_are_stored(tmp_path, images, monkeypatch):
+    batches = []
+    parallel = media_dedupe._hash_parallel
+
+    def spy(paths, max_workers):
+        batches.append(list(paths))
+        return parallel(paths, max_workers)
+
+    monkeypatch.setattr(media_dedupe, '_hash_parallel', spy)
+    with MediaMetadataCache(str(tmp_path / "cache.sqlite")) as cache:
+        first = hash_files(images, 4, cache)
+        assert batches == [images]  # Um lote só, com todas as falhas
+
+        second = hash_files(images, 4, cache)
+        assert second == first
+        assert batches == [images]  # Tudo veio do cache
+        assert cache.get(images[0], with_hash=True)['sha256'] == first[images[0]]
+
+
+def test_find_duplicate_groups(tmp_path, images):
+    copy = str(tmp_path / "copia.png")
+    shutil.copyfile(images[0], copy)
+    other = tmp_path / "outro.png"
+    other.write_bytes(b'x' * 20)
+    groups = find_duplicate_groups(images + [copy, str(other)])
+    # Os PNGs de teste são todos iguais (só o cabeçalho)
+    assert groups == [(os.path.getsize(copy), images + [copy])]
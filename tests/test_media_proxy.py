@@ -0,0 +1,51 @@
+"""Proxies: dimensões, cache endereçado pelo conteúdo e hashes anotados (digests.json)"""
+
+import json
+import os
+
+import media_proxy
+from conftest import write_png
+from media_proxy import ProxyJob, build_proxies, proxy_dimensions, proxy_path
+
+
+def test_proxy_dimensions_fit_the_box():
+    assert proxy_dimensions(8000, 6000, 1920, 1080, 1.0) == (1440, 1080)
+    assert proxy_dimensions(8000, 6000, 1920, 1080, 0.5) == (720, 540)
+    assert proxy_dimensions(800, 600, 1920, 1080, 2.0) == (800, 600)  # Nunca amplia
+
+
+def test_digest_is_reused_until_the_original_changes(tmp_path, monkeypatch):
+    original = write_png(str(tmp_path / "grande.png"), 8000, 6000)
+    small = write_png(str(tmp_path / "pequena.png"), 640, 480)
+    cache_dir = str(tmp_path / "proxies")
+    hashed = []
+    real_sha256 = media_proxy.file_sha256
+
+    def counting_sha256(path):
+        hashed.append(path)
+        return real_sha256(path)
+
+    monkeypatch.setattr(media_proxy, 'file_sha256', counting_sha256)
+    jobs = [ProxyJob(original, 1920, 1080, 1.0), ProxyJob(small, 1920, 1080, 1.0)]
+
+    first = build_proxies(jobs, cache_dir, max_workers=1)
+    assert first[1].status == 'not_needed'
+    assert hashed == [original]  # Original pequeno nem é lido
+    with open(os.path.join(cache_dir, media_proxy.DIGEST_INDEX), encoding='utf-8') as f:
+        digests = json.load(f)
+    assert digests[os.path.abspath(original)][2] == first[0].sha256
+
+    # Proxy já no cache: nenhum hash recalculado
+    target = proxy_path(cache_dir, first[0].sha256, 1440, 1080, 'png')
+    os.makedirs(os.path.dirname(target))
+    open(target, 'wb').close()
+    second = build_proxies(jobs, cache_dir, max_workers=1)
+    assert (second[0].status, second[0].proxy_path) == ('cached', target)
+    assert hashed == [original]
+
+    # Original trocado (outro mtime): o hash é refeito
+    write_png(original, 9000, 6000)
+    os.utime(original, ns=(0, 10 ** 9))
+    third = build_proxies(jobs, cache_dir, max_workers=1)
+    assert hashed == [original, original]
+    assert third[0].sha256 != first[0].sha256
@@ -0,0 +1,54 @@
+"""Resolução de mídia: só arquivos contam e listagens desatualizadas são refeitas"""
+
+import os
+
+from conftest import write_png
+from media_resolver import MediaResolver, resolve_media
+
+
+def test_found_missing_and_relative(tmp_path, images, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    relative = os.path.join("imgs", os.path.basename(images[0]))
+    result = resolve_media([relative, images[1], images[1], "imgs/nao_existe.png", "nada/x.png"])
+    assert result.found == {relative: images[0], images[1]: images[1]}
+    assert result.missing == ["imgs/nao_existe.png", "nada/x.png"]
+
+
+def test_directories_and_broken_links_are_not_found(tmp_path, images):
+    folder = tmp_path / "imgs"
+    (folder / "pasta.png").mkdir()
+    os.symlink(str(folder / "apagada.png"), str(folder / "quebrado.png"))
+    os.symlink(images[0], str(folder / "link.png"))
+    paths = [str(folder / name) for name in ("pasta.png", "quebrado.png", "link.png")]
+    result = resolve_media(paths)
+    assert list(result.found) == [paths[2]]
+    assert result.missing == paths[:2]
+
+
+def test_listing_is_refreshed_when_directory_mtime_changes(tmp_path, images):
+    folder = str(tmp_path / "imgs")
+    later = os.path.join(folder, "depois.png")
+    resolver = MediaResolver()
+    assert resolver.resolve([images[0], later]).missing == [later]
+
+    write_png(later)
+    os.utime(folder, ns=(0, 10 ** 9))  # Garante um mtime diferente
+    assert resolver.resolve([images[0], later]).missing == []
+
+    os.remove(images[0])
+    os.utime(folder, ns=(0, 2 * 10 ** 9))
+    assert resolver.resolve([images[0], later]).missing == [images[0]]
+
+
+def test_refresh_missing_with_unchanged_mtime(tmp_path, images):
+    folder = str(tmp_path / "imgs")
+    later = os.path.join(folder, "depois.png")
+    mtime = os.stat(folder).st_mtime_ns
+
+    plain, refreshing = MediaResolver(), MediaResolver(refresh_missing=True)
+    plain.resolve([later])
+    refreshing.resolve([later])
+    write_png(later)
+    os.utime(folder, ns=(0, mtime))  # mtime igual ao da listagem em cache
+    assert plain.resolve([later]).missing == [later]
+    assert refreshing.resolve([later]).missing == []
@@ -0,0 +1,60 @@
+"""CLI unificada: subcomandos de ponta a ponta e importações sob demanda"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from openshot_cli import _entrada_merge, main
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _modulos_carregados(codigo):
+    """Módulos do sincronizador importados após rodar `codigo` num interpretador novo"""
+    verificar = ("import sys; print('carregados=' + ','.join(m for m in ("
+                 "'sync_images_openshot', 'numpy', 'sqlite3') if m in sys.modules))")
+    saida = subprocess.run([sys.executable, "-c", codigo + "; " + verificar], cwd=RAIZ,
+                           capture_output=True, text=True, check=True).stdout
+    return saida.splitlines()[-1].partition('carregados=')[2]
+
+
+def test_help_and_stats_do_not_import_the_sync(tmp_path, make_sync, images):
+    sync = make_sync()
+    sync.add_images_batch(images, [0.0, 1.0, 2.0, 3.0, 4.0], 1.0)
+    sync.save_project()
+    assert _modulos_carregados("import openshot_cli; openshot_cli.criar_parser()") == ""
+    stats = f"import openshot_cli; openshot_cli.main(['stats', {sync.project_path!r}])"
+    assert _modulos_carregados(stats) == ""
+
+
+def test_from_csv_then_stats(tmp_path, images, capsys):
+    arquivo_csv = tmp_path / "timestamps.csv"
+    arquivo_csv.write_text("imagem;timestamp\n" + "".join(
+        f"{imagem};{i * 2}\n" for i, imagem in enumerate(images)), encoding='utf-8')
+    projeto = str(tmp_path / "video.osp")
+    assert main(["from-csv", str(arquivo_csv), "-o", projeto, "--modo-saida", "quiet",
+                 "--fps", "30000/1001", "--duracao", "1.5"]) == 0
+    capsys.readouterr()
+
+    assert main(["stats", projeto, "--json"]) == 0
+    dados = json.loads(capsys.readouterr().out)
+    assert (dados['clips'], dados['arquivos'], dados['fps']) == (5, 5, "30000/1001")
+    assert dados['camadas'] == {'2': 5}
+    assert dados['duracao'] == pytest.approx(9.5, abs=0.05)
+
+
+def test_merge_inputs():
+    assert _entrada_merge("parte.osp") == ("parte.osp", 0.0, 0)
+    assert _entrada_merge("a@b.osp@120") == ("a@b.osp", 120.0, 0)
+    assert _entrada_merge("parte.osp@1.5:2") == ("parte.osp", 1.5, 2)
+    with pytest.raises(Exception):
+        _entrada_merge("parte.osp@abc")
+
+
+def test_invalid_fps_is_rejected(capsys):
+    with pytest.raises(SystemExit):
+        main(["interval", "a.png", "--fps", "0"])
+    assert "taxa de quadros inválida" in capsys.readouterr().err
@@ -0,0 +1,113 @@
+import filecmp
+import json
+
+import pytest
+
+import osp_lazy
+from benchmark_sync import bench_carga, criar_imagens_dummy
+from osp_lazy import load_project_lazy
+from sync_images_openshot import OpenShotImageSync
+
+
+@pytest.fixture
+def project(make_sync, images):
+    sync = make_sync()
+    sync.add_images_batch(images * 40, [i * 1.0 for i in range(200)], 1.0)
+    clips = sync.project_data['clips']
+    clips[3]['title'] = 'Çãé "aspas" \\ ü'
+    clips[4]['effects'] = [{'texto': 'x]}{"\\', 'ñ': 'ü'}]
+    clips[5]['profundo'] = [[[[[[[[[[[[[1]]]]]]]]]]]]]
+    clips[6]['números'] = [-1.5e-3, 1e21, None, True]
+    clips[6]['grande'] = 1e21
+    clips[7]['vazio'] = {}
+    sync.save_project()
+    return sync.project_path
+
+
+@pytest.mark.parametrize("chunk", [64, 97, 4096, osp_lazy._CHUNK])
+def test_lazy_load_matches_json(project, chunk, monkeypatch):
+    # Janelas pequenas forçam clips e strings cortados no meio
+    monkeypatch.setattr(osp_lazy, '_CHUNK', chunk)
+    monkeypatch.setattr(osp_lazy, '_CLIP_MARGIN', min(chunk // 4, osp_lazy._CLIP_MARGIN))
+    with open(project, encoding='utf-8') as f:
+        expected = json.load(f)
+    data = load_project_lazy(project)
+    assert [clip.to_dict() for clip in data['clips']] == expected['clips']
+    for clip, reference in zip(data['clips'], expected['clips']):
+        assert list(clip) == list(reference)
+        assert clip['id'] == reference['id']
+        assert clip['position'] == reference['position']
+    assert not any(clip.touched for clip in data['clips'])
+
+
+@pytest.mark.parametrize("dump", [
+    {'indent': 4, 'ensure_ascii': True},
+    {'indent': '\t', 'ensure_ascii': False},
+    {'separators': (',', ':'), 'ensure_ascii': False},
+])
+def test_other_layouts_match_json(project, tmp_path, dump):
+    with open(project, encoding='utf-8') as f:
+        expected = json.load(f)
+    path = tmp_path / "outro.osp"
+    path.write_text(json.dumps(expected, **dump), encoding='utf-8')
+    data = load_project_lazy(str(path))
+    assert [clip.to_dict() for clip in data['clips']] == expected['clips']
+    assert [dict(clip) for clip in data['clips'][:8]] == expected['clips'][:8]
+
+
+def test_irregular_indentation_falls_back(tmp_path):
+    # Fechamentos na mesma linha não delimitam o clip pela indentação
+    path = tmp_path / "irregular.osp"
+    path.write_text('{\n  "clips": [\n    {\n      "id": "a",\n      "x": [1,\n 2]},\n'
+                    '    {\n      "id": "b",\n      "y": 1},\n'
+                    '    {\n      "id": "c",\n      "z": 2\n    }\n  ]\n}')
+    data = load_project_lazy(str(path))
+    assert [dict(clip) for clip in data['clips']] == json.loads(path.read_text())['clips']
+
+
+def test_lazy_load_is_faster_than_json_load(tmp_path):
+    imagens = criar_imagens_dummy(str(tmp_path), 100)
+    t_json, t_lazy = bench_carga(imagens, 10_000, str(tmp_path), repeticoes=5)
+    assert t_lazy < t_json
+
+
+def test_nested_values_are_not_parsed_on_load(project):
+    clip = load_project_lazy(project)['clips'][0]
+    assert clip._header['alpha'] is osp_lazy._NESTED
+    assert not clip.touched
+    assert clip['alpha']['Points'][0]['co']['Y'] == 1
+    assert clip.touched
+
+
+def test_lazy_load_save_is_byte_identical(project, tmp_path):
+    sync = OpenShotImageSync(project, output='quiet')
+    sync.load_project(lazy=True)
+    output = str(tmp_path / "copia.osp")
+    sync.save_project(output)
+    assert filecmp.cmp(project, output, shallow=False)
+
+
+def test_touched_clip_is_reserialized(project, tmp_path):
+    sync = OpenShotImageSync(project, output='quiet')
+    sync.load_project(lazy=True)
+    sync.project_data['clips'][1]['layer'] = 9
+    output = str(tmp_path / "alterado.osp")
+    sync.save_project(output)
+    with open(output, encoding='utf-8') as f:
+        saved = json.load(f)
+    with open(project, encoding='utf-8') as f:
+        original = json.load(f)
+    assert saved['clips'][1]['layer'] == 9
+    assert saved['clips'][2:] == original['clips'][2:]
+
+
+@pytest.mark.parametrize("text", [
+    '{"clips": [{"id": "a",}]}',
+    '{"clips": [{"id": "a", "alpha": {"Points": [1, 2]}',
+    '{"clips": [{"id": "a", "alpha": "sem fim}]}',
+])
+def test_invalid_json_raises(tmp_path, text):
+    path = tmp_path / "ruim.osp"
+    path.write_text(text)
+    with pytest.raises(json.JSONDecodeError):
+        load_project_lazy(str(path))
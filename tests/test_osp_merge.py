@@ -0,0 +1,86 @@
+"""Junção k-way de projetos: cópia idêntica, ordem, ids, arquivos e diário"""
+
+import filecmp
+import json
+import os
+
+from osp_merge import merge_projects
+from project_journal import journal_path
+
+POSITIONS = [0.0, 4.0, 8.0, 12.0, 16.0]
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_single_project_is_copied_byte_for_byte(make_sync, images, tmp_path):
+    sync = make_sync()
+    sync.add_images_batch(images * 4, [i * 1.5 for i in range(20)], 1.5)
+    sync.project_data['clips'][2]['effects'] = [{'texto': 'Çã "x" ]}'}]
+    sync.save_project()
+    output = str(tmp_path / "copia.osp")
+
+    report = merge_projects([sync.project_path], output)
+    assert (report['clips'], report['files'], report['ids_remapped']) == (20, 5, 0)
+    assert filecmp.cmp(sync.project_path, output, shallow=False)
+
+
+def test_projects_are_interleaved_by_position(make_sync, images, tmp_path):
+    first = make_sync("a.osp")
+    first.add_images_batch(images, POSITIONS, 2.0)
+    first.project_data['clips'][1]['alpha'] = {'Points': [{'co': {'X': 1, 'Y': 0.5}}]}
+    first.save_project()
+    second = make_sync("b.osp")
+    second.add_images_batch(images[::-1], POSITIONS, 2.0)
+    second.save_project()
+    output = str(tmp_path / "junto.osp")
+
+    report = merge_projects([first.project_path, (second.project_path, 1.0, 2)], output)
+    clips = _load(output)['clips']
+    assert report['clips'] == len(clips) == 10
+    assert [clip['position'] for clip in clips] == [
+        position + shift for position in POSITIONS for shift in (0.0, 1.0)]
+    original_layers = [clip['layer'] for clip in second.project_data['clips']]
+    assert [clip['layer'] for clip in clips[1::2]] == [layer + 2 for layer in original_layers]
+    assert clips[2]['alpha'] == first.project_data['clips'][1]['alpha']
+
+    # Mesmas imagens: uma entrada de 'files' por imagem, ids de clip únicos
+    merged = _load(output)
+    assert report['files_shared'] == len(images)
+    assert len(merged['files']) == len(images)
+    assert len({clip['id'] for clip in clips}) == len(clips)
+    assert report['ids_remapped'] == len(images)
+    paths = {entry['id']: entry['path'] for entry in merged['files']}
+    assert [os.path.basename(paths[clip['file_id']]) for clip in clips[1::2]] == [
+        os.path.basename(path) for path in images[::-1]]
+
+
+def test_journal_of_inputs_is_replayed(make_sync, images, tmp_path):
+    sync = make_sync()
+    sync.add_images_batch(images[:3], POSITIONS[:3], 2.0)
+    sync.save_project()
+    sync.add_images_batch(images[3:], [1.0, 20.0], 2.0)
+    sync.save_project(journal=True)
+    assert os.path.exists(journal_path(sync.project_path))
+    output = str(tmp_path / "junto.osp")
+
+    report = merge_projects([sync.project_path], output)
+    clips = _load(output)['clips']
+    assert report['clips'] == len(clips) == 5
+    assert [clip['position'] for clip in clips] == [0.0, 1.0, 4.0, 8.0, 20.0]
+    assert not os.path.exists(journal_path(output))
+
+
+def test_merge_into_an_input_drops_its_journal(make_sync, images):
+    sync = make_sync()
+    sync.add_images_batch(images[:2], POSITIONS[:2], 2.0)
+    sync.save_project()
+    sync.add_images_batch(images[2:], POSITIONS[2:], 2.0)
+    sync.save_project(journal=True)
+
+    sync.merge_projects([sync.project_path])
+    assert not os.path.exists(journal_path(sync.project_path))
+    assert [clip['position'] for clip in _load(sync.project_path)['clips']] == POSITIONS
+    assert len(sync.project_data['clips']) == len(POSITIONS)
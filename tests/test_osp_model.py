@@ -0,0 +1,74 @@
+"""Clip/MediaFile compactos: ida e volta pelo dicionário e materialização"""
+
+import json
+
+import pytest
+
+from osp_model import Clip, MediaFile, static_curve
+
+
+def _openshot_clip(**extra):
+    clip = Clip("clip_1", "file_1", 2.5, 3.0, 2, 0.1, 0.2, 0.5, 0.5).to_dict()
+    clip.update(extra)
+    return clip
+
+
+@pytest.mark.parametrize("data", [
+    _openshot_clip(),
+    _openshot_clip(alpha={'Points': [{'co': {'X': 1, 'Y': 0.0}, 'interpolation': 0},
+                                     {'co': {'X': 30, 'Y': 1.0}, 'interpolation': 1}]}),
+    _openshot_clip(scale_x={'Points': [{'co': {'X': 1, 'Y': 1}, 'interpolation': 2}]}),
+    _openshot_clip(layer=None, title="Çã", effects=[], reader={'path': "a.png"}),
+    dict(reversed(list(_openshot_clip().items()))),
+])
+def test_from_dict_round_trip(data):
+    clip = Clip.from_dict(json.loads(json.dumps(data)))
+    assert json.dumps(clip.to_dict()) == json.dumps(data)
+    assert list(clip) == list(data)
+    assert clip == data
+    assert not clip.materialized
+
+
+def test_static_curves_are_stored_as_numbers():
+    clip = Clip.from_dict(_openshot_clip())
+    assert clip.scale_x == 0.5
+    clip['alpha'] = static_curve(0.25)
+    assert clip.alpha == 0.25 and not clip.materialized
+    assert clip.to_dict()['alpha'] == static_curve(0.25)
+    assert not hasattr(clip, '__dict__')
+
+    # Pelo dicionário, a curva é devolvida no formato do OpenShot (editável)
+    clip['scale_x']['Points'][0]['co']['Y'] = 2.0
+    assert clip.materialized and clip.to_dict()['scale_x'] == static_curve(2.0)
+
+
+def test_nested_access_materializes_a_private_copy():
+    effects = [{'type': "Blur", 'sigma': 2}]
+    first = Clip.from_dict(_openshot_clip(effects=effects))
+    second = Clip.from_dict(_openshot_clip(effects=effects))
+    assert first._extra['effects'] is second._extra['effects']  # Compartilhado
+
+    first['effects'][0]['sigma'] = 9
+    assert first.materialized
+    assert second['effects'][0]['sigma'] == 2
+    animated = {'Points': [{'co': {'X': 1, 'Y': 0}}, {'co': {'X': 9, 'Y': 1}}]}
+    second['alpha'] = animated
+    assert second.materialized and second['alpha'] == animated
+
+
+def test_simple_keys_stay_unmaterialized():
+    clip = Clip("clip_1", "file_1", 0.0, 2.0)
+    clip['title'] = "abc"
+    clip['position'] = 4.0
+    assert not clip.materialized
+    assert list(clip)[-1] == 'title' and clip.position == 4.0
+    del clip['title']
+    assert 'title' not in clip and clip.materialized
+
+
+def test_media_file_keys():
+    assert list(MediaFile("file_1", "/a.png")) == ['id', 'path', 'media_type']
+    sized = MediaFile("file_2", "/b.png", width=640, height=480)
+    assert sized.to_dict() == {'id': "file_2", 'path': "/b.png", 'media_type': "image",
+                               'width': 640, 'height': 480}
+    assert MediaFile.from_dict(sized.to_dict()) == sized
@@ -0,0 +1,78 @@
+"""Gravação em fluxo: mesmo texto do json.dump, modo compacto e troca atômica"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from osp_writer import StreamedItems, write_project
+
+
+@pytest.fixture
+def project_data():
+    return {
+        'id': "T0", 'fps': {'num': 30000, 'den': 1001}, 'files': [],
+        'clips': [{'id': f"clip_{i}", 'position': i * 0.5, 'title': 'Çã "x"',
+                   'alpha': {'Points': [{'co': {'X': 1, 'Y': 1.0}}]}} for i in range(50)],
+        'effects': [], 'layers': [{'number': 1, 'label': ""}], 'vazio': {},
+    }
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_output_matches_json_dump(project_data, tmp_path):
+    output = str(tmp_path / "projeto.osp")
+    written = write_project(project_data, output)
+    assert _read(output) == json.dumps(project_data, indent=2, ensure_ascii=False)
+    assert written == os.path.getsize(output)
+
+
+def test_compact_output(project_data, tmp_path):
+    output = str(tmp_path / "projeto.osp")
+    write_project(project_data, output, compact=True)
+    assert _read(output) == json.dumps(project_data, ensure_ascii=False, separators=(',', ':'))
+
+
+def test_streamed_items_are_consumed_once(project_data, tmp_path):
+    clips = project_data['clips']
+    output = str(tmp_path / "projeto.osp")
+    write_project(dict(project_data, clips=StreamedItems(iter(clips), len(clips))), output)
+    assert _read(output) == json.dumps(project_data, indent=2, ensure_ascii=False)
+
+
+def test_failed_write_keeps_previous_file(project_data, tmp_path):
+    output = str(tmp_path / "projeto.osp")
+    write_project(project_data, output)
+    os.chmod(output, 0o640)
+    before = _read(output)
+
+    project_data['clips'].append({'id': "ruim", 'valor': object()})
+    with pytest.raises(TypeError):
+        write_project(project_data, output)
+    assert _read(output) == before
+    assert os.listdir(tmp_path) == ["projeto.osp"]  # Sem temporários esquecidos
+
+    project_data['clips'].pop()
+    write_project(project_data, output, compact=True)
+    assert os.stat(output).st_mode & 0o777 == 0o640
+
+
+def test_new_file_follows_umask_without_changing_it(project_data, tmp_path):
+    # Importa e grava num processo com umask 027 e os.umask bloqueado
+    output = str(tmp_path / "novo.osp")
+    code = (
+        "import json, os, sys\n"
+        "os.umask(0o027)\n"
+        "def no_umask(mask): raise AssertionError('umask alterada')\n"
+        "os.umask = no_umask\n"
+        "import osp_writer\n"
+        "osp_writer.write_project(json.loads(sys.argv[2]), sys.argv[1])\n"
+    )
+    subprocess.run([sys.executable, "-c", code, output, json.dumps(project_data)],
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True)
+    assert os.stat(output).st_mode & 0o777 == 0o640
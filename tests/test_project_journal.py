@@ -0,0 +1,86 @@
+"""Diário de alterações: checkpoints, reaplicação ao carregar e consolidação"""
+
+import json
+import os
+
+import pytest
+
+from project_journal import append_journal, journal_path, replay_journal
+from sync_images_openshot import OpenShotImageSync
+
+
+def _state(clips):
+    return [(clip['id'], clip['position'], clip['layer']) for clip in clips]
+
+
+@pytest.mark.parametrize("backend", ["records", "table"])
+def test_checkpoints_replay_to_the_saved_state(make_sync, images, backend):
+    sync = make_sync(backend=backend)
+    sync.add_images_batch(images, [0.0, 2.0, 4.0, 6.0, 8.0], 2.0)
+    sync.save_project()
+    with open(sync.project_path, 'rb') as f:
+        base = f.read()
+
+    sync.add_images_batch(images[:2], [10.0, 12.0], 2.0)
+    clips = sync.project_data['clips']
+    clips[1]['position'] = 30.0
+    sync.mark_clip_changed(clips[1])
+    sync.remove_clips([clips[3]])
+    assert sync.save_project(journal=True)
+    sync.add_images_batch(images[2:3], [14.0], 2.0)
+    assert sync.save_project(journal=True)
+
+    with open(sync.project_path, 'rb') as f:
+        assert f.read() == base  # O .osp não é reescrito nos checkpoints
+    expected = _state(sync.project_data['clips'])
+    for lazy in (False, True):
+        loaded = OpenShotImageSync(sync.project_path, output='quiet', backend=backend)
+        assert loaded.load_project(lazy=lazy)
+        assert _state(loaded.project_data['clips']) == expected
+
+
+def test_removed_id_added_again_stays(tmp_path):
+    project = str(tmp_path / "projeto.osp")
+    clip = {'id': "clip_1", 'layer': 1, 'position': 0.0}
+    append_journal(project, [], [], removed_clips=["clip_1"])
+    append_journal(project, [dict(clip, position=5.0)], [], removed_clips=["clip_1"])
+    data = {'clips': [clip], 'files': []}
+    assert replay_journal(data, project) == 3
+    assert data['clips'] == [dict(clip, position=5.0)]
+
+
+def test_incomplete_last_line_is_ignored(tmp_path):
+    project = str(tmp_path / "projeto.osp")
+    append_journal(project, [{'id': "clip_1", 'position': 1.0}], [{'id': "F1", 'path': "a.png"}])
+    with open(journal_path(project), 'a', encoding='utf-8') as f:
+        f.write('{"clip":{"id":"clip_2","posi')
+    data = {'clips': [], 'files': []}
+    assert replay_journal(data, project) == 2
+    assert [clip['id'] for clip in data['clips']] == ["clip_1"]
+    assert [entry['id'] for entry in data['files']] == ["F1"]
+
+    with open(journal_path(project), 'a', encoding='utf-8') as f:
+        f.write('\n')  # Linha corrompida no meio do diário
+    with pytest.raises(json.JSONDecodeError):
+        replay_journal({'clips': [], 'files': []}, project)
+
+
+def test_large_journal_is_folded_into_the_project(make_sync, images):
+    sync = make_sync()
+    sync.add_images_batch(images, [0.0, 2.0, 4.0, 6.0, 8.0], 2.0)
+    sync.save_project()
+    sync.journal_max_bytes = 1
+    sync.add_images_batch(images[:1], [10.0], 2.0)
+    assert sync.save_project(journal=True)
+    assert not os.path.exists(journal_path(sync.project_path))
+    with open(sync.project_path, encoding='utf-8') as f:
+        assert len(json.load(f)['clips']) == 6
+
+
+def test_new_project_is_saved_in_full_before_journaling(make_sync, images):
+    sync = make_sync()
+    sync.add_images_batch(images, [0.0, 2.0, 4.0, 6.0, 8.0], 2.0)
+    assert sync.save_project(journal=True)
+    assert not os.path.exists(journal_path(sync.project_path))
+    with open(sync.project_path, encoding='utf-8') as f:
+        assert len(json.load(f)['clips']) == 5
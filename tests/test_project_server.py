@@ -0,0 +1,124 @@
+"""Servidor de projetos: add-clips em thread, consultas sob o lock e cache de mídia"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+from conftest import write_png
+from project_server import ProjectServer
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_add_query_save(tmp_path, images):
+    project = str(tmp_path / "servidor.osp")
+
+    async def scenario():
+        server = ProjectServer(debounce=60)
+        opened = await server.execute({'cmd': 'open', 'project': project, 'create': True})
+        added = await server.execute({'id': 1, 'cmd': 'add-clips', 'project': project, 'clips': [
+            {'image': images[0], 'position': 0.0, 'duration': 2.0},
+            {'image': images[1], 'position': 5.0, 'duration': 2.0},
+            {'image': str(tmp_path / "nao_existe.png"), 'position': 1.0},
+        ]})
+        query = await server.execute({'cmd': 'query-range', 'project': project,
+                                      't0': 4.0, 't1': 6.0})
+        saved = await server.execute({'cmd': 'save', 'project': project})
+        return opened, added, query, saved
+
+    opened, added, query, saved = _run(scenario())
+    assert opened == {'ok': True, 'clips': 0, 'loaded': True}
+    assert added == {'id': 1, 'ok': True, 'added': 2, 'skipped': 1}
+    assert [clip['position'] for clip in query['clips']] == [5.0]
+    assert saved['ok'] and saved['bytes_written'] == os.path.getsize(project)
+
+
+def test_missing_image_created_later_is_found(tmp_path, images):
+    project = str(tmp_path / "servidor.osp")
+    later = str(tmp_path / "imgs" / "depois.png")
+
+    async def scenario():
+        server = ProjectServer(debounce=60)
+        await server.execute({'cmd': 'open', 'project': project, 'create': True})
+        request = {'cmd': 'add-clips', 'project': project,
+                   'clips': [{'image': images[0], 'position': 0.0},
+                             {'image': later, 'position': 3.0}]}
+        first = await server.execute(request)
+        write_png(later)
+        second = await server.execute(request)
+        return first, second
+
+    first, second = _run(scenario())
+    assert (first['added'], first['skipped']) == (1, 1)
+    assert (second['added'], second['skipped']) == (2, 0)
+
+
+def test_batch_runs_off_the_event_loop(tmp_path, images):
+    """Um lote lento não impede o servidor de responder; a consulta espera o lote"""
+    project = str(tmp_path / "servidor.osp")
+    started = threading.Event()
+
+    async def scenario():
+        server = ProjectServer(debounce=60)
+        await server.execute({'cmd': 'open', 'project': project, 'create': True})
+        sync = next(iter(server.projects.values())).sync
+        original = sync.add_images_batch
+
+        def slow_batch(*args, **kwargs):
+            started.set()
+            time.sleep(0.3)
+            return original(*args, **kwargs)
+
+        sync.add_images_batch = slow_batch
+        add = asyncio.ensure_future(server.execute({
+            'cmd': 'add-clips', 'project': project,
+            'clips': [{'image': path, 'position': float(i)} for i, path in enumerate(images)]}))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        ping = await asyncio.wait_for(server.execute({'cmd': 'ping'}), 0.2)
+        query = await server.execute({'cmd': 'query-range', 'project': project,
+                                      't0': 0.0, 't1': 100.0})
+        return ping, query, await add
+
+    ping, query, add = _run(scenario())
+    assert ping == {'ok': True}
+    assert add['added'] == len(images)
+    assert len(query['clips']) == len(images)
+
+
+def test_close_waits_for_batch_and_rejects_later_ones(tmp_path, images):
+    """O close grava o lote em andamento; um lote que chega depois não se perde calado"""
+    project = str(tmp_path / "servidor.osp")
+    started = threading.Event()
+
+    async def scenario():
+        server = ProjectServer(debounce=60)
+        await server.execute({'cmd': 'open', 'project': project, 'create': True})
+        sync = next(iter(server.projects.values())).sync
+        original = sync.add_images_batch
+
+        def slow_batch(*args, **kwargs):
+            started.set()
+            time.sleep(0.2)
+            return original(*args, **kwargs)
+
+        sync.add_images_batch = slow_batch
+        request = {'cmd': 'add-clips', 'project': project,
+                   'clips': [{'image': path, 'position': float(i)} for i, path in enumerate(images)]}
+        add = asyncio.ensure_future(server.execute(request))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        close = asyncio.ensure_future(server.execute({'cmd': 'close', 'project': project}))
+        late = asyncio.ensure_future(server.execute(request))
+        return await add, await close, await late, server.projects
+
+    add, close, late, projects = _run(scenario())
+    assert add['added'] == len(images) and close == {'ok': True}
+    assert not late['ok'] and "não aberto" in late['error']
+    assert projects == {}
+    with open(project, encoding='utf-8') as f:
+        assert len(json.load(f)['clips']) == len(images)
@@ -0,0 +1,59 @@
+"""Leitura do CSV em fluxo: números de linha, delimitadores e blocos"""
+
+from itertools import count
+
+import pytest
+
+from sync_from_csv import adicionar_em_blocos, em_blocos, iterar_timestamps_csv
+
+CSV = """# comentário
+imagem;timestamp;duracao
+
+a.png;0;2
+b.png;abc;2
+c.png;3
+d.png;-1;2
+e.png;4;2.5
+f.png;nan;2
+g.png;5;inf
+"""
+
+
+@pytest.fixture
+def csv_ponto_e_virgula(tmp_path):
+    caminho = tmp_path / "timestamps.csv"
+    caminho.write_text(CSV, encoding='utf-8')
+    return str(caminho)
+
+
+def test_linhas_validas_e_avisos_com_a_linha_real(csv_ponto_e_virgula, capsys):
+    linhas = list(iterar_timestamps_csv(csv_ponto_e_virgula, duracao_padrao=1.0))
+    assert linhas == [("a.png", 0.0, 2.0), ("c.png", 3.0, 1.0), ("e.png", 4.0, 2.5)]
+    avisos = capsys.readouterr().out.splitlines()
+    assert avisos[0].startswith("⚠️  Erro na linha 5:")
+    assert avisos[1:] == [f"⚠️  Linha {n} ignorada: timestamp ou duração inválidos"
+                          for n in (7, 9, 10)]
+
+
+def test_delimitador_informado(tmp_path):
+    caminho = tmp_path / "tab.csv"
+    caminho.write_text("a.png\t1\t2\nb, c.png\t2\t3\n", encoding='utf-8')
+    assert list(iterar_timestamps_csv(str(caminho), delimitador="\t")) == [
+        ("a.png", 1.0, 2.0), ("b, c.png", 2.0, 3.0)]
+
+
+def test_blocos_consomem_o_iteravel_sob_demanda():
+    blocos = em_blocos(count(), 3)
+    assert next(blocos) == [0, 1, 2]
+    assert next(blocos) == [3, 4, 5]
+    assert list(em_blocos(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_adicionar_em_blocos_equivale_a_um_lote(make_sync, images):
+    timestamps = [(imagem, i * 2.0, 2.0) for i, imagem in enumerate(images * 3)]
+    em_partes = make_sync("partes.osp")
+    assert adicionar_em_blocos(em_partes, iter(timestamps), 2, tamanho_bloco=4) == (15, 15)
+    inteiro = make_sync("inteiro.osp")
+    assert adicionar_em_blocos(inteiro, timestamps, 2) == (15, 15)
+    assert ([clip.to_dict() for clip in em_partes.project_data['clips']]
+            == [clip.to_dict() for clip in inteiro.project_data['clips']])
@@ -0,0 +1,118 @@
+"""OpenShotImageSync: registro de mídia, lotes de imagens, camadas automáticas e reconciliação"""
+
+import json
+import os
+
+import pytest
+
+from sync_images_openshot import OpenShotImageSync
+
+
+def test_same_image_reuses_one_file_entry(make_sync, images, tmp_path, monkeypatch):
+    sync = make_sync()
+    monkeypatch.chdir(tmp_path)
+    relative = os.path.join("imgs", os.path.basename(images[0]))
+    assert sync.add_image_at_timestamp(images[0], 0.0)
+    assert sync.add_image_at_timestamp(relative, 2.0)
+    sync.add_multiple_images([(images[0], 4.0, 2.0), (relative, 6.0, 2.0), (images[1], 8.0, 2.0)])
+    files = sync.project_data['files']
+    assert [entry['path'] for entry in files] == images[:2]
+    assert sync.media_reused == 3
+    assert {clip['file_id'] for clip in list(sync.project_data['clips'])[:4]} == {files[0]['id']}
+
+    # O registro é refeito ao carregar: nada de entradas novas para as mesmas imagens
+    sync.save_project()
+    loaded = OpenShotImageSync(sync.project_path, output='quiet')
+    loaded.load_project()
+    loaded.add_images_at_interval(images, 10.0, 1.0)
+    assert len(loaded.project_data['files']) == len(images)
+    assert len({entry['id'] for entry in loaded.project_data['files']}) == len(images)
+
+
+def _saved_clips(sync):
+    sync.save_project()
+    with open(sync.project_path, encoding='utf-8') as f:
+        return json.load(f)['clips']
+
+
+@pytest.mark.parametrize("backend", ["records", "table"])
+def test_batch_matches_one_by_one_adds(make_sync, images, backend):
+    rows = [(path, i * 1.5, 1.0 + i, 1 + i % 2, 0.1 * i, 0.2, 1.0, 0.5)
+            for i, path in enumerate(images)]
+    single = make_sync("um_a_um.osp", backend=backend)
+    for path, *values in rows:
+        assert single.add_image_at_timestamp(path, *values)
+    batch = make_sync("lote.osp", backend=backend)
+    assert batch.add_images_batch(*zip(*rows)) == len(images)
+    assert _saved_clips(batch) == _saved_clips(single)
+
+
+def test_batch_skips_invalid_rows_and_missing_images(make_sync, images, tmp_path):
+    sync = make_sync()
+    paths = images + [str(tmp_path / "nao_existe.png")] + images[:3]
+    positions = [0.0, 1.0, -1.0, 3.0, float('nan'), 5.0, 6.0, 7.0, 8.0]
+    durations = [2.0, 2.0, 2.0, 0.0, 2.0, 2.0, 2.0, 2.0, float('inf')]
+    assert sync.add_images_batch(paths, positions, durations) == 4
+    assert [clip['position'] for clip in sync.project_data['clips']] == [0.0, 1.0, 6.0, 7.0]
+    counters = sync.instrumentation.counters
+    assert (counters['rows_invalid'], counters['media_missing']) == (4, 1)
+
+
+def test_batch_rejects_columns_of_wrong_length(make_sync, images):
+    sync = make_sync()
+    with pytest.raises(ValueError, match="durations"):
+        sync.add_images_batch(images, [0.0] * len(images), [1.0, 2.0])
+    assert len(sync.project_data['clips']) == 0
+
+
+@pytest.mark.parametrize("backend", ["records", "table"])
+def test_auto_layers_avoid_existing_clips(make_sync, images, backend):
+    sync = make_sync(backend=backend)
+    # Clips já no projeto, nas camadas 1 e 2 da faixa
+    sync.add_images_batch(images[:2], [0.0, 2.0], 6.0, [1, 2])
+    assert sync.overlaps() == []
+
+    added = sync.add_images_batch(images[2:], [1.0, 4.0, 9.0], 3.0, layers="auto")
+    assert added == 3
+    assert sync.overlaps() == []
+    new_layers = [clip['layer'] for clip in list(sync.project_data['clips'])[2:]]
+    # [1, 4) e [4, 7) cruzam os clips das camadas 1 ([0, 6)) e 2 ([2, 8));
+    # [9, 12) já cabe na camada 1
+    assert new_layers == [3, 3, 1]
+
+
+def test_auto_layers_report_overflow_in_full_band(make_sync, images):
+    sync = make_sync()
+    sync.add_images_batch(images[:1], [0.0], 10.0, 1)
+    sync.add_images_batch(images[1:2], [2.0], 2.0, layers="auto", layer_band=(1, 1))
+    assert sync.layer_allocation['overflow'] == 1
+
+
+@pytest.mark.parametrize("backend", ["records", "table"])
+def test_reconcile_applies_only_the_diff(make_sync, images, backend):
+    rows = [(path, i * 2.0, 2.0) for i, path in enumerate(images)]
+    sync = make_sync(backend=backend)
+    sync.add_images_batch(images[:1], [0.0], 5.0, 7)  # Outra camada: não é tocada
+    first = sync.reconcile_images(rows, layer=2)
+    assert first['added'] == len(images)
+    sync.save_project()
+    ids = {clip['position']: clip['id'] for clip in sync.project_data['clips']
+           if clip['layer'] == 2}
+
+    again = OpenShotImageSync(sync.project_path, output='quiet', backend=backend)
+    again.load_project(lazy=True)
+    assert again.reconcile_images(iter(rows), layer=2) == {
+        'unchanged': 5, 'added': 0, 'removed': 0, 'moved': 0, 'retimed': 0}
+    assert not again._dirty_clips and not again._removed_clips
+
+    edited = [rows[0], (rows[1][0], 2.0, 3.5), (rows[2][0], 20.0, 2.0), rows[3],
+              (images[0], 30.0, 1.0)]
+    report = again.reconcile_images(edited, layer=2)
+    assert report == {'unchanged': 2, 'added': 1, 'removed': 1, 'moved': 1, 'retimed': 1}
+    layer = sorted((clip['position'], clip['end'] - clip['start'], clip['id'])
+                   for clip in again.project_data['clips'] if clip['layer'] == 2)
+    assert [(position, duration) for position, duration, _ in layer] == [
+        (0.0, 2.0), (2.0, 3.5), (6.0, 2.0), (20.0, 2.0), (30.0, 1.0)]
+    # Clips mantidos conservam o id; o movido também
+    assert [clip_id for _, _, clip_id in layer[:4]] == [ids[0.0], ids[2.0], ids[6.0], ids[4.0]]
+    assert sum(clip['layer'] == 7 for clip in again.project_data['clips']) == 1
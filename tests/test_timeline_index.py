@@ -0,0 +1,196 @@
+"""Distribuição de camadas (linha de varredura) e índice de intervalos da timeline"""
+
+import random
+
+import pytest
+
+from frame_rate import FrameRate
+from timeline_index import IntervalTree, TimelineIndex, allocate_layers, clip_interval
+
+
+def _collisions(starts, ends, layers):
+    """Pares (i, j) de itens da mesma camada que se sobrepõem (força bruta)"""
+    n = len(starts)
+    return [(i, j) for i in range(n) for j in range(i + 1, n)
+            if layers[i] == layers[j] and starts[i] < ends[j] and starts[j] < ends[i]]
+
+
+def _random_clips(rng, n, layers=(1, 2, 3)):
+    return [{'id': f"clip_{i}", 'layer': rng.choice(layers), 'position': rng.uniform(0, 100),
+             'start': 0, 'end': rng.uniform(0.5, 10)} for i in range(n)]
+
+
+def _brute_query(clips, t0, t1, closed=False):
+    found = []
+    for clip in clips:
+        start, end = clip_interval(clip)
+        if end > t0 and (start <= t1 if closed else start < t1):
+            found.append(clip)
+    return found
+
+
+def _ids(clips):
+    return sorted(clip['id'] for clip in clips)
+
+
+def test_tree_queries_match_brute_force_through_adds_and_removes():
+    rng = random.Random(3)
+    clips = _random_clips(rng, 600)
+    tree = IntervalTree()
+    tree.build(clips[:300])
+    for clip in clips[300:]:
+        tree.add(clip)
+    for clip in clips[::4]:
+        assert tree.remove(clip)
+    assert not tree.remove(clips[0])
+    live = [clip for i, clip in enumerate(clips) if i % 4]
+    assert len(tree) == len(live)
+    assert [node.start for node in tree] == sorted(clip['position'] for clip in live)
+
+    for _ in range(200):
+        t0 = rng.uniform(-5, 110)
+        t1 = t0 + rng.choice([0.0, 1.0, 20.0])
+        found = list(tree.query(t0, t1))
+        assert _ids(found) == _ids(_brute_query(live, t0, t1))
+        assert [clip['position'] for clip in found] == sorted(clip['position'] for clip in found)
+        assert _ids(tree.query(t0, t0, closed=True)) == _ids(_brute_query(live, t0, t0, True))
+
+
+def test_query_bounds_are_half_open():
+    tree = IntervalTree()
+    clip = {'position': 2.0, 'start': 1.0, 'end': 4.0, 'layer': 1}  # [2, 5)
+    tree.add(clip)
+    assert list(tree.query(5.0, 6.0)) == []
+    assert list(tree.query(0.0, 2.0)) == []
+    assert list(tree.query(0.0, 2.0, closed=True)) == [clip]
+    assert list(tree.query(4.9, 4.9, closed=True)) == [clip]
+
+
+def test_index_matches_brute_force_per_layer():
+    rng = random.Random(9)
+    clips = _random_clips(rng, 500)
+    index = TimelineIndex()
+    index.rebuild(clips)
+    extra = _random_clips(random.Random(10), 20, layers=(2, 5))
+    for i, clip in enumerate(extra):
+        clip['id'] = f"extra_{i}"
+        index.add(clip)  # Poucos pendentes: inseridos um a um
+    clips += extra
+    moved = clips[7]
+    moved['layer'] = 9  # Camada alterada sem avisar o índice
+    assert index.remove(moved)
+    clips.remove(moved)
+    assert len(index) == len(clips)
+    assert index.layers == sorted({clip['layer'] for clip in clips})
+
+    for _ in range(100):
+        t0 = rng.uniform(-5, 110)
+        t1 = t0 + rng.choice([0.5, 10.0])
+        for layer in (None, 1, 2, 5, 7):
+            subset = [clip for clip in clips if layer is None or clip['layer'] == layer]
+            assert _ids(index.clips_in(t0, t1, layer)) == _ids(_brute_query(subset, t0, t1))
+            assert _ids(index.clips_at(t0, layer)) == _ids(_brute_query(subset, t0, t0, True))
+
+
+def test_overlaps_match_brute_force():
+    rng = random.Random(4)
+    clips = _random_clips(rng, 300)
+    index = TimelineIndex()
+    index.rebuild(clips)
+    starts = [clip_interval(clip)[0] for clip in clips]
+    ends = [clip_interval(clip)[1] for clip in clips]
+    expected = {frozenset((clips[i]['id'], clips[j]['id']))
+                for i, j in _collisions(starts, ends, [clip['layer'] for clip in clips])}
+    pairs = index.overlaps()
+    assert len(pairs) == len(expected)
+    assert {frozenset((a['id'], b['id'])) for a, b in pairs} == expected
+    assert all(a['layer'] == 2 for pair in index.overlaps(2) for a in pair)
+
+
+def test_overlaps_in_frames_ignore_rounding_error():
+    index = TimelineIndex()
+    index.rebuild([{'id': "a", 'layer': 1, 'position': 0.0, 'start': 0, 'end': 0.1 + 0.2},
+                   {'id': "b", 'layer': 1, 'position': 0.3, 'start': 0, 'end': 1.0}])
+    assert len(index.overlaps()) == 1
+    assert index.overlaps(rate=FrameRate(30)) == []
+
+
+def test_allocate_reuses_layer_of_adjacent_items():
+    layers, report = allocate_layers([0.0, 2.0, 4.0], [2.0, 2.0, 2.0])
+    assert layers == [1, 1, 1]
+    assert report == {'max_concurrency': 1, 'layers_used': 1, 'overflow': 0, 'conflicts': 0}
+
+
+def test_allocate_random_has_no_collisions_and_minimal_layers():
+    rng = random.Random(7)
+    positions = [rng.uniform(0, 100) for _ in range(2000)]
+    durations = [rng.uniform(0.5, 10) for _ in range(2000)]
+    layers, report = allocate_layers(positions, durations, first_layer=3)
+    ends = [p + d for p, d in zip(positions, durations)]
+    assert not _collisions(positions, ends, layers)
+    assert min(layers) == 3
+    # A varredura gulosa por início usa exatamente o máximo de simultâneos
+    assert report['layers_used'] == report['max_concurrency']
+    assert report['overflow'] == 0
+
+
+def test_allocate_overflow_when_band_is_full():
+    layers, report = allocate_layers([0.0, 0.0, 0.0], [5.0, 3.0, 4.0], 1, 2)
+    assert sorted(layers[:2]) == [1, 2]
+    assert report['overflow'] == 1
+    assert layers[2] == layers[1]  # Camada do item ativo que termina primeiro
+
+
+def test_allocate_empty_band_raises():
+    with pytest.raises(ValueError):
+        allocate_layers([0.0], [1.0], 5, 4)
+
+
+def test_allocate_respects_reservations():
+    # Camada 1 ocupada em [3, 6): o item [0, 4) não cabe nela, o [0, 3) cabe
+    layers, report = allocate_layers([0.0, 6.0, 0.0], [4.0, 1.0, 3.0],
+                                     occupied=[(3.0, 6.0, 1)])
+    assert layers == [2, 1, 1]
+    assert report['overflow'] == 0
+
+
+def test_allocate_counts_only_assigned_layers():
+    # A camada 1 é pulada por causa da reserva: só a 2 recebe o item
+    layers, report = allocate_layers([0.0], [1.0], occupied=[(0.0, 2.0, 1)])
+    assert layers == [2]
+    assert report['layers_used'] == 1
+
+
+def test_allocate_overflow_avoids_reserved_layers():
+    # A termina primeiro, mas a camada dele (1) está reservada durante C
+    layers, report = allocate_layers([0.0, 0.0, 0.5], [1.0, 5.0, 2.5], 1, 2,
+                                     occupied=[(1.5, 10.0, 1)])
+    assert layers == [1, 2, 2]
+    assert (report['overflow'], report['conflicts']) == (1, 0)
+
+
+def test_allocate_reports_hard_conflict_when_band_is_reserved():
+    layers, report = allocate_layers([0.0], [1.0], 1, 2,
+                                     occupied=[(0.0, 5.0, 1), (0.0, 3.0, 2)])
+    assert layers == [2]  # A reserva que termina primeiro
+    assert (report['overflow'], report['conflicts']) == (1, 1)
+
+
+def test_allocate_random_with_reservations_has_no_collisions():
+    rng = random.Random(11)
+    occupied = []
+    for layer in (1, 2, 4):
+        t = 0.0
+        for _ in range(30):
+            t += rng.uniform(0, 4)
+            length = rng.uniform(0.5, 3)
+            occupied.append((t, t + length, layer))
+            t += length
+    positions = [rng.uniform(0, 100) for _ in range(500)]
+    durations = [rng.uniform(0.5, 6) for _ in range(500)]
+    layers, report = allocate_layers(positions, durations, occupied=occupied)
+    assert report['overflow'] == 0
+
+    starts = positions + [start for start, _, _ in occupied]
+    ends = [p + d for p, d in zip(positions, durations)] + [end for _, end, _ in occupied]
+    assert not _collisions(starts, ends, layers + [layer for _, _, layer in occupied])
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Índice de intervalos da timeline do OpenShot
+Permite consultar quais clips estão visíveis em um instante ou intervalo
+sem percorrer toda a lista de clips
+"""
+
+import heapq
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from frame_rate import FrameRate
+
+
+def clip_interval(clip: Dict) -> Tuple[float, float]:
+    """Retorna o intervalo [início, fim) ocupado pelo clip na timeline"""
+    position = clip['position']
+    return position, position + clip['end'] - clip.get('start', 0)
+
+
+class _Node:
+    """Nó de uma treap ordenada por (início, seq) e aumentada com o maior fim"""
+
+    __slots__ = ('start', 'end', 'seq', 'clip', 'priority', 'left', 'right', 'max_end')
+
+    def __init__(self, start: float, end: float, seq: int, clip: Dict):
+        self.start = start
+        self.end = end
+        self.seq = seq
+        self.clip = clip
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = end
+
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _insert(root: Optional[_Node], node: _Node) -> _Node:
+    if root is None:
+        return node
+    if node.priority > root.priority:
+        node.left, node.right = _split(root, (node.start, node.seq))
+        node.update()
+        return node
+    if (node.start, node.seq) < (root.start, root.seq):
+        root.left = _insert(root.left, node)
+    else:
+        root.right = _insert(root.right, node)
+    root.update()
+    return root
+
+
+def _split(root: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Divide a treap em (chaves < key, chaves >= key)"""
+    if root is None:
+        return None, None
+    if (root.start, root.seq) < key:
+        left, right = _split(root.right, key)
+        root.right = left
+        root.update()
+        return root, right
+    left, right = _split(root.left, key)
+    root.left = right
+    root.update()
+    return left, root
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _remove(root: Optional[_Node], node: _Node) -> Optional[_Node]:
+    if root is None:
+        return None
+    if root is node:
+        return _merge(root.left, root.right)
+    if (node.start, node.seq) < (root.start, root.seq):
+        root.left = _remove(root.left, node)
+    else:
+        root.right = _remove(root.right, node)
+    root.update()
+    return root
+
+
+def _build(nodes: List[_Node]) -> Optional[_Node]:
+    """Monta a treap em O(n) a partir de nós já ordenados por (início, seq)"""
+    stack: List[_Node] = []
+    for node in nodes:
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+    if not stack:
+        return None
+    _update_all(stack[0])
+    return stack[0]
+
+
+def _update_all(root: _Node):
+    """Recalcula max_end de toda a árvore (pós-ordem iterativa)"""
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if node.left is not None:
+            stack.append(node.left)
+        if node.right is not None:
+            stack.append(node.right)
+    for node in reversed(order):
+        node.update()
+
+
+class IntervalTree:
+    """
+    Árvore de intervalos [início, fim) de uma camada
+
+    Inserções e remoções custam O(log n) esperado e as consultas
+    O(log n + k), onde k é o número de clips retornados.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[int, _Node] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _new_node(self, clip: Dict) -> _Node:
+        start, end = clip_interval(clip)
+        self._seq += 1
+        node = _Node(start, end, self._seq, clip)
+        self._nodes[id(clip)] = node
+        return node
+
+    def add(self, clip: Dict):
+        """Insere um clip na árvore"""
+        self._root = _insert(self._root, self._new_node(clip))
+
+    def build(self, clips: List[Dict]):
+        """Substitui o conteúdo da árvore pelos clips informados"""
+        self._nodes = {}
+        self._seq = 0
+        nodes = [self._new_node(clip) for clip in clips]
+        nodes.sort(key=lambda node: (node.start, node.seq))
+        self._root = _build(nodes)
+
+    def remove(self, clip: Dict) -> bool:
+        """Remove um clip; retorna False se ele não estava na árvore"""
+        node = self._nodes.pop(id(clip), None)
+        if node is None:
+            return False
+        self._root = _remove(self._root, node)
+        return True
+
+    def query(self, t0: float, t1: float, closed: bool = False) -> Iterator[Dict]:
+        """
+        Gera os clips com início < t1 (ou <= t1 se closed) e fim > t0,
+        em ordem de início
+        """
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            # Desce pela esquerda enquanto a subárvore ainda pode ter resultados
+            while node is not None and node.max_end > t0:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.start > t1 or (node.start == t1 and not closed):
+                return
+            if node.end > t0:
+                yield node.clip
+            node = node.right
+
+    def __iter__(self) -> Iterator[_Node]:
+        """Percorre os nós em ordem de início"""
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+
+class TimelineIndex:
+    """
+    Índice da timeline: uma árvore de intervalos por camada
+
+    Os clips adicionados ficam pendentes até a próxima consulta; nesse
+    momento são inseridos um a um ou, se forem muitos, a camada é
+    reconstruída de uma vez.
+    """
+
+    def __init__(self):
+        self._layers: Dict[int, IntervalTree] = {}
+        self._pending: Dict[int, List[Dict]] = {}
+
+    def __len__(self) -> int:
+        return (sum(len(tree) for tree in self._layers.values())
+                + sum(len(clips) for clips in self._pending.values()))
+
+    def rebuild(self, clips: List[Dict]):
+        """
+        Reconstrói o índice a partir da lista completa de clips
+
+        As árvores só são montadas na primeira consulta.
+        """
+        self._layers = {}
+        self._pending = {}
+        for clip in clips:
+            self.add(clip)
+
+    def add(self, clip: Dict):
+        """Registra um clip novo no índice"""
+        self._pending.setdefault(clip['layer'], []).append(clip)
+
+    def remove(self, clip: Dict) -> bool:
+        """Remove um clip do índice (mesmo que sua camada tenha sido alterada)"""
+        self._flush()
+        tree = self._layers.get(clip['layer'])
+        if tree is not None and tree.remove(clip):
+            return True
+        return any(tree.remove(clip) for tree in self._layers.values())
+
+    def _flush(self):
+        if not self._pending:
+            return
+        for layer, clips in self._pending.items():
+            tree = self._layers.get(layer)
+            if tree is None:
+                tree = self._layers[layer] = IntervalTree()
+            if len(clips) > len(tree) // 8:
+                tree.build([node.clip for node in tree] + clips)
+            else:
+                for clip in clips:
+                    tree.add(clip)
+        self._pending = {}
+
+    def _trees(self, layer: Optional[int]) -> List[IntervalTree]:
+        self._flush()
+        if layer is None:
+            return [self._layers[key] for key in sorted(self._layers)]
+        tree = self._layers.get(layer)
+        return [tree] if tree is not None else []
+
+    @property
+    def layers(self) -> List[int]:
+        """Camadas que possuem clips"""
+        self._flush()
+        return sorted(self._layers)
+
+    def clips_at(self, t: float, layer: Optional[int] = None) -> List[Dict]:
+        """Clips visíveis no instante t"""
+        result = []
+        for tree in self._trees(layer):
+            result.extend(tree.query(t, t, closed=True))
+        return result
+
+    def clips_in(self, t0: float, t1: float, layer: Optional[int] = None) -> List[Dict]:
+        """Clips que aparecem em algum momento do intervalo [t0, t1)"""
+        result = []
+        for tree in self._trees(layer):
+            result.extend(tree.query(t0, t1))
+        return result
+
+    def overlaps(self, layer: Optional[int] = None,
+                 rate: Optional['FrameRate'] = None) -> List[Tuple[Dict, Dict]]:
+        """
+        Pares de clips que se sobrepõem na mesma camada
+
+        Varre cada camada em ordem de início mantendo um heap com os fins
+        dos clips ativos: O(n log n + k). Com `rate`, início e fim são
+        comparados em quadros inteiros (clips encostados não colidem por
+        erro de arredondamento).
+        """
+        to_key = rate.to_frame if rate is not None else float
+        pairs = []
+        for tree in self._trees(layer):
+            active: List[Tuple[float, int, Dict]] = []
+            for node in tree:
+                start = to_key(node.start)
+                while active and active[0][0] <= start:
+                    heapq.heappop(active)
+                for _, _, other in active:
+                    pairs.append((other, node.clip))
+                heapq.heappush(active, (to_key(node.end), node.seq, node.clip))
+        return pairs
+
+
+def _reservations(occupied: Iterable[Tuple[float, float, int]]
+                  ) -> Dict[int, Tuple[List[float], List[float]]]:
+    """Por camada: inícios ordenados e o maior fim até cada um (para bisect)"""
+    by_layer: Dict[int, List[Tuple[float, float]]] = {}
+    for start, end, layer in occupied:
+        by_layer.setdefault(layer, []).append((start, end))
+    reservations = {}
+    for layer, intervals in by_layer.items():
+        intervals.sort()
+        starts = [start for start, _ in intervals]
+        max_ends = list(accumulate((end for _, end in intervals), max))
+        reservations[layer] = (starts, max_ends)
+    return reservations
+
+
+def _reserved(reservations: Dict[int, Tuple[List[float], List[float]]], layer: int,
+              start: float, end: float) -> bool:
+    """True se alguma reserva da camada cruza [start, end)"""
+    entry = reservations.get(layer)
+    if entry is None:
+        return False
+    starts, max_ends = entry
+    k = bisect_left(starts, end)
+    return k > 0 and max_ends[k - 1] > start
+
+
+def _overflow_layer(first_layer: int, last_layer: int, layer_end: Dict[int, float],
+                    reservations: Dict[int, Tuple[List[float], List[float]]],
+                    start: float, end: float) -> Tuple[int, bool]:
+    """
+    Camada para um item que não cabe livre em nenhuma camada da faixa
+
+    Prefere, entre as camadas sem reserva no intervalo, a que fica livre
+    primeiro (o item só se sobrepõe a itens novos). Se todas têm reserva,
+    escolhe a que fica livre primeiro contando também as reservas.
+
+    Returns:
+        Tupla (camada, True se o item cruza uma reserva)
+    """
+    best = conflict = None
+    for layer in range(first_layer, last_layer + 1):
+        busy_until = layer_end.get(layer, start)
+        entry = reservations.get(layer)
+        if entry is not None:
+            starts, max_ends = entry
+            k = bisect_left(starts, end)
+            if k > 0 and max_ends[k - 1] > start:
+                until = max(busy_until, max_ends[k - 1])
+                if conflict is None or until < conflict[0]:
+                    conflict = (until, layer)
+                continue
+        if best is None or busy_until < best[0]:
+            best = (busy_until, layer)
+    if best is not None:
+        return best[1], False
+    return conflict[1], True
+
+
+def allocate_layers(positions: Sequence[float], durations: Sequence[float],
+                    first_layer: int = 1,
+                    last_layer: Optional[int] = None,
+                    occupied: Iterable[Tuple[float, float, int]] = ()) -> Tuple[List[int], Dict]:
+    """
+    Distribui itens [posição, posição + duração) entre camadas sem sobreposição
+
+    Varre os itens em ordem de início (linha de varredura) mantendo um heap
+    com o fim dos itens ativos e outro com as camadas livres; cada item
+    recebe a menor camada livre da faixa [first_layer, last_layer]:
+    O(n log n). Um item que começa exatamente no fim de outro reaproveita
+    a camada dele.
+
+    Os intervalos de `occupied` (clips que já estão na faixa) são reservas:
+    uma camada só serve para o item se nenhuma reserva dela cruzar
+    [início, fim) do item (bisect nos inícios da camada, com o maior fim
+    acumulado). Camadas puladas por causa de uma reserva voltam para o heap
+    de livres.
+
+    Se a faixa encher, o item vai para a camada sem reserva no intervalo que
+    fica livre primeiro (sobrepondo-se a itens novos) e é contado em
+    'overflow'. Se todas as camadas da faixa estiverem reservadas durante o
+    item, ele fica sobre a reserva que termina primeiro e também é contado
+    em 'conflicts'.
+
+    Args:
+        positions: Início de cada item em segundos
+        durations: Duração de cada item em segundos
+        first_layer: Primeira camada da faixa
+        last_layer: Última camada da faixa (None = sem limite)
+        occupied: Tuplas (início, fim, camada) já ocupadas na faixa
+
+    Returns:
+        Tupla (camada de cada item, na ordem recebida; relatório com as
+        chaves max_concurrency, layers_used (camadas que receberam itens),
+        overflow e conflicts)
+    """
+    if last_layer is not None and last_layer < first_layer:
+        raise ValueError(f"Faixa de camadas vazia: {first_layer}-{last_layer}")
+    n = len(positions)
+    layers = [first_layer] * n
+    active: List[Tuple[float, int]] = []   # (fim, camada) dos itens ativos
+    free: List[int] = []                   # Camadas liberadas
+    layer_end: Dict[int, float] = {}       # Fim do último item de cada camada em uso
+    reservations = _reservations(occupied)
+    next_layer = first_layer
+    max_concurrency = 0
+    overflow = conflicts = 0
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    for i in sorted(range(n), key=positions.__getitem__):
+        start = positions[i]
+        end = start + durations[i]
+        while active and active[0][0] <= start:
+            finished, layer = heappop(active)
+            # Com a faixa cheia uma camada tem vários itens: só libera no último
+            if layer_end.get(layer) == finished:
+                del layer_end[layer]
+                heappush(free, layer)
+        if not reservations:
+            if free:
+                layer = heappop(free)
+            elif last_layer is None or next_layer <= last_layer:
+                layer = next_layer
+                next_layer += 1
+            else:
+                layer = None
+        else:
+            # Menor camada livre sem reserva no intervalo; as puladas voltam ao heap
+            layer = None
+            skipped = []
+            while free:
+                candidate = heappop(free)
+                if not _reserved(reservations, candidate, start, end):
+                    layer = candidate
+                    break
+                skipped.append(candidate)
+            while layer is None and (last_layer is None or next_layer <= last_layer):
+                candidate = next_layer
+                next_layer += 1
+                if not _reserved(reservations, candidate, start, end):
+                    layer = candidate
+                else:
+                    skipped.append(candidate)
+            for candidate in skipped:
+                heappush(free, candidate)
+        if layer is None:
+            layer, reserved = _overflow_layer(first_layer, last_layer, layer_end,
+                                              reservations, start, end)
+            overflow += 1
+            conflicts += reserved
+        if layer_end.get(layer, end) <= end:
+            layer_end[layer] = end
+        heappush(active, (end, layer))
+        layers[i] = layer
+        if len(active) > max_concurrency:
+            max_concurrency = len(active)
+
+    report = {'max_concurrency': max_concurrency, 'layers_used': len(set(layers)),
+              'overflow': overflow, 'conflicts': conflicts}
+    return layers, report